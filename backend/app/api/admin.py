@@ -0,0 +1,126 @@
+"""
+Admin API endpoints - stored profiles and memory snapshots (require ADMIN_API_KEYS)
+"""
+import io
+import pstats
+import re
+import secrets
+from pathlib import Path
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, status, Query, Header
+from fastapi.responses import FileResponse, PlainTextResponse
+from app.config import settings
+from app.services.profiling import memory_tracker
+from loguru import logger
+
+router = APIRouter(
+    prefix='/admin',
+    tags=["admin"],
+    responses={
+        401: {"description": "Invalid or missing API key"},
+        403: {"description": "Admin endpoints are disabled"}
+    }
+)
+
+_PROFILE_NAME = re.compile(r"^(request|flame)-[\w.-]+\.(prof|folded)$")
+
+
+def verify_admin_key(api_key: Optional[str]):
+    """Check the X-API-Key header against the configured admin keys."""
+    keys = settings.admin_api_keys_list
+    if not keys:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin endpoints are disabled (no ADMIN_API_KEYS configured)"
+        )
+    if not api_key or not any(secrets.compare_digest(api_key, key) for key in keys):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or missing API key"
+        )
+
+
+@router.get(
+    '/profiles',
+    summary="List stored profiles",
+    description="Request profiles (?profile=sample|trace on /api/chat) and sampled flame data, newest first."
+)
+async def list_profiles(x_api_key: Optional[str] = Header(None)) -> list[dict]:
+    verify_admin_key(x_api_key)
+    directory = Path(settings.profile_dir)
+    if not directory.is_dir():
+        return []
+    files = [p for p in directory.iterdir() if _PROFILE_NAME.match(p.name)]
+    files.sort(key=lambda p: p.stat().st_mtime, reverse=True)
+    return [{"name": p.name, "size": p.stat().st_size, "modified": p.stat().st_mtime} for p in files]
+
+
+@router.get(
+    '/profiles/{name}',
+    summary="Download a stored profile",
+    description=(
+        "Folded stacks (.folded, for flamegraph.pl/speedscope) or cProfile data (.prof, for "
+        "pstats/snakeviz). format=text renders a .prof as a pstats table."
+    ),
+    responses={404: {"description": "Profile not found"}}
+)
+def get_profile(
+    name: str,
+    format: Optional[str] = Query(None, description="'text' renders a .prof as a pstats table"),
+    top: int = Query(60, ge=1, le=1000, description="Rows in the pstats table"),
+    x_api_key: Optional[str] = Header(None)
+):
+    verify_admin_key(x_api_key)
+    path = Path(settings.profile_dir) / name
+    if not _PROFILE_NAME.match(name) or not path.is_file():
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+
+    if path.suffix == ".prof" and format == "text":
+        out = io.StringIO()
+        pstats.Stats(str(path), stream=out).sort_stats("cumulative").print_stats(top)
+        return PlainTextResponse(out.getvalue())
+    if path.suffix == ".folded":
+        return FileResponse(path, media_type="text/plain; charset=utf-8")
+    return FileResponse(path, media_type="application/octet-stream", filename=name)
+
+
+@router.post('/memory/start', summary="Start tracemalloc in this worker")
+async def start_memory_tracing(
+    frames: int = Query(1, ge=1, le=64, description="Stack frames kept per allocation"),
+    x_api_key: Optional[str] = Header(None)
+) -> dict:
+    verify_admin_key(x_api_key)
+    memory_tracker.start(frames)
+    return {"tracing": memory_tracker.tracing}
+
+
+@router.post('/memory/stop', summary="Stop tracemalloc in this worker")
+async def stop_memory_tracing(x_api_key: Optional[str] = Header(None)) -> dict:
+    verify_admin_key(x_api_key)
+    memory_tracker.stop()
+    return {"tracing": memory_tracker.tracing}
+
+
+@router.get(
+    '/memory',
+    summary="tracemalloc snapshot",
+    description=(
+        "Largest allocation sites in the worker that serves the request, plus growth since the "
+        "previous snapshot. Requires tracing (POST /api/admin/memory/start or TRACEMALLOC_FRAMES)."
+    ),
+    responses={409: {"description": "tracemalloc is not running"}}
+)
+def memory_snapshot(
+    top: int = Query(25, ge=1, le=500),
+    group_by: str = Query("lineno", pattern="^(lineno|filename|traceback)$"),
+    x_api_key: Optional[str] = Header(None)
+) -> dict:
+    # Sync endpoint: taking a snapshot can take a while, keep it off the event loop
+    verify_admin_key(x_api_key)
+    try:
+        snapshot = memory_tracker.snapshot(top, group_by)
+    except RuntimeError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    logger.info(f"tracemalloc snapshot: {snapshot['traced_bytes'] / 1e6:.1f} MB traced")
+    return snapshot
@@ -1,11 +1,34 @@
 """
 AI/chat API endpoints - Integrated with Pathfinder RAG Pipeline
 """
-from fastapi import APIRouter, HTTPException, status, Request
-from app.schemas.ai import ChatRequest, ChatResponse, PlaceInfo, AllPlacesResponse
-from app.services.pipeline import Pipeline
+import math
+import secrets
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterator, Optional
+
+import yaml
+from fastapi import APIRouter, HTTPException, status, Request, Query, Header
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response, StreamingResponse
+from app.api.responses import payload_response
+from app.config import settings
+from app.schemas.ai import (
+    ChatRequest, ChatResponse, ChatBatchRequest, ChatBatchResult, PlaceInfo, AllPlacesResponse
+)
+from app.api.admin import verify_admin_key
+from app.middleware.request_logging import redacted_headers
+from app.services.admission import AdmissionController, REJECT, DEGRADE
+from app.services.hot_queries import HotQueryLog, Prefiller
+from app.services.metrics import IN_FLIGHT
+from app.services.places_index import PlacesIndex
+from app.services.profiling import MODES as PROFILE_MODES, profile_call
+from app.services.request_context import verbose
 from loguru import logger
 
+if TYPE_CHECKING:
+    from app.services.pipeline import Pipeline
+
 router = APIRouter(
     tags=["ai"],
     responses={
@@ -14,31 +37,106 @@ router = APIRouter(
     }
 )
 
+_CONFIG_PATH = Path(__file__).parent.parent / "data" / "config.yaml"
+
 # Initialize the Pipeline globally (singleton pattern for performance)
-_pipeline: Pipeline | None = None
+_pipeline: Optional["Pipeline"] = None
+_pipeline_lock = threading.Lock()
+
+# Chat runs on its own bounded pool so health/places never queue behind it
+chat_admission = AdmissionController(
+    "chat",
+    max_concurrency=settings.chat_max_concurrency,
+    max_queue=settings.chat_max_queue,
+    degrade_after=settings.chat_degrade_after,
+    reject_after=settings.chat_reject_after
+)
 
 
-def get_pipeline() -> Pipeline:
+def get_pipeline() -> "Pipeline":
     """Get or initialize the Pipeline singleton."""
     global _pipeline
     if _pipeline is None:
-        logger.info("Initializing Pathfinder AI Pipeline...")
-        try:
-            _pipeline = Pipeline()
-            logger.info("✅ Pathfinder AI Pipeline initialized successfully")
-        except Exception as e:
-            logger.error(f"❌ Failed to initialize Pipeline: {e}")
-            raise RuntimeError(f"Failed to initialize AI Pipeline: {e}")
+        # The startup prefill thread may race the first request
+        with _pipeline_lock:
+            if _pipeline is None:
+                logger.info("Initializing Pathfinder AI Pipeline...")
+                try:
+                    from app.services.pipeline import Pipeline
+
+                    _pipeline = Pipeline()
+                    logger.info("✅ Pathfinder AI Pipeline initialized successfully")
+                except Exception as e:
+                    logger.error(f"❌ Failed to initialize Pipeline: {e}")
+                    raise RuntimeError(f"Failed to initialize AI Pipeline: {e}")
     return _pipeline
 
 
+# Built lazily from config.yaml alone, so the map never waits for the model to load
+_places_index: Optional[PlacesIndex] = None
+
+
+def get_places_index() -> PlacesIndex:
+    """Get or initialize the PlacesIndex singleton."""
+    global _places_index
+    if _places_index is None:
+        with open(_CONFIG_PATH, 'r', encoding='utf-8') as f:
+            config = yaml.safe_load(f)
+        _places_index = PlacesIndex(config.get('places', {}))
+    return _places_index
+
+
+# Normalized chat prompt counts, replayed at startup to prefill the caches
+hot_query_log: Optional[HotQueryLog] = HotQueryLog(
+    settings.hot_query_dir,
+    flush_seconds=settings.hot_query_flush_seconds,
+    retention_days=settings.hot_query_retention_days
+) if settings.hot_query_dir else None
+
+
+def start_prefill() -> Optional[Prefiller]:
+    """Replay the most frequent logged prompts in the background, yielding to live chat requests."""
+    if hot_query_log is None or settings.prefill_top_n <= 0:
+        return None
+    prompts = [prompt for prompt, _ in hot_query_log.top(settings.prefill_top_n)]
+    if not prompts:
+        return None
+    logger.info(f"Prefilling caches with {len(prompts)} hot queries ({settings.prefill_rate}/s)")
+    prefiller = Prefiller(
+        lambda prompt: get_pipeline().ask(prompt),
+        prompts,
+        rate=settings.prefill_rate,
+        busy=lambda: any(chat_admission.backlog)
+    )
+    prefiller.start()
+    return prefiller
+
+
 @router.post(
     '/chat',
     response_model=ChatResponse,
     summary="Chat with Pathfinder AI",
-    description="Send a question to the Pathfinder tourism assistant and receive a response with related places. Rate limited to 20 requests per minute per IP."
+    description=(
+        "Send a question to the Pathfinder tourism assistant and receive a response with related places. "
+        "Rate limited to 20 requests per minute per IP. Under load, replies may skip Gemini "
+        "(X-Pathfinder-Degraded: 1) or the request is rejected with 503 and Retry-After. "
+        "Admins can profile a single request with ?profile=sample|trace (or the "
+        "X-Pathfinder-Profile header) plus X-API-Key; the stored profile is named in the "
+        "X-Pathfinder-Profile response header."
+    ),
+    responses={
+        401: {"description": "Profiling requested with an invalid or missing API key"},
+        503: {"description": "Server overloaded, retry after the Retry-After delay"}
+    }
 )
-async def chat(request: Request, req: ChatRequest) -> ChatResponse:
+async def chat(
+    request: Request,
+    response: Response,
+    req: ChatRequest,
+    profile: Optional[str] = Query(None, description="Profile this request: 'sample' or 'trace' (admin only)"),
+    x_pathfinder_profile: Optional[str] = Header(None),
+    x_api_key: Optional[str] = Header(None)
+) -> ChatResponse:
     """
     Chat with the Pathfinder AI assistant.
     
@@ -46,15 +144,52 @@ async def chat(request: Request, req: ChatRequest) -> ChatResponse:
     
     Returns an AI-generated response with optional place recommendations.
     """
+    profile_mode = x_pathfinder_profile or profile
+    if profile_mode:
+        verify_admin_key(x_api_key)
+        if profile_mode not in PROFILE_MODES:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid request: profile must be one of {', '.join(PROFILE_MODES)}"
+            )
+    
+    admission = chat_admission.admit()
+    if admission.action == REJECT:
+        logger.warning(f"Shedding chat request (predicted wait {admission.predicted_wait:.1f}s)")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server is busy, please retry shortly",
+            headers={"Retry-After": str(admission.retry_after)}
+        )
+    
     try:
-        logger.info(f'Received chat request from {request.client.host if request.client else "unknown"}')
-        logger.info(f'Request headers: {dict(request.headers)}')
-        logger.info(f'Chat prompt (length={len(req.prompt)}): {req.prompt[:100]}...')
+        if verbose():
+            logger.debug(f'Chat request from {request.client.host if request.client else "unknown"}')
+            logger.debug(f'Request headers: {redacted_headers(request.headers)}')
+            logger.debug(f'Chat prompt (length={len(req.prompt)}): {req.prompt[:100]}...')
         
-        pipeline = get_pipeline()
+        def ask(degraded: bool):
+            # Resolved on the worker: a cold worker builds the Pipeline here, off the event loop
+            pipeline = get_pipeline()
+            if not profile_mode:
+                return pipeline.ask(req.prompt, degraded=degraded), degraded, None
+            answer, profile_name = profile_call(
+                lambda: pipeline.ask(req.prompt, degraded=degraded),
+                profile_mode, settings.profile_dir, keep=settings.profile_keep
+            )
+            return answer, degraded, profile_name
         
-        # Call the Pipeline's ask method
-        reply, places_data = pipeline.ask(req.prompt)
+        # Call the Pipeline's ask method on the chat worker pool
+        with IN_FLIGHT.track(endpoint="chat"):
+            (reply, places_data), degraded, profile_name = await chat_admission.run(
+                ask, degraded=admission.action == DEGRADE
+            )
+        if hot_query_log is not None and reply != get_pipeline().PROFANITY_REPLY:
+            hot_query_log.record(req.prompt)
+        if degraded:
+            response.headers["X-Pathfinder-Degraded"] = "1"
+        if profile_name:
+            response.headers["X-Pathfinder-Profile"] = profile_name
         
         # Convert places to PlaceInfo schema
         places = [
@@ -67,13 +202,14 @@ async def chat(request: Request, req: ChatRequest) -> ChatResponse:
             for p in places_data
         ]
         
-        logger.info(f'Generated response with {len(places)} places')
+        logger.bind(prompt_length=len(req.prompt), places=len(places), degraded=degraded).info("chat answered")
         
         return ChatResponse(reply=reply, places=places)
         
     except ValueError as e:
         logger.warning(f"Validation error in chat request: {e}")
-        logger.warning(f"Request body: {await request.body() if hasattr(request, 'body') else 'N/A'}")
+        if verbose():
+            logger.debug(f"Request body: {await request.body()}")
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Invalid request: {str(e)}"
@@ -92,37 +228,188 @@ async def chat(request: Request, req: ChatRequest) -> ChatResponse:
         )
 
 
+def verify_batch_key(api_key: Optional[str]):
+    """Check the X-API-Key header against the configured batch keys."""
+    keys = settings.batch_api_keys_list
+    if not keys:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Batch chat is disabled (no BATCH_API_KEYS configured)"
+        )
+    if not api_key or not any(secrets.compare_digest(api_key, key) for key in keys):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or missing API key"
+        )
+
+
+def _batch_lines(pipeline: "Pipeline", prompts: list[str]) -> Iterator[str]:
+    """Newline-delimited JSON results in completion order."""
+    remaining = set(range(len(prompts)))
+    with IN_FLIGHT.track(endpoint="chat_batch"):
+        try:
+            for index, reply, places_data, error in pipeline.ask_batch(prompts, settings.batch_concurrency):
+                remaining.discard(index)
+                if error is not None:
+                    result = ChatBatchResult(index=index, error="Failed to process prompt")
+                else:
+                    result = ChatBatchResult(
+                        index=index,
+                        reply=reply,
+                        places=[
+                            PlaceInfo(name=p["name"], lat=p["lat"], lng=p["lng"], type=p["type"])
+                            for p in places_data
+                        ]
+                    )
+                yield result.model_dump_json() + "\n"
+        except Exception as e:
+            # Headers are already sent; report the failure per unanswered prompt
+            logger.error(f"Error processing chat batch: {e}")
+            for index in sorted(remaining):
+                yield ChatBatchResult(index=index, error="Failed to process prompt").model_dump_json() + "\n"
+    logger.info(f'Finished chat batch of {len(prompts)} prompts')
+
+
+@router.post(
+    '/chat/batch',
+    summary="Chat with Pathfinder AI in bulk",
+    description=(
+        "Answer many prompts in one call (kiosk pre-warming, nightly QA). Requires an "
+        "X-API-Key header matching BATCH_API_KEYS. Results are streamed as newline-delimited "
+        "JSON objects ({index, reply, places, error}) in completion order. Batches are "
+        "not started while /api/chat is shedding load (503 with Retry-After)."
+    ),
+    responses={
+        200: {"content": {"application/x-ndjson": {}}, "description": "One ChatBatchResult per line"},
+        401: {"description": "Invalid or missing API key"},
+        403: {"description": "Batch chat is disabled"},
+        503: {"description": "Chat is overloaded, retry after the Retry-After delay"}
+    }
+)
+async def chat_batch(
+    request: Request,
+    req: ChatBatchRequest,
+    x_api_key: Optional[str] = Header(None)
+) -> StreamingResponse:
+    """
+    Chat with the Pathfinder AI assistant in bulk.
+    
+    - **prompts**: List of questions (at most BATCH_MAX_PROMPTS)
+    
+    Identical prompts are answered once; each result carries the index of its prompt.
+    """
+    verify_batch_key(x_api_key)
+    if len(req.prompts) > settings.batch_max_prompts:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid request: at most {settings.batch_max_prompts} prompts per batch"
+        )
+    
+    # A batch runs on its own pool of BATCH_CONCURRENCY threads rather than a chat
+    # worker (it would hold one for minutes and skew the service-time estimate), so
+    # it is only gated here: no new batch starts while chat would be degraded.
+    wait = chat_admission.predicted_wait()
+    if wait > chat_admission.degrade_after:
+        logger.warning(f"Shedding chat batch (predicted chat wait {wait:.1f}s)")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server is busy, please retry shortly",
+            headers={"Retry-After": str(max(1, math.ceil(wait)))}
+        )
+    
+    logger.info(
+        f'Received chat batch of {len(req.prompts)} prompts from '
+        f'{request.client.host if request.client else "unknown"}'
+    )
+    try:
+        # Off the event loop: a cold worker builds the Pipeline here
+        pipeline = await run_in_threadpool(get_pipeline)
+    except RuntimeError as e:
+        logger.error(f"Pipeline error: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="AI service is temporarily unavailable"
+        )
+    
+    return StreamingResponse(_batch_lines(pipeline, req.prompts), media_type="application/x-ndjson")
+
+
 @router.get(
     '/places',
     response_model=AllPlacesResponse,
     summary="Get all places",
-    description="Get all available tourist places with their coordinates for the map."
+    description=(
+        "Get all available tourist places with their coordinates for the map. "
+        "The payload is precomputed per config version, served gzip/brotli-encoded "
+        "and supports conditional GETs via ETag/If-None-Match."
+    ),
+    responses={304: {"description": "Not modified"}}
 )
-async def get_all_places() -> AllPlacesResponse:
+async def get_all_places(
+    request: Request,
+    bbox: Optional[str] = Query(None, description="Bounding box 'minLng,minLat,maxLng,maxLat' (widened to a 0.01° grid)"),
+    type: Optional[str] = Query(None, description="Place type (surfing, swimming, hiking, ...)"),
+    municipality: Optional[str] = Query(None, description="Municipality name (e.g. VIRAC)"),
+) -> Response:
     """
     Get all available places for the map.
     
-    Returns a list of all tourist places with names, coordinates, and types.
+    - **bbox**: Optional bounding box filter
+    - **type**: Optional place type filter
+    - **municipality**: Optional municipality filter
+    
+    Returns a list of tourist places with names, coordinates, and types.
     """
     try:
-        pipeline = get_pipeline()
-        places_data = pipeline.get_all_places()
-        
-        places = [
-            PlaceInfo(
-                name=p["name"],
-                lat=p["lat"],
-                lng=p["lng"],
-                type=p["type"]
-            )
-            for p in places_data
-        ]
-        
-        return AllPlacesResponse(places=places)
-        
+        payload = get_places_index().select(bbox=bbox, place_type=type, municipality=municipality)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid request: {str(e)}"
+        )
     except Exception as e:
         logger.error(f"Error fetching places: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to fetch places"
         )
+
+    return payload_response(request, payload)
+
+
+@router.get(
+    '/retrieval-bundle',
+    summary="Get client-side retrieval bundle",
+    description=(
+        "Binary bundle of int8-quantized question embeddings, deduplicated answers, the place "
+        "table and topic keywords, so the frontend can answer close matches offline with local "
+        "nearest-neighbour search. Versioned by content and served with ETag and gzip/brotli "
+        "encoding; the layout is documented in app/services/retrieval_bundle.py."
+    ),
+    responses={304: {"description": "Not modified"}, 404: {"description": "Bundle disabled"}}
+)
+def get_retrieval_bundle(request: Request) -> Response:
+    """
+    Get the retrieval bundle.
+    
+    Plain def: the first request builds the bundle, which runs in the threadpool
+    instead of blocking the event loop.
+    """
+    try:
+        pipeline = get_pipeline()
+        if not pipeline.config.get('client_bundle', {}).get('enabled', True):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Retrieval bundle is disabled"
+            )
+        payload = pipeline.retrieval_bundle().payload
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error building retrieval bundle: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to build retrieval bundle"
+        )
+
+    return payload_response(request, payload)
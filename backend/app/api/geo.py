@@ -0,0 +1,72 @@
+"""
+Map data API endpoints - merged spot/boundary bundle for the frontend map
+"""
+import threading
+from pathlib import Path
+from typing import Optional
+
+import yaml
+from fastapi import APIRouter, HTTPException, status, Request, Query
+from fastapi.responses import Response
+from app.api.responses import payload_response
+from app.services.map_bundle import MapBundle
+from loguru import logger
+
+router = APIRouter(
+    tags=["geo"],
+    responses={
+        500: {"description": "Internal server error"}
+    }
+)
+
+_DATA_DIR = Path(__file__).parent.parent / "data"
+
+# Built lazily on first request; does not need the AI Pipeline
+_map_bundle: MapBundle | None = None
+_map_bundle_lock = threading.Lock()
+
+
+def get_map_bundle() -> MapBundle:
+    """Get or initialize the MapBundle singleton."""
+    global _map_bundle
+    if _map_bundle is None:
+        with _map_bundle_lock:
+            if _map_bundle is None:
+                with open(_DATA_DIR / "config.yaml", 'r', encoding='utf-8') as f:
+                    config = yaml.safe_load(f)
+                _map_bundle = MapBundle(config.get('geo', {}), _DATA_DIR)
+    return _map_bundle
+
+
+@router.get(
+    '/map-bundle',
+    summary="Get merged map bundle",
+    description=(
+        "All tourist spots (pre-categorized) and municipality boundaries in one response. "
+        "Boundary geometry is simplified for the requested zoom level; the payload is "
+        "versioned by source hash and served with ETag and gzip/brotli encoding."
+    ),
+    responses={304: {"description": "Not modified"}}
+)
+def map_bundle(
+    request: Request,
+    zoom: Optional[float] = Query(None, ge=0, le=24, description="Map zoom level the boundaries are rendered at"),
+) -> Response:
+    """
+    Get the merged map bundle.
+    
+    - **zoom**: Optional zoom level; omitted means full detail
+    
+    Plain def: loading the boundaries and simplifying/compressing a new zoom level
+    runs in the threadpool instead of blocking the event loop.
+    """
+    try:
+        payload = get_map_bundle().payload(zoom)
+    except Exception as e:
+        logger.error(f"Error building map bundle: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to build map bundle"
+        )
+
+    return payload_response(request, payload)
@@ -0,0 +1,32 @@
+"""
+Shared HTTP helpers for cacheable, precompressed responses
+"""
+from fastapi import Request, status
+from fastapi.responses import Response
+
+from app.services.payload import CompressedPayload
+
+
+def payload_response(request: Request, payload: CompressedPayload, max_age: int = 0) -> Response:
+    """
+    Serve a precompressed payload, honouring If-None-Match and Accept-Encoding.
+    
+    Returns 304 with no body when the client already holds the current version.
+    """
+    headers = {
+        "ETag": payload.etag,
+        "Cache-Control": f"public, max-age={max_age}, must-revalidate",
+        "Vary": "Accept-Encoding",
+    }
+
+    if_none_match = request.headers.get("if-none-match", "")
+    if if_none_match and (
+        if_none_match.strip() == "*"
+        or payload.etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+    ):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    body, encoding = payload.encoded(request.headers.get("accept-encoding", ""))
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type=payload.media_type, headers=headers)
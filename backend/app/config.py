@@ -16,6 +16,40 @@ class Settings(BaseSettings):
     route_options_rate_limit: str = "10/minute"
     chat_rate_limit: str = "20/minute"
     
+    # Admission control for /api/chat (pipeline runs on a bounded worker pool)
+    chat_max_concurrency: int = 4
+    chat_max_queue: int = 32
+    chat_degrade_after: float = 2.0  # predicted queue wait (s) above which Gemini is skipped
+    chat_reject_after: float = 8.0  # predicted queue wait (s) above which requests get 503
+    
+    # Batch chat (/api/chat/batch): comma-separated API keys; empty disables the endpoint
+    batch_api_keys: str = ""
+    batch_max_prompts: int = 500
+    batch_concurrency: int = 4
+    
+    # Logging (see app/logging_config.py)
+    log_level: str = "INFO"
+    log_format: str = "json"  # json (one object per line) or text
+    log_sample_rate: float = 0.01  # fraction of requests that keep debug/header logs; 0 disables
+    log_queue_size: int = 10000  # records buffered for the writer thread before dropping
+    
+    # Admin endpoints (/api/admin/*) and on-demand profiling: comma-separated API keys; empty disables
+    admin_api_keys: str = ""
+    
+    # Profiling (per worker process)
+    profile_dir: str = "profiles"  # request profiles and sampled flame data
+    profile_keep: int = 50  # newest files of each kind kept in profile_dir
+    profile_sample_interval: float = 0.0  # always-on stack sampler period (s), e.g. 0.05; 0 disables
+    profile_flush_seconds: float = 300.0  # how often sampled stacks are written out
+    tracemalloc_frames: int = 0  # start tracemalloc at startup with this many frames; 0 disables
+    
+    # Hot-query log and startup cache prefill (per worker process)
+    hot_query_dir: str = ""  # normalized prompt counts, e.g. "hot_queries"; empty (default) disables the log and prefill
+    hot_query_flush_seconds: float = 60.0  # how often counts are written out
+    hot_query_retention_days: int = 7  # older daily files are deleted
+    prefill_top_n: int = 50  # most frequent prompts replayed at startup; 0 disables
+    prefill_rate: float = 0.5  # replayed prompts per second (paused while chat requests are in flight)
+    
     # AI Settings (optional - loaded by pipeline directly from env)
     gemini_api_key: Optional[str] = None
     
@@ -29,6 +63,16 @@ class Settings(BaseSettings):
     def cors_origins_list(self) -> List[str]:
         """Parse CORS origins string into list"""
         return [origin.strip() for origin in self.cors_origins.split(',')]
+    
+    @property
+    def batch_api_keys_list(self) -> List[str]:
+        """Parse batch API keys string into list"""
+        return [key.strip() for key in self.batch_api_keys.split(',') if key.strip()]
+    
+    @property
+    def admin_api_keys_list(self) -> List[str]:
+        """Parse admin API keys string into list"""
+        return [key.strip() for key in self.admin_api_keys.split(',') if key.strip()]
 
 
 # Global settings instance
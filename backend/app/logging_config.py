@@ -1,4 +1,138 @@
-from loguru import logger
+"""
+Logging configuration
+Records are handed to a writer thread through a bounded queue, so the request
+path never formats JSON or blocks on stdout; when the queue is full records are
+dropped (and counted) instead of slowing requests down. Every record carries the
+request id of the request it was logged for. Debug logs (and the header/body
+dumps guarded by request_context.verbose()) are kept for a LOG_SAMPLE_RATE
+fraction of requests only.
+
+Settings (env): LOG_LEVEL, LOG_FORMAT (json | text), LOG_SAMPLE_RATE, LOG_QUEUE_SIZE
+"""
+import atexit
+import json
+import os
+import queue
 import sys
+import threading
+from typing import Optional, TextIO
+
+from loguru import logger
+
+from app.config import settings
+from app.services.metrics import LOG_RECORDS_DROPPED
+from app.services.request_context import current
+
+_BATCH = 256
+
+
+class QueuedSink:
+    """Loguru sink that renders and writes records on a background thread"""
+
+    def __init__(self, stream: TextIO, fmt: str = "json", max_queue: int = 10000):
+        self.stream = stream
+        self.json = fmt == "json"
+        self.render = self._json if self.json else self._text
+        self.max_queue = max_queue
+        self._start()
+        # The writer thread does not survive fork (gunicorn preloads the app in the master)
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._start)
+
+    def _start(self):
+        self._queue: queue.Queue = queue.Queue(maxsize=self.max_queue)
+        self._dropped = 0
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+
+    def __call__(self, message):
+        # Empty format: the formatted message is only the traceback, if any
+        item = (message.record, str(message).lstrip("\n") if message.record["exception"] else None)
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            self._dropped += 1
+            LOG_RECORDS_DROPPED.inc()
+
+    def _run(self):
+        while True:
+            items = [self._queue.get()]
+            while len(items) < _BATCH:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = None in items
+            lines = [self.render(*item) for item in items if item is not None]
+            if self._dropped:
+                dropped, self._dropped = self._dropped, 0
+                lines.append(self._notice(f"Dropped {dropped} log records (log queue full)"))
+            try:
+                self.stream.write("".join(lines))
+                self.stream.flush()
+            except (OSError, ValueError):
+                pass
+            if stop:
+                return
+
+    def stop(self):
+        """Write what is queued and stop the writer thread."""
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(timeout=5)
+
+    @staticmethod
+    def _json(record: dict, exception: Optional[str]) -> str:
+        entry = {
+            "time": record["time"].isoformat(),
+            "level": record["level"].name,
+            "message": record["message"],
+            "module": record["name"],
+            "function": record["function"],
+            "line": record["line"],
+        }
+        entry.update(record["extra"])
+        if exception:
+            entry["exception"] = exception
+        return json.dumps(entry, default=str, ensure_ascii=False) + "\n"
+
+    @staticmethod
+    def _text(record: dict, exception: Optional[str]) -> str:
+        extra = record["extra"]
+        request_id = extra.get("request_id")
+        fields = " ".join(f"{k}={v}" for k, v in extra.items() if k != "request_id")
+        line = (
+            f"{record['time']:%Y-%m-%d %H:%M:%S.%f} | {record['level'].name:<8} | "
+            f"{f'[{request_id}] ' if request_id else ''}{record['message']}"
+            f"{f' | {fields}' if fields else ''}\n"
+        )
+        return line + (exception or "")
+
+    def _notice(self, text: str) -> str:
+        if self.json:
+            return json.dumps({"level": "WARNING", "message": text}) + "\n"
+        return f"WARNING  | {text}\n"
+
+
+def _add_request_id(record):
+    context = current()
+    if context is not None:
+        record["extra"].setdefault("request_id", context.request_id)
+
+
+def _keep(record) -> bool:
+    if record["level"].no >= _min_level:
+        return True
+    context = current()
+    return context is not None and context.sampled
+
+
+_min_level = logger.level(settings.log_level.upper()).no
+# Debug records are only built when some requests are sampled for verbose logs
+_handler_level = min(_min_level, logger.level("DEBUG").no) if settings.log_sample_rate > 0 else _min_level
+
+sink = QueuedSink(sys.stdout, settings.log_format, settings.log_queue_size)
 logger.remove()
-logger.add(sys.stdout, level='INFO', format='<green>{time}</green> | <level>{level}</level> | {message}')
+logger.configure(patcher=_add_request_id)
+logger.add(sink, level=_handler_level, format="", filter=_keep, backtrace=False, diagnose=False)
+atexit.register(sink.stop)
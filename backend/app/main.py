@@ -1,24 +1,58 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from slowapi.errors import RateLimitExceeded
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.middleware import SlowAPIMiddleware
-from app.api import ai, routes
+from app.api import admin, ai, geo, routes
 from app.middleware.error_middleware import catch_exceptions_middleware
+from app.middleware.request_logging import redacted_headers, request_logging_middleware
 from app.config import settings
+from app.services.metrics import registry as metrics_registry
+from app.services.profiling import StackSampler, memory_tracker
+from app.services.request_context import verbose
 import app.logging_config as logging_config
 from loguru import logger
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Per worker process: profiling, hot-query and prefill threads started before a fork would not survive it"""
+    sampler = None
+    if settings.profile_sample_interval > 0:
+        sampler = StackSampler(
+            settings.profile_dir,
+            interval=settings.profile_sample_interval,
+            flush_seconds=settings.profile_flush_seconds,
+            keep=settings.profile_keep
+        )
+        sampler.start()
+    if settings.tracemalloc_frames > 0:
+        memory_tracker.start(settings.tracemalloc_frames)
+    prefiller = None
+    if ai.hot_query_log is not None:
+        ai.hot_query_log.start()
+        prefiller = ai.start_prefill()
+    yield
+    if prefiller is not None:
+        prefiller.stop()
+    if ai.hot_query_log is not None:
+        ai.hot_query_log.stop()
+    if sampler is not None:
+        sampler.stop()
+
+
 app = FastAPI(
     title='Pathfinder API',
     description='API for Pathfinder - Tourist spot discovery and route planning',
     version='1.0.0',
     docs_url='/api/docs',
     redoc_url='/api/redoc',
-    openapi_url='/api/openapi.json'
+    openapi_url='/api/openapi.json',
+    lifespan=lifespan
 )
 
 # Initialize rate limiter
@@ -41,22 +75,21 @@ app.add_middleware(
 )
 
 app.middleware('http')(catch_exceptions_middleware)
+# Outermost, so the request log line also covers errors handled by catch_exceptions_middleware
+app.middleware('http')(request_logging_middleware)
 
 # Custom exception handler for validation errors
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
-    """Handle Pydantic validation errors with detailed logging"""
-    body = None
-    try:
-        body = await request.body()
-    except:
-        pass
-    
-    logger.error(f"Validation error on {request.url.path}")
-    logger.error(f"Request method: {request.method}")
-    logger.error(f"Request headers: {dict(request.headers)}")
-    logger.error(f"Request body: {body.decode('utf-8') if body else 'None'}")
-    logger.error(f"Validation errors: {exc.errors()}")
+    """Handle Pydantic validation errors; headers and body are logged for sampled requests only"""
+    logger.warning(f"Validation error on {request.method} {request.url.path}: {exc.errors()}")
+    if verbose():
+        try:
+            body = (await request.body()).decode('utf-8', errors='replace')
+        except Exception:
+            body = None
+        logger.debug(f"Request headers: {redacted_headers(request.headers)}")
+        logger.debug(f"Request body: {body[:2000] if body else 'None'}")
     
     return JSONResponse(
         status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
@@ -68,8 +101,18 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
 
 app.include_router(ai.router, prefix='/api')
 app.include_router(routes.router, prefix='/api')
+app.include_router(geo.router, prefix='/api')
+app.include_router(admin.router, prefix='/api')
 
 @app.get('/api/health')
 async def health():
     """Health check endpoint"""
     return {'status': 'ok'}
+
+@app.get('/api/metrics', response_class=PlainTextResponse)
+async def metrics():
+    """Pipeline stage latencies, cache and upstream error counters (Prometheus text format)"""
+    return PlainTextResponse(
+        metrics_registry.render(),
+        media_type='text/plain; version=0.0.4; charset=utf-8'
+    )
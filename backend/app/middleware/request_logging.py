@@ -0,0 +1,68 @@
+import random
+import re
+import time
+import uuid
+from functools import partial
+from typing import Callable
+
+from fastapi import Request
+from loguru import logger
+
+from app.config import settings
+from app.services import request_context
+
+_REQUEST_ID = re.compile(r"^[\w.:-]{1,64}$")
+_REDACTED_HEADERS = {"authorization", "cookie", "x-api-key"}
+
+
+def redacted_headers(headers) -> dict:
+    """Request headers safe to log (credentials masked)."""
+    return {k: "***" if k.lower() in _REDACTED_HEADERS else v for k, v in headers.items()}
+
+
+def _log_request(request: Request, context: request_context.RequestContext, status_code: int, start: float):
+    # Bound explicitly: for streamed bodies this runs after the context was reset
+    logger.bind(
+        request_id=context.request_id,
+        method=request.method,
+        path=request.url.path,
+        status=status_code,
+        duration_ms=round((time.perf_counter() - start) * 1000, 2),
+        stages_ms={name: round(seconds * 1000, 2) for name, seconds in context.timings.items()},
+    ).info("request")
+
+
+async def _logged_body(body_iterator, log: Callable[[], None]):
+    """Pass the response body through and log once it has been sent (or abandoned)."""
+    try:
+        async for chunk in body_iterator:
+            yield chunk
+    finally:
+        log()
+
+
+async def request_logging_middleware(request: Request, call_next):
+    """Assign a request id, decide log sampling and log one line with the request's timings."""
+    request_id = request.headers.get("x-request-id", "")
+    if not _REQUEST_ID.match(request_id):
+        request_id = uuid.uuid4().hex[:16]
+    token = request_context.begin(request_id, sampled=random.random() < settings.log_sample_rate)
+    context = request_context.current()
+    start = time.perf_counter()
+    try:
+        response = await call_next(request)
+    except Exception:
+        _log_request(request, context, 500, start)
+        raise
+    finally:
+        request_context.end(token)
+
+    response.headers["X-Request-ID"] = request_id
+    # Streamed bodies (e.g. /api/chat/batch) do their work after call_next returns,
+    # and keep adding stage timings to the same context, so log after the last chunk
+    log = partial(_log_request, request, context, response.status_code, start)
+    if hasattr(response, "body_iterator"):
+        response.body_iterator = _logged_body(response.body_iterator, log)
+    else:
+        log()
+    return response
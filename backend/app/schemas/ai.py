@@ -29,6 +29,38 @@ class ChatRequest(BaseModel):
         }
 
 
+class ChatBatchRequest(BaseModel):
+    """Request model for batch chat"""
+    prompts: list[str] = Field(
+        ...,
+        min_length=1,
+        description="User prompts (1-2000 characters each); identical prompts are answered once"
+    )
+
+    @field_validator('prompts')
+    @classmethod
+    def validate_prompts(cls, v: list[str]) -> list[str]:
+        prompts = []
+        for i, prompt in enumerate(v):
+            prompt = prompt.strip()
+            if not prompt:
+                raise ValueError(f'Prompt {i} cannot be empty or only whitespace')
+            if len(prompt) > 2000:
+                raise ValueError(f'Prompt {i} is longer than 2000 characters')
+            prompts.append(prompt)
+        return prompts
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "prompts": [
+                    "What are the best tourist spots in Catanduanes?",
+                    "Where can I surf?"
+                ]
+            }
+        }
+
+
 class PlaceInfo(BaseModel):
     """Place information with coordinates"""
     name: str = Field(..., description="Name of the place")
@@ -43,6 +75,14 @@ class ChatResponse(BaseModel):
     places: list[PlaceInfo] = Field(default_factory=list, description="Related places mentioned in the response")
 
 
+class ChatBatchResult(BaseModel):
+    """One line of the batch chat stream (newline-delimited JSON)"""
+    index: int = Field(..., description="Position of the prompt in the request")
+    reply: Optional[str] = Field(None, description="AI-generated reply")
+    places: list[PlaceInfo] = Field(default_factory=list, description="Related places mentioned in the response")
+    error: Optional[str] = Field(None, description="Set when the prompt could not be answered")
+
+
 class AllPlacesResponse(BaseModel):
     """Response model for all places endpoint"""
     places: list[PlaceInfo] = Field(..., description="List of all available places")
@@ -1,7 +1,13 @@
 """
 AI services module
 """
-from .pipeline import Pipeline
 
 __all__ = ['Pipeline']
 
+
+def __getattr__(name):
+    # Lazy so importing a light service (metrics, payload, ...) does not load the pipeline
+    if name == 'Pipeline':
+        from .pipeline import Pipeline
+        return Pipeline
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
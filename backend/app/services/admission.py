@@ -0,0 +1,101 @@
+"""
+Admission control for expensive endpoints
+Pipeline work runs on a bounded executor instead of the event loop, so cheap
+endpoints (/api/health, /api/places) stay responsive under load. Each request
+is admitted, degraded (answered without Gemini) or rejected (503 + Retry-After)
+based on the predicted queueing delay: backlog x smoothed service time.
+"""
+import asyncio
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, TypeVar
+
+from .metrics import record_admission, record_queue_delay
+from .request_context import submit
+
+T = TypeVar("T")
+
+RUN = "run"
+DEGRADE = "degrade"
+REJECT = "reject"
+
+
+@dataclass(frozen=True)
+class Admission:
+    """Decision for one request"""
+    action: str  # run, degrade or reject
+    predicted_wait: float
+    retry_after: int = 0
+
+
+class AdmissionController:
+    """Bounded worker pool with queue-latency based load shedding"""
+
+    def __init__(self, name: str, max_concurrency: int = 4, max_queue: int = 32,
+                 degrade_after: float = 2.0, reject_after: float = 8.0,
+                 initial_service_time: float = 1.0, smoothing: float = 0.2):
+        self.name = name
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_queue = max_queue
+        self.degrade_after = degrade_after
+        self.reject_after = reject_after
+        self.smoothing = smoothing
+        self.service_time = initial_service_time
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._running = 0
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix=name)
+
+    @property
+    def backlog(self) -> tuple[int, int]:
+        """(queued, running) requests."""
+        return self._pending, self._running
+
+    def predicted_wait(self) -> float:
+        """Expected queueing delay for a request arriving now."""
+        with self._lock:
+            ahead = self._pending + self._running + 1 - self.max_concurrency
+            service_time = self.service_time
+        return max(0, ahead) * service_time / self.max_concurrency
+
+    def admit(self) -> Admission:
+        wait = self.predicted_wait()
+        if self._pending >= self.max_queue or wait > self.reject_after:
+            decision = Admission(REJECT, wait, retry_after=max(1, math.ceil(wait)))
+        elif wait > self.degrade_after:
+            decision = Admission(DEGRADE, wait)
+        else:
+            decision = Admission(RUN, wait)
+        record_admission(self.name, decision.action)
+        return decision
+
+    async def run(self, fn: Callable[[bool], T], degraded: bool = False) -> T:
+        """
+        Run fn(degraded) on the worker pool and await its result.
+
+        A request that actually queued longer than degrade_after is degraded when
+        it starts, even if it was admitted normally.
+        """
+        submitted = time.monotonic()
+        with self._lock:
+            self._pending += 1
+
+        def task() -> T:
+            started = time.monotonic()
+            waited = started - submitted
+            with self._lock:
+                self._pending -= 1
+                self._running += 1
+            record_queue_delay(self.name, waited)
+            try:
+                return fn(degraded or waited > self.degrade_after)
+            finally:
+                elapsed = time.monotonic() - started
+                with self._lock:
+                    self._running -= 1
+                    self.service_time += self.smoothing * (elapsed - self.service_time)
+
+        return await asyncio.wrap_future(submit(self._executor, task))
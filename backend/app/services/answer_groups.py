@@ -0,0 +1,98 @@
+"""
+Build-time answer deduplication for the vector store
+Documents whose answers are identical (after normalization) or near-identical
+(word-set Jaccard >= threshold, found with MinHash LSH and verified exactly) share
+one canonical answer id, so retrieval can return k distinct answers directly.
+"""
+import zlib
+
+import numpy as np
+
+# Words ignored when comparing answers
+STOP_WORDS = frozenset({
+    'is', 'a', 'an', 'the', 'in', 'at', 'on', 'for', 'to', 'of', 'and', 'or', 'but', 'it', 'its'
+})
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+
+def answer_tokens(text: str) -> frozenset[str]:
+    """Lowercased word set without stop words (the unit of answer similarity)."""
+    return frozenset(text.lower().strip().split()) - STOP_WORDS
+
+
+def jaccard(a: frozenset[str], b: frozenset[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def _minhash_signatures(token_sets: list[frozenset[str]], num_perm: int, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, _MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+    b = rng.integers(0, _MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+    signatures = np.full((len(token_sets), num_perm), _MAX_HASH, dtype=np.uint64)
+    for row, tokens in enumerate(token_sets):
+        if not tokens:
+            continue
+        hashes = np.array([zlib.crc32(t.encode("utf-8")) for t in tokens], dtype=np.uint64)
+        # (a*x + b) mod p, truncated to 32 bits; uint64 wraparound is fine for hashing
+        permuted = ((hashes[:, None] * a + b) % _MERSENNE_PRIME) & np.uint64(_MAX_HASH)
+        signatures[row] = permuted.min(axis=0)
+    return signatures
+
+
+def group_answers(answers: list[str], threshold: float = 0.85,
+                  num_perm: int = 64, bands: int = 16, seed: int = 7) -> list[int]:
+    """
+    Assign each answer a group id; the id is the index of the group's first answer.
+
+    Exact duplicates (stripped, lowercased) are merged first. Near-duplicate
+    candidates come from MinHash LSH over the distinct texts and are merged only if
+    their exact Jaccard similarity reaches the threshold.
+    """
+    parent = list(range(len(answers)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def union(i: int, j: int):
+        ri, rj = find(i), find(j)
+        if ri != rj:
+            parent[max(ri, rj)] = min(ri, rj)
+
+    # Exact duplicates
+    first_by_text: dict[str, int] = {}
+    for i, answer in enumerate(answers):
+        key = answer.strip().lower()
+        if key in first_by_text:
+            union(first_by_text[key], i)
+        else:
+            first_by_text[key] = i
+
+    # Near duplicates among distinct texts
+    distinct = list(first_by_text.values())
+    token_sets = [answer_tokens(answers[i]) for i in distinct]
+    if len(distinct) > 1 and threshold <= 1.0:
+        rows_per_band = max(1, num_perm // bands)
+        signatures = _minhash_signatures(token_sets, rows_per_band * bands, seed)
+        candidates: set[tuple[int, int]] = set()
+        for band in range(bands):
+            buckets: dict[bytes, list[int]] = {}
+            chunk = signatures[:, band * rows_per_band:(band + 1) * rows_per_band]
+            for pos in range(len(distinct)):
+                if token_sets[pos]:
+                    buckets.setdefault(chunk[pos].tobytes(), []).append(pos)
+            for members in buckets.values():
+                for x in range(len(members)):
+                    for y in range(x + 1, len(members)):
+                        candidates.add((members[x], members[y]))
+        for x, y in candidates:
+            if jaccard(token_sets[x], token_sets[y]) >= threshold:
+                union(distinct[x], distinct[y])
+
+    return [find(i) for i in range(len(answers))]
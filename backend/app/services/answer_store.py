@@ -0,0 +1,94 @@
+"""
+Materialized natural-language replies
+Gemini replies generated ahead of time (see materialize_answers.py) for every
+distinct dataset answer and common multi-topic combinations, keyed by a hash of
+the fact text. The store is versioned by the dataset hash and the Gemini
+settings, so editing either invalidates it instead of serving stale replies.
+"""
+import hashlib
+import json
+import os
+import tempfile
+from datetime import datetime, timezone
+from typing import Optional
+
+from loguru import logger
+
+FORMAT_VERSION = 1
+
+
+def fact_key(fact: str) -> str:
+    """Answer id: hash of the whitespace/case-normalized fact."""
+    normalized = " ".join(fact.lower().split())
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()[:16]
+
+
+def store_version(dataset_hash: Optional[str], gemini_config: dict) -> str:
+    """Version of the replies: changes with the dataset, model or prompt template."""
+    hasher = hashlib.md5()
+    hasher.update(str(FORMAT_VERSION).encode("utf-8"))
+    hasher.update((dataset_hash or "").encode("utf-8"))
+    hasher.update(json.dumps(gemini_config, sort_keys=True, ensure_ascii=False).encode("utf-8"))
+    return hasher.hexdigest()[:12]
+
+
+class AnswerStore:
+    """On-disk map of fact -> pre-generated reply for one store version"""
+
+    def __init__(self, path: str, version: str):
+        self.path = path
+        self.version = version
+        self.replies: dict[str, dict] = {}
+
+    def __len__(self) -> int:
+        return len(self.replies)
+
+    def __contains__(self, fact: str) -> bool:
+        return fact_key(fact) in self.replies
+
+    def load(self) -> bool:
+        """Load replies if the file exists and matches this version."""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return False
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Failed to load answer store: {e}")
+            return False
+
+        if data.get("version") != self.version:
+            logger.info(
+                f"Answer store is stale (version {data.get('version')}, expected {self.version}); "
+                "run materialize_answers.py to regenerate"
+            )
+            return False
+
+        self.replies = data.get("replies", {})
+        logger.info(f"Loaded {len(self.replies)} materialized replies (version {self.version})")
+        return True
+
+    def get(self, fact: str) -> Optional[str]:
+        entry = self.replies.get(fact_key(fact))
+        return entry["reply"] if entry else None
+
+    def put(self, fact: str, reply: str, question: str):
+        self.replies[fact_key(fact)] = {"reply": reply, "question": question}
+
+    def save(self):
+        """Write atomically so a running server never reads a partial file."""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        data = {
+            "version": self.version,
+            "generated_at": datetime.now(timezone.utc).isoformat(),
+            "replies": self.replies,
+        }
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.path) or ".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, indent=1)
+            os.replace(tmp_path, self.path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
@@ -0,0 +1,91 @@
+"""
+Columnar document metadata for the vector store
+Every distinct string (question, answer, title, topic, offline summary) is
+stored once in a shared table and rows are int32 ids per field, so repeated
+titles/topics and summaries equal to their answer cost 4 bytes per row instead
+of a string object each. Metadata dicts are only built for the rows a query
+returns. Saved as a string list plus numpy arrays, which loads much faster
+than per-document dicts.
+"""
+from array import array
+from typing import Iterable, Optional
+
+import numpy as np
+
+FIELDS = ("question", "answer", "title", "topic", "summary_offline")
+_NONE = -1
+
+
+class DocumentTable:
+    """Interned, column-per-field document metadata (row i = document i)"""
+
+    __slots__ = ("strings", "columns")
+
+    def __init__(self, strings: list[str], columns: dict[str, np.ndarray]):
+        self.strings = strings
+        self.columns = columns
+
+    @classmethod
+    def empty(cls) -> "DocumentTable":
+        return cls([], {field: np.zeros(0, dtype=np.int32) for field in FIELDS})
+
+    @classmethod
+    def from_records(cls, records: Iterable[tuple[str, dict]]) -> "DocumentTable":
+        """Build from (document text, metadata) pairs; the text is the question column."""
+        ids: dict[str, int] = {}
+        strings: list[str] = []
+        columns = {field: array("i") for field in FIELDS}
+
+        def intern(value: Optional[str]) -> int:
+            if value is None:
+                return _NONE
+            value = str(value)
+            index = ids.get(value)
+            if index is None:
+                index = ids[value] = len(strings)
+                strings.append(value)
+            return index
+
+        for text, metadata in records:
+            answer = metadata.get("answer")
+            columns["question"].append(intern(text))
+            columns["answer"].append(intern(answer))
+            columns["title"].append(intern(metadata.get("title", "General Info")))
+            columns["topic"].append(intern(metadata.get("topic", "General")))
+            columns["summary_offline"].append(intern(metadata.get("summary_offline", answer)))
+
+        return cls(strings, {field: np.frombuffer(col, dtype=np.int32).copy() for field, col in columns.items()})
+
+    @classmethod
+    def from_documents(cls, documents: list[dict]) -> "DocumentTable":
+        """Convert the legacy list of {"text", "metadata"} dicts."""
+        return cls.from_records((doc["text"], doc["metadata"]) for doc in documents)
+
+    def __len__(self) -> int:
+        return len(self.columns["question"])
+
+    def _value(self, index: int) -> Optional[str]:
+        return None if index == _NONE else self.strings[index]
+
+    def get(self, row: int, field: str) -> Optional[str]:
+        return self._value(int(self.columns[field][row]))
+
+    def text(self, row: int) -> str:
+        return self.get(row, "question")
+
+    def metadata(self, row: int) -> dict:
+        """Metadata dict of one row (materialized on demand)."""
+        return {field: self._value(int(self.columns[field][row])) for field in FIELDS}
+
+    def column(self, field: str) -> list[Optional[str]]:
+        """All values of a field (shared string objects, no copies)."""
+        strings = self.strings
+        return [None if i == _NONE else strings[i] for i in self.columns[field].tolist()]
+
+    def state(self) -> dict:
+        """Plain picklable state (no class reference, so stores survive module moves)."""
+        return {"strings": self.strings, "columns": self.columns}
+
+    @classmethod
+    def from_state(cls, state: dict) -> "DocumentTable":
+        return cls(state["strings"], state["columns"])
@@ -0,0 +1,248 @@
+"""
+Shared embedding service
+One process owns the SentenceTransformer and serves encode requests from every
+web worker over a Unix socket, batching concurrent requests into a single
+model.encode call. Workers then start without loading the model and share its
+cores instead of contending for them.
+
+Run it next to the web server (from the backend directory):
+    python -m app.services.embedding_service
+and set embedding_service.enabled: true in config.yaml. Workers fall back to
+an in-process model when the service is unreachable.
+
+Wire format (both directions): 8-byte header (JSON length, payload length),
+JSON header, raw payload. Requests carry {"model", "texts"}; responses carry
+{"shape"} and float32 vectors, or {"error"}.
+"""
+import argparse
+import json
+import os
+import queue
+import signal
+import socket
+import struct
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import yaml
+from loguru import logger
+
+DEFAULT_SOCKET = "/tmp/pathfinder-embed.sock"
+_PREFIX = struct.Struct("!II")
+
+
+def send_message(sock: socket.socket, header: dict, payload: bytes = b""):
+    header_bytes = json.dumps(header).encode("utf-8")
+    sock.sendall(_PREFIX.pack(len(header_bytes), len(payload)) + header_bytes + payload)
+
+
+def _recv_exact(sock: socket.socket, size: int) -> Optional[bytes]:
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 1 << 20))
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def recv_message(sock: socket.socket) -> Optional[tuple[dict, bytes]]:
+    """Next (header, payload), or None when the peer closed the connection."""
+    prefix = _recv_exact(sock, _PREFIX.size)
+    if prefix is None:
+        return None
+    header_size, payload_size = _PREFIX.unpack(prefix)
+    header_bytes = _recv_exact(sock, header_size)
+    payload = _recv_exact(sock, payload_size) if payload_size else b""
+    if header_bytes is None or payload is None:
+        return None
+    return json.loads(header_bytes), payload
+
+
+class EmbeddingClient:
+    """Encode texts through the shared service (one connection per thread)"""
+
+    def __init__(self, socket_path: str = DEFAULT_SOCKET, timeout: float = 2.0):
+        if not hasattr(socket, "AF_UNIX"):
+            raise OSError("Unix sockets are not available on this platform")
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connection(self) -> socket.socket:
+        sock = getattr(self._local, "sock", None)
+        # Never reuse a connection inherited across fork()
+        if sock is None or self._local.pid != os.getpid():
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            sock.connect(self.socket_path)
+            self._local.sock = sock
+            self._local.pid = os.getpid()
+        return sock
+
+    def _reset(self):
+        sock = getattr(self._local, "sock", None)
+        self._local.sock = None
+        if sock is not None:
+            try:
+                sock.close()
+            except OSError:
+                pass
+
+    def encode(self, texts: list[str], model: str) -> np.ndarray:
+        """Raises OSError/RuntimeError if the service is unreachable or fails."""
+        try:
+            sock = self._connection()
+            send_message(sock, {"model": model, "texts": texts})
+            response = recv_message(sock)
+        except OSError:
+            self._reset()
+            raise
+        if response is None:
+            self._reset()
+            raise ConnectionError("Embedding service closed the connection")
+        header, payload = response
+        if "error" in header:
+            raise RuntimeError(f"Embedding service error: {header['error']}")
+        return np.frombuffer(payload, dtype=np.float32).reshape(header["shape"])
+
+
+class _Job:
+    __slots__ = ("texts", "done", "vectors", "error")
+
+    def __init__(self, texts: list[str]):
+        self.texts = texts
+        self.done = threading.Event()
+        self.vectors: Optional[np.ndarray] = None
+        self.error: Optional[str] = None
+
+
+class EmbeddingServer:
+    """Unix-socket encode server that batches requests across connections"""
+
+    def __init__(self, model_name: str, socket_path: str = DEFAULT_SOCKET,
+                 max_batch: int = 64, max_wait: float = 0.005):
+        from sentence_transformers import SentenceTransformer
+
+        logger.info(f"Loading embedding model: {model_name}")
+        self.model_name = model_name
+        self.model = SentenceTransformer(model_name)
+        self.socket_path = socket_path
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._jobs: queue.Queue[_Job] = queue.Queue()
+
+    def serve_forever(self):
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(self.socket_path)
+        # Same-user access only
+        os.chmod(self.socket_path, 0o600)
+        server.listen(128)
+        threading.Thread(target=self._batch_loop, name="embed-batcher", daemon=True).start()
+        logger.info(f"Embedding service listening on {self.socket_path}")
+        try:
+            while True:
+                conn, _ = server.accept()
+                threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+        finally:
+            server.close()
+            if os.path.exists(self.socket_path):
+                os.remove(self.socket_path)
+
+    def _handle(self, conn: socket.socket):
+        with conn:
+            while True:
+                try:
+                    request = recv_message(conn)
+                except (OSError, ValueError) as e:
+                    logger.debug(f"Dropping embedding client: {e}")
+                    return
+                if request is None:
+                    return
+                header, _ = request
+                if header.get("model") != self.model_name:
+                    send_message(conn, {"error": f"service runs {self.model_name}, not {header.get('model')}"})
+                    continue
+
+                job = _Job(list(header.get("texts", [])))
+                self._jobs.put(job)
+                job.done.wait()
+                if job.error is not None:
+                    send_message(conn, {"error": job.error})
+                else:
+                    vectors = np.ascontiguousarray(job.vectors, dtype=np.float32)
+                    send_message(conn, {"shape": list(vectors.shape)}, vectors.tobytes())
+
+    def _batch_loop(self):
+        while True:
+            jobs = [self._jobs.get()]
+            count = len(jobs[0].texts)
+            deadline = time.monotonic() + self.max_wait
+            # Collect whatever else arrives within max_wait, up to max_batch texts
+            while count < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    job = self._jobs.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                jobs.append(job)
+                count += len(job.texts)
+
+            texts = [text for job in jobs for text in job.texts]
+            try:
+                if texts:
+                    vectors = self.model.encode(texts, convert_to_numpy=True)
+                else:
+                    vectors = np.zeros((0, self.model.get_sentence_embedding_dimension()), dtype=np.float32)
+                offset = 0
+                for job in jobs:
+                    job.vectors = vectors[offset:offset + len(job.texts)]
+                    offset += len(job.texts)
+            except Exception as e:
+                logger.error(f"Embedding batch failed: {e}")
+                for job in jobs:
+                    job.error = str(e)
+            logger.debug(f"Encoded {len(texts)} texts for {len(jobs)} requests")
+            for job in jobs:
+                job.done.set()
+
+
+def _exit_on_sigterm(signum, frame):
+    raise SystemExit(0)
+
+
+def main(argv=None) -> int:
+    from .pipeline import SimpleVectorStore
+
+    config_path = Path(__file__).parent.parent / "data" / "config.yaml"
+    with open(config_path, "r", encoding="utf-8") as f:
+        options = (yaml.safe_load(f) or {}).get("embedding_service", {})
+
+    parser = argparse.ArgumentParser(description="Shared embedding service for Pathfinder workers")
+    parser.add_argument("--socket", default=options.get("socket", DEFAULT_SOCKET))
+    parser.add_argument("--model", default=SimpleVectorStore.__init__.__defaults__[0])
+    parser.add_argument("--max-batch", type=int, default=options.get("max_batch", 64),
+                        help="Most texts encoded in one model call")
+    parser.add_argument("--max-wait-ms", type=float, default=options.get("max_wait_ms", 5),
+                        help="How long to wait for more requests to batch together")
+    args = parser.parse_args(argv)
+
+    # Exit through serve_forever's cleanup (removes the socket file) on TERM too
+    signal.signal(signal.SIGTERM, _exit_on_sigterm)
+    try:
+        EmbeddingServer(args.model, args.socket, args.max_batch, args.max_wait_ms / 1000).serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,182 @@
+"""
+Typo-tolerant place and topic resolution
+A symmetric-delete dictionary over the words of the configured place names
+(places, protected_places) and topic keywords, built once per pipeline. A
+misspelled prompt word is looked up through its deletions (a fixed number of
+dict probes per word, independent of vocabulary size) and verified with the
+Damerau-Levenshtein distance. Corrections are only applied when they complete
+a whole place name or keyword, and the span is rewritten to the configured
+spelling, so the exact matchers downstream (place detection, protected places,
+topic keywords) work unchanged.
+"""
+import re
+from typing import Iterable
+
+from loguru import logger
+
+_WORD = re.compile(r"\w+")
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Optimal string alignment distance of a and b, or limit + 1 if it exceeds limit."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2: list[int] = []
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+def _deletes(word: str, distance: int) -> set[str]:
+    """word with up to `distance` characters removed (word itself included)."""
+    variants = {word}
+    level = {word}
+    for _ in range(min(distance, len(word) - 1)):
+        level = {w[:i] + w[i + 1:] for w in level for i in range(len(w))}
+        variants |= level
+    return variants
+
+
+class FuzzyIndex:
+    """Misspelling resolver for the configured place names and topic keywords"""
+
+    def __init__(self, place_names: Iterable[str], keyword_phrases: Iterable[str],
+                 max_distance: int = 2, min_length: int = 5, keyword_min_length: int = 8,
+                 chars_per_edit: int = 5):
+        """
+        Args:
+            place_names: place names, rewritten to this spelling when matched
+            keyword_phrases: topic keywords (single common words need keyword_min_length)
+            max_distance: most edits tolerated per word and per matched phrase
+            min_length: shorter prompt words must match exactly
+            keyword_min_length: min length of a word fuzzily matched to a one-word keyword
+            chars_per_edit: one edit is allowed per this many characters of the word
+        """
+        self.max_distance = max(0, max_distance)
+        self.min_length = min_length
+        self.keyword_min_length = keyword_min_length
+        self.chars_per_edit = max(1, chars_per_edit)
+
+        # first word -> [(words, canonical spelling, is keyword)], longest phrases first
+        self._phrases: dict[str, list[tuple[tuple[str, ...], str, bool]]] = {}
+        seen: set[tuple[str, ...]] = set()
+        for phrases, is_keyword in ((place_names, False), (keyword_phrases, True)):
+            for phrase in phrases:
+                words = tuple(_WORD.findall(str(phrase).lower()))
+                if not words or words in seen:
+                    continue
+                seen.add(words)
+                canonical = str(phrase).lower() if is_keyword else str(phrase)
+                self._phrases.setdefault(words[0], []).append((words, canonical, is_keyword))
+        for entries in self._phrases.values():
+            entries.sort(key=lambda entry: len(entry[0]), reverse=True)
+
+        self.words = frozenset(word for entries in self._phrases.values()
+                               for words, _, _ in entries for word in words)
+        # Prompt words longer than this plus the allowed distance cannot match anything
+        self._longest = max(map(len, self.words), default=0)
+        self._index: dict[str, list[str]] = {}
+        shortest = max(1, self.min_length - self.max_distance)
+        for word in self.words:
+            if len(word) >= shortest:
+                for variant in _deletes(word, self.max_distance):
+                    self._index.setdefault(variant, []).append(word)
+        logger.info(f"Built fuzzy index ({len(seen)} phrases, {len(self.words)} words, "
+                    f"{len(self._index)} deletes, max distance {self.max_distance})")
+
+    def allowed_distance(self, word: str) -> int:
+        if len(word) < self.min_length:
+            return 0
+        return min(self.max_distance, len(word) // self.chars_per_edit)
+
+    def candidates(self, word: str) -> dict[str, int]:
+        """Vocabulary words within the allowed distance of a prompt word (word -> distance)."""
+        if word in self.words:
+            return {word: 0}
+        limit = self.allowed_distance(word)
+        # Length check first: deletes of a long token grow quadratically with its length
+        if limit == 0 or word.isdigit() or len(word) > self._longest + limit:
+            return {}
+        found: dict[str, int] = {}
+        for variant in _deletes(word, limit):
+            for candidate in self._index.get(variant, ()):
+                if candidate not in found:
+                    distance = edit_distance(word, candidate, limit)
+                    if distance <= limit:
+                        found[candidate] = distance
+        return found
+
+    def _match_at(self, words: list[str], options: list[dict[str, int]], start: int):
+        """Best (length, cost, canonical) phrase starting at words[start], or None."""
+        best = None
+        ambiguous = False
+        first = options[start] or {words[start]: 0}
+        for head in first:
+            for phrase, canonical, is_keyword in self._phrases.get(head, ()):
+                if start + len(phrase) > len(words):
+                    continue
+                cost = 0
+                for offset, expected in enumerate(phrase):
+                    position = start + offset
+                    distance = 0 if words[position] == expected else options[position].get(expected)
+                    if distance is None:
+                        break
+                    cost += distance
+                else:
+                    if cost > self.max_distance:
+                        continue
+                    if cost and is_keyword and len(phrase) == 1 and len(words[start]) < self.keyword_min_length:
+                        continue
+                    key = (len(phrase), -cost)
+                    if best is None or key > best[:2]:
+                        best, ambiguous = (len(phrase), -cost, canonical), False
+                    elif key == best[:2] and canonical != best[2]:
+                        ambiguous = True
+        if best is None or ambiguous:
+            return None
+        return best[0], -best[1], best[2]
+
+    def resolve(self, text: str) -> tuple[str, list[tuple[str, str]]]:
+        """
+        Rewrite misspelled place names and keywords in text.
+
+        Returns (text, corrections) where corrections are (original span, canonical)
+        pairs; text is returned unchanged when nothing was corrected.
+        """
+        matches = list(_WORD.finditer(text))
+        words = [m.group().lower() for m in matches]
+        options = [self.candidates(word) for word in words]
+        if all(not o or word in o for word, o in zip(words, options)):
+            # Every word is exact or unknown: nothing to correct
+            return text, []
+
+        corrections: list[tuple[int, int, str]] = []
+        i = 0
+        while i < len(words):
+            match = self._match_at(words, options, i)
+            if match is None:
+                i += 1
+                continue
+            length, cost, canonical = match
+            if cost:
+                corrections.append((matches[i].start(), matches[i + length - 1].end(), canonical))
+            i += length
+
+        if not corrections:
+            return text, []
+        parts, pos = [], 0
+        for begin, end, canonical in corrections:
+            parts.append(text[pos:begin])
+            parts.append(canonical)
+            pos = end
+        parts.append(text[pos:])
+        return "".join(parts), [(text[begin:end], canonical) for begin, end, canonical in corrections]
@@ -0,0 +1,187 @@
+"""
+Hot-query log and cache prefill
+Chat prompts are counted in memory under their normalized form (an O(1) dict
+update on the request path; only the normalized form is kept, never the prompt
+as typed) and a background thread merges the counts into a
+small JSON file per day and process, written atomically. Files older than the
+retention window are deleted, so the log rotates by itself. On startup, the
+most frequent prompts across the retained files are replayed in the background
+to refill the translation, embedding and response caches. Replay is rate-capped
+and pauses while live chat requests are queued or running.
+
+File layout (one per day and process, so workers never write the same file):
+    <dir>/hot-YYYYMMDD-<pid>.json   {"normalized prompt": count, ...}
+"""
+import json
+import os
+import re
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Optional
+
+from loguru import logger
+
+_TRAILING = re.compile(r"[\s?!.,;:]+$")
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Case- and whitespace-insensitive key of a prompt, without trailing punctuation."""
+    return _TRAILING.sub("", " ".join(prompt.lower().split()))
+
+
+class HotQueryLog:
+    """Frequency counts of normalized prompts, flushed to rotating files off the request path"""
+
+    def __init__(self, directory: str, flush_seconds: float = 60.0, retention_days: int = 7,
+                 max_entries: int = 5000, max_prompt_chars: int = 300):
+        self.directory = Path(directory)
+        self.flush_seconds = flush_seconds
+        self.retention_days = max(1, retention_days)
+        self.max_entries = max_entries
+        self.max_prompt_chars = max_prompt_chars
+        self._lock = threading.Lock()
+        self._pending: dict[str, int] = {}  # normalized prompt -> count
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def record(self, prompt: str):
+        """Count one prompt (no I/O; long prompts are not logged)."""
+        if len(prompt) > self.max_prompt_chars:
+            return
+        key = normalize_prompt(prompt)
+        if not key:
+            return
+        with self._lock:
+            self._pending[key] = self._pending.get(key, 0) + 1
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="hot-query-log", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the flusher and write what is pending."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.flush()
+
+    def _run(self):
+        while not self._stop.wait(self.flush_seconds):
+            self.flush()
+
+    def _path(self, day: datetime) -> Path:
+        return self.directory / f"hot-{day:%Y%m%d}-{os.getpid()}.json"
+
+    @staticmethod
+    def _read(path: Path) -> dict[str, int]:
+        try:
+            return json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+
+    def flush(self):
+        """Merge pending counts into today's file of this process and drop expired files."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            path = self._path(datetime.now())
+            counts = self._read(path)
+            for key, count in pending.items():
+                counts[key] = counts.get(key, 0) + count
+            if len(counts) > self.max_entries:
+                counts = dict(sorted(counts.items(), key=lambda item: -item[1])[:self.max_entries])
+            tmp = path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(counts, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+            os.replace(tmp, path)
+            self._expire()
+        except OSError as e:
+            logger.warning(f"Could not write hot-query log: {e}")
+
+    def _files(self) -> list[tuple[str, Path]]:
+        """(day, path) of every log file."""
+        files = []
+        for path in self.directory.glob("hot-*-*.json"):
+            parts = path.stem.split("-")
+            if len(parts) == 3 and parts[1].isdigit():
+                files.append((parts[1], path))
+        return files
+
+    def _expire(self):
+        oldest = f"{datetime.now() - timedelta(days=self.retention_days - 1):%Y%m%d}"
+        for day, path in self._files():
+            if day < oldest:
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+
+    def top(self, n: int) -> list[tuple[str, int]]:
+        """The n most frequent normalized prompts within the retention window: (prompt, count)."""
+        if n <= 0 or not self.directory.is_dir():
+            return []
+        oldest = f"{datetime.now() - timedelta(days=self.retention_days - 1):%Y%m%d}"
+        totals: dict[str, int] = {}
+        for day, path in self._files():
+            if day < oldest:
+                continue
+            for key, count in self._read(path).items():
+                totals[key] = totals.get(key, 0) + count
+        return sorted(totals.items(), key=lambda item: -item[1])[:n]
+
+
+class Prefiller:
+    """Replays prompts in a background thread at a capped rate, yielding to live traffic"""
+
+    def __init__(self, answer: Callable[[str], object], prompts: list[str], rate: float = 0.5,
+                 busy: Optional[Callable[[], bool]] = None):
+        """
+        Args:
+            answer: answers one prompt (filling the caches as a side effect)
+            prompts: prompts to replay, most frequent first
+            rate: at most this many prompts per second
+            busy: returns True while live requests should have the machine to themselves
+        """
+        self.answer = answer
+        self.prompts = prompts
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self.busy = busy or (lambda: False)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.done = 0
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="cache-prefill", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def _run(self):
+        start = time.monotonic()
+        for prompt in self.prompts:
+            while self.busy():
+                if self._stop.wait(0.5):
+                    return
+            if self._stop.is_set():
+                return
+            began = time.monotonic()
+            try:
+                self.answer(prompt)
+                self.done += 1
+            except Exception as e:
+                logger.debug(f"Prefill of a hot query failed: {e}")
+            if self._stop.wait(max(0.0, self.interval - (time.monotonic() - began))):
+                return
+        logger.info(f"Prefilled caches with {self.done}/{len(self.prompts)} hot queries "
+                    f"in {time.monotonic() - start:.0f}s")
@@ -0,0 +1,322 @@
+"""
+Streaming dataset ingestion
+Records are parsed and validated one at a time from JSON Lines or a JSON array
+and spooled to a documents file. They are then encoded in fixed-size batches,
+either in this process or across a pool of worker processes that each load the
+model once, and written straight into a memory-mapped float32 embeddings file.
+Memory stays bounded by the batches in flight. progress.json records finished
+batches, so an interrupted build resumes where it stopped.
+
+Work directory layout:
+    documents.jsonl   {"text", "metadata"} per valid record
+    embeddings.f32    row-major float32 matrix (count x dim)
+    progress.json     build key (dataset hash, model, batch size), shape, finished batches
+"""
+import json
+import math
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Iterator, Optional
+
+import numpy as np
+from loguru import logger
+
+_CHUNK = 1 << 20
+
+
+def _iter_json_array(f, chunk_size: int = _CHUNK) -> Iterator:
+    """Items of a top-level JSON array, decoded one at a time from a text stream."""
+    decoder = json.JSONDecoder()
+    buffer = f.read(chunk_size).lstrip()
+    if not buffer.startswith("["):
+        raise ValueError("expected a JSON array or JSON Lines")
+    pos, eof = 1, False
+    while True:
+        # Skip separators, refilling the buffer when it runs out
+        while True:
+            while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                pos += 1
+            if pos < len(buffer) or eof:
+                break
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            buffer, pos = buffer[pos:] + chunk, 0
+        if pos >= len(buffer):
+            raise ValueError("unterminated JSON array")
+        if buffer[pos] == "]":
+            return
+        try:
+            item, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            # Item continues past the buffer
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            buffer, pos = buffer[pos:] + chunk, 0
+            continue
+        yield item
+        pos = end
+
+
+def iter_records(dataset_path: str) -> Iterator[tuple[int, object]]:
+    """(index, raw record) from a JSON array or JSON Lines file, without loading it whole."""
+    with open(dataset_path, "r", encoding="utf-8") as f:
+        head = f.read(4096).lstrip()
+        f.seek(0)
+        if head.startswith("["):
+            yield from enumerate(_iter_json_array(f))
+            return
+        for idx, line in enumerate(f):
+            if not line.strip():
+                continue
+            try:
+                yield idx, json.loads(line)
+            except json.JSONDecodeError as e:
+                logger.warning(f"Skipping malformed line {idx + 1}: {e}")
+
+
+def to_document(item) -> Optional[tuple[str, dict]]:
+    """(document text, metadata) of a dataset record, or None if it is invalid."""
+    if not isinstance(item, dict):
+        return None
+    question, answer = item.get("input"), item.get("output")
+    if not isinstance(question, str) or not isinstance(answer, str) or not question.strip():
+        return None
+    return question, {
+        "question": question,
+        "answer": answer,
+        "title": item.get("title", "General Info"),
+        "topic": item.get("topic", "General"),
+        "summary_offline": item.get("summary_offline", answer)
+    }
+
+
+def iter_documents(dataset_path: str) -> Iterator[tuple[str, dict]]:
+    """Valid (document, metadata) pairs of a dataset, validated as they stream in."""
+    for idx, item in iter_records(dataset_path):
+        document = to_document(item)
+        if document is None:
+            logger.warning(f"Skipping invalid entry at index {idx}")
+            continue
+        yield document
+
+
+@dataclass(frozen=True)
+class IngestResult:
+    documents_path: Path
+    embeddings_path: Path
+    count: int
+    dim: int
+
+
+def iter_spooled(documents_path: Path) -> Iterator[tuple[str, dict]]:
+    """(document, metadata) pairs of a spooled documents file, one line at a time."""
+    with open(documents_path, "r", encoding="utf-8") as f:
+        for line in f:
+            record = json.loads(line)
+            yield record["text"], record["metadata"]
+
+
+def open_embeddings(result: IngestResult) -> np.ndarray:
+    """Read-only view of the embeddings file (pages are shared through the OS cache)."""
+    if result.count == 0:
+        return np.zeros((0, result.dim), dtype=np.float32)
+    return np.asarray(np.memmap(result.embeddings_path, dtype=np.float32, mode="r",
+                                shape=(result.count, result.dim)))
+
+
+def _spool(dataset_path: str, documents_path: Path) -> int:
+    """Write the valid records to documents_path; returns how many there are."""
+    tmp = documents_path.with_suffix(".tmp")
+    count = 0
+    with open(tmp, "w", encoding="utf-8") as out:
+        for text, metadata in iter_documents(dataset_path):
+            out.write(json.dumps({"text": text, "metadata": metadata}, ensure_ascii=False) + "\n")
+            count += 1
+    os.replace(tmp, documents_path)
+    return count
+
+
+def _batches(documents_path: Path, batch_size: int) -> Iterator[tuple[int, list[str]]]:
+    with open(documents_path, "r", encoding="utf-8") as f:
+        texts, index = [], 0
+        for line in f:
+            texts.append(json.loads(line)["text"])
+            if len(texts) == batch_size:
+                yield index, texts
+                texts, index = [], index + 1
+        if texts:
+            yield index, texts
+
+
+class _Progress:
+    """Finished batches of the build identified by key (reset when the key changes)"""
+
+    def __init__(self, path: Path, key: dict):
+        self.path = path
+        self.key = key
+        state = {}
+        if path.exists():
+            try:
+                state = json.loads(path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                state = {}
+        if state.get("key") != key:
+            state = {}
+        self.count: Optional[int] = state.get("count")
+        self.dim: Optional[int] = state.get("dim")
+        self.done: set[int] = set(state.get("done", []))
+        self._saved = time.monotonic()
+
+    def reset(self, count: int):
+        self.count, self.dim, self.done = count, None, set()
+        self.save()
+
+    def save(self):
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({
+            "key": self.key, "count": self.count, "dim": self.dim, "done": sorted(self.done)
+        }), encoding="utf-8")
+        os.replace(tmp, self.path)
+        self._saved = time.monotonic()
+
+    def mark(self, index: int):
+        self.done.add(index)
+        if time.monotonic() - self._saved > 2.0:
+            self.save()
+
+
+# Worker process state: the model is loaded once per process
+_worker_model = None
+
+
+def _init_worker(model_name: str, threads: int):
+    global _worker_model
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    torch.set_num_threads(threads)
+    _worker_model = SentenceTransformer(model_name)
+
+
+def _encode_batch(texts: list[str]) -> np.ndarray:
+    return _worker_model.encode(texts, convert_to_numpy=True).astype(np.float32, copy=False)
+
+
+def _encode_into(path: str, shape: tuple[int, int], start: int, texts: list[str]) -> int:
+    matrix = np.memmap(path, dtype=np.float32, mode="r+", shape=shape)
+    matrix[start:start + len(texts)] = _encode_batch(texts)
+    matrix.flush()
+    del matrix
+    return start
+
+
+def ingest_dataset(dataset_path: str, work_dir: str, model_name: str, dataset_hash: Optional[str] = None,
+                   batch_size: int = 256, workers: int = 0, min_parallel_records: int = 5000,
+                   encode: Optional[Callable[[list[str]], np.ndarray]] = None) -> IngestResult:
+    """
+    Encode a dataset into work_dir, resuming a previous run of the same build.
+
+    workers: encoding processes (0 = one per core when the dataset has at least
+    min_parallel_records records). With one worker the dataset is encoded in
+    this process with `encode` (defaults to loading model_name here).
+    """
+    work = Path(work_dir)
+    work.mkdir(parents=True, exist_ok=True)
+    documents_path = work / "documents.jsonl"
+    embeddings_path = work / "embeddings.f32"
+    progress = _Progress(work / "progress.json", {
+        "dataset_hash": dataset_hash, "model": model_name, "batch_size": batch_size
+    })
+
+    if progress.count is None or not documents_path.exists():
+        logger.info(f"Reading dataset {dataset_path}...")
+        progress.reset(_spool(dataset_path, documents_path))
+    count = progress.count
+    total_batches = math.ceil(count / batch_size)
+    if progress.dim is not None and (
+            not embeddings_path.exists() or embeddings_path.stat().st_size != count * progress.dim * 4):
+        progress.reset(count)
+    if progress.done:
+        logger.info(f"Resuming ingestion: {len(progress.done)}/{total_batches} batches already encoded")
+
+    workers = workers or ((os.cpu_count() or 1) if count >= min_parallel_records else 1)
+    workers = max(1, min(workers, total_batches or 1))
+    logger.info(f"Encoding {count} records in {total_batches} batches of {batch_size} ({workers} process(es))")
+
+    matrix: Optional[np.memmap] = None
+    started = time.monotonic()
+    reported = [0]
+
+    def open_matrix(dim: int):
+        nonlocal matrix
+        if progress.dim != dim:
+            progress.dim = dim
+            progress.done.clear()
+            matrix = np.memmap(embeddings_path, dtype=np.float32, mode="w+", shape=(count, dim))
+            progress.save()
+        else:
+            matrix = np.memmap(embeddings_path, dtype=np.float32, mode="r+", shape=(count, dim))
+
+    def finished(index: int):
+        progress.mark(index)
+        done = len(progress.done)
+        if done * 10 // total_batches > reported[0]:
+            reported[0] = done * 10 // total_batches
+            elapsed = time.monotonic() - started
+            logger.info(f"Encoded {done}/{total_batches} batches ({elapsed:.0f}s)")
+
+    def store(index: int, vectors: np.ndarray):
+        if matrix is None:
+            open_matrix(vectors.shape[1])
+        start = index * batch_size
+        matrix[start:start + len(vectors)] = vectors
+        matrix.flush()
+        finished(index)
+
+    pending = ((i, texts) for i, texts in _batches(documents_path, batch_size) if i not in progress.done)
+    if progress.dim is not None:
+        open_matrix(progress.dim)
+
+    if workers == 1:
+        if encode is None:
+            from sentence_transformers import SentenceTransformer
+
+            encode = SentenceTransformer(model_name).encode
+        for index, texts in pending:
+            store(index, np.asarray(encode(texts), dtype=np.float32))
+    else:
+        import multiprocessing
+
+        # spawn: workers must not inherit a forked copy of torch's thread pools
+        threads = max(1, (os.cpu_count() or 1) // workers)
+        with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"),
+                                 initializer=_init_worker, initargs=(model_name, threads)) as pool:
+            in_flight = {}
+            for index, texts in pending:
+                if matrix is None:
+                    # First batch tells the embedding dimension
+                    store(index, pool.submit(_encode_batch, texts).result())
+                    continue
+                future = pool.submit(_encode_into, str(embeddings_path), (count, progress.dim),
+                                     index * batch_size, texts)
+                in_flight[future] = index
+                if len(in_flight) >= workers * 2:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        future.result()
+                        finished(in_flight.pop(future))
+            for future in list(in_flight):
+                future.result()
+                finished(in_flight.pop(future))
+
+    if matrix is not None:
+        matrix.flush()
+        del matrix
+    progress.save()
+    logger.info(f"Ingestion finished: {count} records in {time.monotonic() - started:.1f}s")
+    return IngestResult(documents_path, embeddings_path, count, progress.dim or 0)
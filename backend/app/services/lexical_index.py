@@ -0,0 +1,116 @@
+"""
+Lexical fast path over dataset questions
+A normalized-text hash index catches verbatim questions (suggested prompts,
+copy-paste) and a BM25 inverted index catches near-verbatim ones, so decisive
+matches can skip translation and the transformer encode entirely.
+"""
+import math
+import re
+import unicodedata
+from dataclasses import dataclass
+from typing import Optional
+
+_NON_WORD = re.compile(r"[^\w]+", re.UNICODE)
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase, strip accents and punctuation, collapse whitespace."""
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return " ".join(_NON_WORD.sub(" ", text).split())
+
+
+@dataclass(frozen=True)
+class LexicalMatch:
+    """A decisive lexical hit: the dataset row to answer from"""
+    row: int
+    kind: str  # "exact" or "near_exact"
+    score: float
+
+
+class LexicalIndex:
+    """Exact-hash plus BM25 index over the dataset questions"""
+
+    def __init__(self, questions: list[str], answers: list[str],
+                 near_exact_jaccard: float = 0.8, bm25_margin: float = 1.5,
+                 k1: float = 1.5, b: float = 0.75):
+        self.answers = answers
+        self.near_exact_jaccard = near_exact_jaccard
+        self.bm25_margin = bm25_margin
+        self.k1 = k1
+        self.b = b
+
+        # First row wins on duplicate questions, matching the dense search tie-break
+        self.exact: dict[str, int] = {}
+        self.token_sets: list[frozenset[str]] = []
+        self.doc_lengths: list[int] = []
+        self.postings: dict[str, list[tuple[int, int]]] = {}
+
+        for row, question in enumerate(questions):
+            normalized = normalize_text(question)
+            self.exact.setdefault(normalized, row)
+            tokens = normalized.split()
+            self.token_sets.append(frozenset(tokens))
+            self.doc_lengths.append(len(tokens))
+            counts: dict[str, int] = {}
+            for token in tokens:
+                counts[token] = counts.get(token, 0) + 1
+            for token, tf in counts.items():
+                self.postings.setdefault(token, []).append((row, tf))
+
+        n_docs = len(questions)
+        self.avg_length = (sum(self.doc_lengths) / n_docs) if n_docs else 0.0
+        self.idf = {
+            token: math.log(1 + (n_docs - len(rows) + 0.5) / (len(rows) + 0.5))
+            for token, rows in self.postings.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self.token_sets)
+
+    def scores(self, tokens: list[str]) -> dict[int, float]:
+        """BM25 score for every row sharing at least one token with the query."""
+        scores: dict[int, float] = {}
+        for token in set(tokens):
+            postings = self.postings.get(token)
+            if not postings:
+                continue
+            idf = self.idf[token]
+            for row, tf in postings:
+                norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[row] / self.avg_length)
+                scores[row] = scores.get(row, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+        return scores
+
+    def match(self, text: str) -> Optional[LexicalMatch]:
+        """
+        Return a decisive match, or None to fall back to dense search.
+
+        Near-exact requires the best row to share most of its tokens with the query
+        (Jaccard) and to outscore the best row with a different answer by a margin.
+        """
+        normalized = normalize_text(text)
+        if not normalized:
+            return None
+
+        row = self.exact.get(normalized)
+        if row is not None:
+            return LexicalMatch(row=row, kind="exact", score=1.0)
+
+        tokens = normalized.split()
+        scores = self.scores(tokens)
+        if not scores:
+            return None
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        best_row, best_score = ranked[0]
+        query_set = frozenset(tokens)
+        doc_set = self.token_sets[best_row]
+        jaccard = len(query_set & doc_set) / len(query_set | doc_set)
+        if jaccard < self.near_exact_jaccard:
+            return None
+
+        best_answer = self.answers[best_row]
+        runner_up = next((s for r, s in ranked[1:] if self.answers[r] != best_answer), 0.0)
+        if runner_up and best_score < runner_up * self.bm25_margin:
+            return None
+        return LexicalMatch(row=best_row, kind="near_exact", score=jaccard)
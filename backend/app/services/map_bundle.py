@@ -0,0 +1,229 @@
+"""
+Merged map bundle - tourist spots and municipality boundaries in one response
+Reads the per-municipality GeoJSON files once, categorizes spots server-side and
+simplifies boundary geometry per zoom level (Douglas-Peucker + quantization)
+"""
+import hashlib
+import json
+import threading
+from pathlib import Path
+from typing import Optional
+
+from loguru import logger
+
+from .payload import CompressedPayload
+
+
+def _perpendicular_distance(point: list[float], start: list[float], end: list[float]) -> float:
+    """Distance from point to the segment start-end (planar, in degrees)."""
+    x, y = point[0], point[1]
+    x1, y1 = start[0], start[1]
+    x2, y2 = end[0], end[1]
+    dx, dy = x2 - x1, y2 - y1
+    if dx == 0 and dy == 0:
+        return ((x - x1) ** 2 + (y - y1) ** 2) ** 0.5
+    t = max(0.0, min(1.0, ((x - x1) * dx + (y - y1) * dy) / (dx * dx + dy * dy)))
+    px, py = x1 + t * dx, y1 + t * dy
+    return ((x - px) ** 2 + (y - py) ** 2) ** 0.5
+
+
+def simplify_line(points: list[list[float]], tolerance: float) -> list[list[float]]:
+    """Douglas-Peucker simplification (iterative, so long rings cannot hit the recursion limit)."""
+    if tolerance <= 0 or len(points) < 3:
+        return points
+
+    keep = [False] * len(points)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        first, last = stack.pop()
+        max_dist = 0.0
+        index = first
+        for i in range(first + 1, last):
+            dist = _perpendicular_distance(points[i], points[first], points[last])
+            if dist > max_dist:
+                max_dist = dist
+                index = i
+        if max_dist > tolerance:
+            keep[index] = True
+            stack.append((first, index))
+            stack.append((index, last))
+
+    return [p for p, k in zip(points, keep) if k]
+
+
+def _simplify_ring(ring: list[list[float]], tolerance: float, precision: int) -> Optional[list[list[float]]]:
+    """Simplify and quantize a closed ring; None if it collapses below a valid polygon."""
+    simplified = simplify_line(ring, tolerance)
+    quantized: list[list[float]] = []
+    for lng, lat, *_ in simplified:
+        point = [round(lng, precision), round(lat, precision)]
+        if not quantized or quantized[-1] != point:
+            quantized.append(point)
+    if len(quantized) < 4:
+        return None
+    if quantized[0] != quantized[-1]:
+        quantized.append(quantized[0])
+    return quantized
+
+
+def _simplify_polygon(rings: list, tolerance: float, precision: int) -> Optional[list]:
+    exterior = _simplify_ring(rings[0], tolerance, precision)
+    if exterior is None:
+        # Tiny islands: keep them visible by quantizing without simplification
+        exterior = _simplify_ring(rings[0], 0, precision)
+        if exterior is None:
+            return None
+    holes = [h for h in (_simplify_ring(r, tolerance, precision) for r in rings[1:]) if h]
+    return [exterior, *holes]
+
+
+def simplify_geometry(geometry: dict, tolerance: float, precision: int) -> Optional[dict]:
+    """Simplify a Polygon/MultiPolygon geometry for one zoom level."""
+    geom_type = geometry.get('type')
+    if geom_type == 'Polygon':
+        coords = _simplify_polygon(geometry['coordinates'], tolerance, precision)
+        return {"type": "Polygon", "coordinates": coords} if coords else None
+    if geom_type == 'MultiPolygon':
+        polygons = [
+            p for p in (_simplify_polygon(rings, tolerance, precision) for rings in geometry['coordinates'])
+            if p
+        ]
+        return {"type": "MultiPolygon", "coordinates": polygons} if polygons else None
+    return geometry
+
+
+class MapBundle:
+    """Merged, pre-categorized spots and per-zoom simplified boundaries"""
+
+    def __init__(self, geo_config: dict, base_dir: Path):
+        self.public_dir = (base_dir / geo_config.get('public_dir', '../../../frontend/public')).resolve()
+        self.boundary_file = self.public_dir / geo_config.get('boundary_file', 'CATANDUANES.geojson')
+        self.municipality_files = [
+            self.public_dir / 'municipalities' / f"{name}.geojson"
+            for name in geo_config.get('municipalities', [])
+        ]
+        self.boundary_properties = geo_config.get('boundary_properties', ['OBJECTID', 'GEOCODE', 'MUNICIPALI'])
+        self.type_to_category = {
+            str(k).upper(): v for k, v in geo_config.get('type_to_category', {}).items()
+        }
+        # Sorted by max_zoom so the first level that covers a zoom wins
+        self.zoom_levels = sorted(
+            geo_config.get('zoom_levels', [{"max_zoom": 22, "tolerance": 0.0, "precision": 6}]),
+            key=lambda level: level['max_zoom']
+        )
+        self.spot_precision = geo_config.get('spot_precision', 6)
+        self._config_key = json.dumps(geo_config, sort_keys=True, default=str)
+
+        self._signature: Optional[tuple] = None
+        self.version = ""
+        self._spots: list[dict] = []
+        self._boundaries: list[dict] = []
+        self._payloads: dict[int, CompressedPayload] = {}
+        # Endpoint runs in the threadpool; one thread reloads/builds at a time
+        self._lock = threading.Lock()
+
+    def _source_files(self) -> list[Path]:
+        return [self.boundary_file, *self.municipality_files]
+
+    def _stat_signature(self) -> tuple:
+        signature = []
+        for path in self._source_files():
+            try:
+                st = path.stat()
+                signature.append((str(path), st.st_mtime_ns, st.st_size))
+            except FileNotFoundError:
+                signature.append((str(path), None, None))
+        return tuple(signature)
+
+    def _load(self, signature: tuple):
+        hasher = hashlib.md5(self._config_key.encode("utf-8"))
+        spots: list[dict] = []
+        for path in self.municipality_files:
+            try:
+                raw = path.read_bytes()
+            except FileNotFoundError:
+                logger.warning(f"Municipality GeoJSON not found: {path}")
+                continue
+            hasher.update(raw)
+            fallback_municipality = path.stem.upper()
+            for feature in json.loads(raw).get('features', []):
+                geometry = feature.get('geometry') or {}
+                props = feature.get('properties')
+                if geometry.get('type') != 'Point' or not props:
+                    continue
+                lng, lat = geometry['coordinates'][:2]
+                place_type = props.get('type') or 'Unknown'
+                spots.append({
+                    "name": props.get('name') or 'Unknown',
+                    "coordinates": [round(lng, self.spot_precision), round(lat, self.spot_precision)],
+                    "municipality": props.get('municipality') or fallback_municipality,
+                    "description": props.get('description') or '',
+                    "category": self.type_to_category.get(place_type.upper(), 'other'),
+                    "type": place_type,
+                    "size": props.get('size') or 0.15,
+                    "showAtZoom": props.get('showAtZoom') or 10
+                })
+
+        boundaries: list[dict] = []
+        try:
+            raw = self.boundary_file.read_bytes()
+            hasher.update(raw)
+            boundaries = json.loads(raw).get('features', [])
+        except FileNotFoundError:
+            logger.warning(f"Boundary GeoJSON not found: {self.boundary_file}")
+
+        self._spots = spots
+        self._boundaries = boundaries
+        self._payloads = {}
+        self._signature = signature
+        self.version = hasher.hexdigest()[:12]
+        logger.info(f"Loaded map bundle v{self.version} ({len(spots)} spots, {len(boundaries)} boundaries)")
+
+    def _level_for(self, zoom: Optional[float]) -> dict:
+        if zoom is None:
+            return self.zoom_levels[-1]
+        for level in self.zoom_levels:
+            if zoom <= level['max_zoom']:
+                return level
+        return self.zoom_levels[-1]
+
+    def _build_payload(self, level: dict) -> CompressedPayload:
+        tolerance = level.get('tolerance', 0.0)
+        precision = level.get('precision', 6)
+        features = []
+        for feature in self._boundaries:
+            geometry = simplify_geometry(feature.get('geometry') or {}, tolerance, precision)
+            if geometry is None:
+                continue
+            props = feature.get('properties') or {}
+            features.append({
+                "type": "Feature",
+                "properties": {k: props[k] for k in self.boundary_properties if k in props},
+                "geometry": geometry
+            })
+        document = {
+            "version": self.version,
+            "zoom": level['max_zoom'],
+            "spots": self._spots,
+            "boundaries": {"type": "FeatureCollection", "features": features}
+        }
+        return CompressedPayload(document, f"{self.version}-z{level['max_zoom']}")
+
+    def payload(self, zoom: Optional[float] = None) -> CompressedPayload:
+        """Return the bundle for a zoom level, reloading if the source files changed."""
+        signature = self._stat_signature()
+        with self._lock:
+            if signature != self._signature:
+                self._load(signature)
+
+            level = self._level_for(zoom)
+            payload = self._payloads.get(level['max_zoom'])
+            if payload is None:
+                payload = self._build_payload(level)
+                self._payloads[level['max_zoom']] = payload
+                logger.debug(
+                    f"Built map bundle z{level['max_zoom']}: {len(payload.body)} bytes "
+                    f"({len(payload.gzip)} gzip)"
+                )
+            return payload
@@ -0,0 +1,328 @@
+"""
+Lightweight in-process metrics for the Pathfinder pipeline
+Counters, gauges and histograms exported in Prometheus text format at /api/metrics.
+Recording is a perf_counter() pair plus a bisect and a locked add (~2µs per span).
+"""
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+from .request_context import add_timing
+
+# Latency buckets (seconds) spanning sub-millisecond lookups to slow Gemini calls
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+    0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple[str, ...]:
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return lines
+
+    def _samples(self) -> list[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonically increasing count"""
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def _samples(self) -> list[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}"
+            for key, v in items
+        ]
+
+
+class Gauge(_Metric):
+    """Value that can go up and down (e.g. in-flight requests)"""
+    kind = "gauge"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    @contextmanager
+    def track(self, **labels) -> Iterator[None]:
+        """Increment for the duration of the block."""
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+    def _samples(self) -> list[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}"
+            for key, v in items
+        ]
+
+
+class Histogram(_Metric):
+    """Bucketed distribution of observed values"""
+    kind = "histogram"
+
+    def __init__(self, *args, buckets: tuple[float, ...] = DEFAULT_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [bucket counts..., +Inf count], sum
+        self._series: dict[tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels):
+        self._observe_key(self._key(labels), value)
+
+    def time(self, **labels) -> "_Timer":
+        """Observe the wall-clock duration of a ``with`` block."""
+        return _Timer(self, self._key(labels))
+
+    def _observe_key(self, key: tuple[str, ...], value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = [[0] * (len(self.buckets) + 1), 0.0]
+                self._series[key] = series
+            series[0][index] += 1
+            series[1] += value
+
+    def count(self, **labels) -> int:
+        series = self._series.get(self._key(labels))
+        return sum(series[0]) if series else 0
+
+    def snapshot(self) -> dict[tuple[str, ...], tuple[int, float]]:
+        """(count, sum) per label set, e.g. for benchmark stage breakdowns."""
+        with self._lock:
+            return {key: (sum(s[0]), s[1]) for key, s in self._series.items()}
+
+    def _samples(self) -> list[str]:
+        with self._lock:
+            items = sorted((k, (list(s[0]), s[1])) for k, s in self._series.items())
+        lines = []
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+
+class _Timer:
+    """Context manager recording one span into a histogram (cheaper than a generator)"""
+
+    __slots__ = ("_histogram", "_key", "_start")
+
+    def __init__(self, histogram: Histogram, key: tuple[str, ...]):
+        self._histogram = histogram
+        self._key = key
+        self._start = 0.0
+
+    def __enter__(self) -> "_Timer":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._histogram._observe_key(self._key, time.perf_counter() - self._start)
+        return False
+
+
+class _StageTimer(_Timer):
+    """_Timer that also adds the span to the current request's timings"""
+
+    __slots__ = ()
+
+    def __exit__(self, *exc_info):
+        elapsed = time.perf_counter() - self._start
+        self._histogram._observe_key(self._key, elapsed)
+        add_timing(self._key[0], elapsed)
+        return False
+
+
+class Registry:
+    """Collection of metrics rendered together"""
+
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+STAGE_SECONDS: Histogram = registry.register(Histogram(
+    "pathfinder_stage_duration_seconds",
+    "Time spent in each pipeline stage",
+    ("stage",),
+))
+CACHE_REQUESTS: Counter = registry.register(Counter(
+    "pathfinder_cache_requests_total",
+    "Cache lookups by cache and result (hit/miss)",
+    ("cache", "result"),
+))
+UPSTREAM_ERRORS: Counter = registry.register(Counter(
+    "pathfinder_upstream_errors_total",
+    "Failed calls to external services by kind (error/timeout)",
+    ("service", "kind"),
+))
+LEXICAL_REQUESTS: Counter = registry.register(Counter(
+    "pathfinder_lexical_fast_path_total",
+    "Prompts answered by the lexical fast path (exact/near_exact) or sent to dense search (miss)",
+    ("result",),
+))
+CIRCUIT_STATE: Gauge = registry.register(Gauge(
+    "pathfinder_circuit_state",
+    "Upstream circuit breaker state (0 closed, 1 half-open, 2 open)",
+    ("service",),
+))
+COALESCED_CALLS: Counter = registry.register(Counter(
+    "pathfinder_coalesced_calls_total",
+    "Upstream calls answered by an identical call already in flight",
+    ("service",),
+))
+ADMISSIONS: Counter = registry.register(Counter(
+    "pathfinder_admission_decisions_total",
+    "Admission decisions per endpoint (run/degrade/reject)",
+    ("endpoint", "decision"),
+))
+QUEUE_DELAY: Histogram = registry.register(Histogram(
+    "pathfinder_queue_delay_seconds",
+    "Time requests waited for a pipeline worker",
+    ("endpoint",),
+))
+IN_FLIGHT: Gauge = registry.register(Gauge(
+    "pathfinder_requests_in_flight",
+    "Requests currently being processed",
+    ("endpoint",),
+))
+GEMINI_TOKENS: Histogram = registry.register(Histogram(
+    "pathfinder_gemini_tokens",
+    "Tokens per Gemini call (reported usage, else estimated) by kind (prompt/response)",
+    ("kind",),
+    buckets=(32, 64, 128, 256, 384, 512, 768, 1024, 2048, 4096),
+))
+GEMINI_PROMPTS_TRIMMED: Counter = registry.register(Counter(
+    "pathfinder_gemini_prompts_trimmed_total",
+    "Gemini prompts whose facts were trimmed to the input token budget",
+))
+LOG_RECORDS_DROPPED: Counter = registry.register(Counter(
+    "pathfinder_log_records_dropped_total",
+    "Log records dropped because the log writer queue was full",
+))
+
+
+def stage(name: str) -> _Timer:
+    """Time a pipeline stage: ``with stage("search"): ...``"""
+    return _StageTimer(STAGE_SECONDS, STAGE_SECONDS._key({"stage": name}))
+
+
+def record_cache(cache: str, hit: bool):
+    CACHE_REQUESTS.inc(cache=cache, result="hit" if hit else "miss")
+
+
+def record_lexical(result: str):
+    LEXICAL_REQUESTS.inc(result=result)
+
+
+_CIRCUIT_STATES = {"closed": 0, "half_open": 1, "open": 2}
+
+
+def record_circuit_state(service: str, state: str):
+    CIRCUIT_STATE.set(_CIRCUIT_STATES.get(state, 0), service=service)
+
+
+def record_coalesced(service: str):
+    COALESCED_CALLS.inc(service=service)
+
+
+def record_admission(endpoint: str, decision: str):
+    ADMISSIONS.inc(endpoint=endpoint, decision=decision)
+
+
+def record_queue_delay(endpoint: str, seconds: float):
+    QUEUE_DELAY.observe(seconds, endpoint=endpoint)
+
+
+def record_generation(prompt_tokens: int, response_tokens: int):
+    GEMINI_TOKENS.observe(prompt_tokens, kind="prompt")
+    GEMINI_TOKENS.observe(response_tokens, kind="response")
+
+
+def record_upstream_error(service: str, error: BaseException):
+    """Count an upstream failure, separating timeouts from other errors."""
+    name = type(error).__name__.lower()
+    is_timeout = isinstance(error, TimeoutError) or "timeout" in name or "timed out" in str(error).lower()
+    UPSTREAM_ERRORS.inc(service=service, kind="timeout" if is_timeout else "error")
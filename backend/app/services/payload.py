@@ -0,0 +1,46 @@
+"""
+Precompressed payloads for cacheable GET endpoints
+Serializes a JSON document (or takes a binary body) once and keeps gzip/brotli
+variants plus a strong ETag
+"""
+import gzip
+import hashlib
+import json
+from typing import Optional
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip is always available
+    brotli = None
+
+
+class CompressedPayload:
+    """A serialized JSON document (or binary body) with its precompressed variants"""
+
+    __slots__ = ("body", "gzip", "br", "etag", "media_type")
+
+    def __init__(self, document: dict | bytes, version: str, media_type: str = "application/json",
+                 gzip_level: int = 9, brotli_quality: int = 11):
+        if isinstance(document, bytes):
+            self.body = document
+        else:
+            self.body = json.dumps(
+                document, ensure_ascii=False, separators=(",", ":")
+            ).encode("utf-8")
+        self.media_type = media_type
+        self.gzip = gzip.compress(self.body, compresslevel=gzip_level, mtime=0)
+        self.br = brotli.compress(self.body, quality=brotli_quality) if brotli is not None else None
+        digest = hashlib.md5(self.body).hexdigest()[:16]
+        self.etag = f'"{version}-{digest}"'
+
+    def encoded(self, accept_encoding: str) -> tuple[bytes, Optional[str]]:
+        """Pick the smallest encoding the client accepts."""
+        accepted = {
+            token.split(";")[0].strip().lower()
+            for token in (accept_encoding or "").split(",")
+        }
+        if self.br is not None and "br" in accepted:
+            return self.br, "br"
+        if "gzip" in accepted:
+            return self.gzip, "gzip"
+        return self.body, None
@@ -3,7 +3,6 @@ Pathfinder AI Pipeline - RAG-based tourism assistant for Catanduanes
 Uses sentence-transformers for embeddings with simple cosine similarity search
 Compatible with Python 3.12+ including 3.14
 """
-import json
 import os
 import re
 import uuid
@@ -11,47 +10,178 @@ import time
 import hashlib
 import pickle
 import math
+import threading
 from pathlib import Path
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import TYPE_CHECKING, Iterator, Optional
 
 import numpy as np
 import yaml
-import requests
 from dotenv import load_dotenv
-from deep_translator import GoogleTranslator
-from better_profanity import profanity
-from sentence_transformers import SentenceTransformer
 from loguru import logger
 
+from .places_index import PlacesIndex
+from .profanity_filter import ProfanityFilter
+from .answer_groups import group_answers
+from .answer_store import AnswerStore, store_version
+from .semantic_cache import SemanticCache
+from .embedding_service import DEFAULT_SOCKET, EmbeddingClient
+from .ingest import ingest_dataset, iter_documents, iter_spooled, open_embeddings
+from .document_table import DocumentTable
+from .fuzzy_index import FuzzyIndex
+from .retrieval_bundle import RetrievalBundle
+from .prompt_budget import PromptBudget
+from .lru import LRUCache
+from .hot_queries import normalize_prompt
+from .lexical_index import LexicalIndex, LexicalMatch
+from .resilience import CircuitBreaker, CircuitOpenError, SingleFlight, call_with_timeout
+from .request_context import submit
+from .metrics import (
+    stage, record_cache, record_upstream_error, record_lexical, record_circuit_state, record_coalesced,
+    record_generation, GEMINI_PROMPTS_TRIMMED
+)
+
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
+
+# Heavy backends (torch via sentence_transformers, deep_translator, requests,
+# google.generativeai) are imported on first use, not at module load, so the
+# web app, workers and CLI tools that never touch them start fast.
+# Module attribute so tests/benchmarks can substitute a stand-in translator.
+GoogleTranslator = None
+
+
+def _google_translator():
+    """deep_translator.GoogleTranslator, imported on first translation."""
+    global GoogleTranslator
+    if GoogleTranslator is None:
+        from deep_translator import GoogleTranslator as translator_class
+        GoogleTranslator = translator_class
+    return GoogleTranslator
+
 
 class SimpleVectorStore:
     """Simple in-memory vector store using cosine similarity"""
     
-    def __init__(self, model_name: str = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"):
-        logger.info(f"Loading embedding model: {model_name}")
-        self.model = SentenceTransformer(model_name)
-        self.documents: list[dict] = []
+    def __init__(self, model_name: str = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2",
+                 answer_similarity: float = 0.85, embedding_client: Optional[EmbeddingClient] = None):
+        self.model_name = model_name
+        self._model: Optional["SentenceTransformer"] = None
+        # Shared embedding service; the in-process model is the fallback while its circuit is open
+        self.embedding_client = embedding_client
+        self._service_breaker = CircuitBreaker(
+            "embedding_service", failure_rate=0.5, min_calls=1, open_seconds=30,
+            on_state_change=record_circuit_state
+        )
+        if embedding_client is None:
+            # Load eagerly so a preloading master (run.py --prod) shares it with workers
+            self._model = self._load_model()
+        self.answer_similarity = answer_similarity
+        # Columnar, interned metadata; rows are materialized only for query hits
+        self.table = DocumentTable.empty()
         self.embeddings: Optional[np.ndarray] = None
+        # Canonical answer id per document (identical / near-identical answers share one)
+        self.answer_groups: Optional[np.ndarray] = None
+        # Query text -> embedding (set by the Pipeline; None disables)
+        self.query_cache: Optional[LRUCache] = None
         
+    def _load_model(self) -> "SentenceTransformer":
+        from sentence_transformers import SentenceTransformer
+
+        logger.info(f"Loading embedding model: {self.model_name}")
+        return SentenceTransformer(self.model_name)
+
+    @property
+    def model(self) -> "SentenceTransformer":
+        """In-process model (loaded on first use when a shared service is configured)."""
+        if self._model is None:
+            self._model = self._load_model()
+        return self._model
+
     def add_documents(self, documents: list[str], metadatas: list[dict]):
         """Add documents with their metadata"""
         logger.info(f"Embedding {len(documents)} documents...")
         embeddings = self.model.encode(documents, show_progress_bar=True, convert_to_numpy=True)
         
-        self.documents = [
-            {"text": doc, "metadata": meta}
-            for doc, meta in zip(documents, metadatas)
-        ]
+        self.table = DocumentTable.from_records(zip(documents, metadatas))
         self.embeddings = embeddings
+        self._group_answers()
         logger.info(f"Added {len(documents)} documents to vector store")
+
+    def build(self, dataset_path: str, work_dir: str, dataset_hash: Optional[str] = None,
+              batch_size: int = 256, workers: int = 0, min_parallel_records: int = 5000):
+        """Stream a dataset into the store with batched (multi-process) encoding, see ingest.py"""
+        try:
+            result = ingest_dataset(
+                dataset_path, work_dir, self.model_name, dataset_hash=dataset_hash,
+                batch_size=batch_size, workers=workers, min_parallel_records=min_parallel_records,
+                encode=lambda texts: self.model.encode(texts, convert_to_numpy=True)
+            )
+        except FileNotFoundError:
+            logger.error(f"Dataset not found: {dataset_path}")
+            raise RuntimeError(f"Dataset not found: {dataset_path}")
+        except ValueError as e:
+            logger.error(f"Invalid JSON in dataset: {e}")
+            raise RuntimeError(f"Invalid JSON in dataset: {e}")
+        
+        self.table = DocumentTable.from_records(iter_spooled(result.documents_path))
+        self.embeddings = open_embeddings(result)
+        self._group_answers()
+        logger.info(f"Added {len(self.table)} documents to vector store")
+
+    def _group_answers(self):
+        """Compute canonical answer ids once at build/load time."""
+        groups = group_answers(
+            self.table.column("answer"),
+            threshold=self.answer_similarity
+        )
+        self.answer_groups = np.array(groups, dtype=np.int32)
+        logger.info(f"Grouped {len(groups)} documents into {len(set(groups))} distinct answers")
+        
+    def encode(self, texts: list[str]) -> np.ndarray:
+        """Embed query texts, reusing cached embeddings and encoding the rest in one batch."""
+        if self.query_cache is None or not texts:
+            return self._encode(texts)
+        cached = [self.query_cache.get(text) for text in texts]
+        missing = list(dict.fromkeys(text for text, vector in zip(texts, cached) if vector is None))
+        record_cache("embedding", hit=not missing)
+        if missing:
+            encoded = dict(zip(missing, self._encode(missing)))
+            for text, vector in encoded.items():
+                self.query_cache.put(text, vector)
+            cached = [encoded[text] if vector is None else vector for text, vector in zip(texts, cached)]
+        return np.stack(cached)
+
+    def _encode(self, texts: list[str]) -> np.ndarray:
+        """Embed texts in one batched model call (shared service first, if configured)."""
+        with stage("encode"):
+            if self.embedding_client is not None and self._service_breaker.allow():
+                try:
+                    vectors = self.embedding_client.encode(texts, self.model_name)
+                    self._service_breaker.record_success()
+                    return vectors
+                except Exception as e:
+                    # Socket, protocol or payload errors alike: the model is still available here
+                    self._service_breaker.record_failure()
+                    record_upstream_error("embedding_service", e)
+                    logger.warning(f"Embedding service unavailable, encoding in-process: {e}")
+            return self.model.encode(texts, convert_to_numpy=True)
+
+    def query(self, query_text: str, n_results: int = 3, distinct_answers: bool = False,
+              query_embedding: Optional[np.ndarray] = None) -> dict:
+        """
+        Query the vector store using cosine similarity.
         
-    def query(self, query_text: str, n_results: int = 3) -> dict:
-        """Query the vector store using cosine similarity"""
-        if self.embeddings is None or len(self.documents) == 0:
+        With distinct_answers, only the best-ranked document of each answer group
+        is returned, so n_results means n different answers. A precomputed
+        query_embedding (e.g. from a batched encode) skips encoding query_text.
+        """
+        if self.embeddings is None or len(self.table) == 0:
             return {"documents": [[]], "metadatas": [[]], "distances": [[]]}
         
         # Encode query
-        query_embedding = self.model.encode([query_text], convert_to_numpy=True)[0]
+        if query_embedding is None:
+            query_embedding = self.encode([query_text])[0]
         
         # Compute cosine similarity
         similarities = np.dot(self.embeddings, query_embedding) / (
@@ -62,19 +192,32 @@ class SimpleVectorStore:
         distances = 1 - similarities
         
         # Get top n results
-        top_indices = np.argsort(distances)[:n_results]
+        if distinct_answers and self.answer_groups is not None:
+            top_indices = []
+            seen_groups = set()
+            for i in np.argsort(distances):
+                group = self.answer_groups[i]
+                if group not in seen_groups:
+                    seen_groups.add(group)
+                    top_indices.append(i)
+                    if len(top_indices) == n_results:
+                        break
+        else:
+            top_indices = np.argsort(distances)[:n_results]
         
         return {
-            "documents": [[self.documents[i]["text"] for i in top_indices]],
-            "metadatas": [[self.documents[i]["metadata"] for i in top_indices]],
+            "documents": [[self.table.text(i) for i in top_indices]],
+            "metadatas": [[self.table.metadata(i) for i in top_indices]],
             "distances": [[distances[i] for i in top_indices]]
         }
     
     def save(self, path: str):
         """Save the vector store to disk"""
         data = {
-            "documents": self.documents,
-            "embeddings": self.embeddings
+            "table": self.table.state(),
+            "embeddings": self.embeddings,
+            "answer_groups": self.answer_groups,
+            "answer_similarity": self.answer_similarity
         }
         with open(path, 'wb') as f:
             pickle.dump(data, f)
@@ -85,22 +228,48 @@ class SimpleVectorStore:
         try:
             with open(path, 'rb') as f:
                 data = pickle.load(f)
-            self.documents = data["documents"]
+            if "table" in data:
+                self.table = DocumentTable.from_state(data["table"])
+            else:
+                # Stores saved before the columnar table existed
+                self.table = DocumentTable.from_documents(data["documents"])
             self.embeddings = data["embeddings"]
-            logger.info(f"Loaded vector store from {path} ({len(self.documents)} documents)")
+            self.answer_groups = data.get("answer_groups")
+            if self.answer_groups is None or data.get("answer_similarity") != self.answer_similarity:
+                # Stores saved before grouping existed, or with another threshold
+                self._group_answers()
+            logger.info(f"Loaded vector store from {path} ({len(self.table)} documents)")
             return True
         except Exception as e:
             logger.warning(f"Could not load vector store: {e}")
             return False
 
 
+def read_dataset(dataset_path: str) -> tuple[list[str], list[dict]]:
+    """Read a dataset (JSON array or JSON Lines) into parallel lists of documents (questions) and metadata."""
+    documents = []
+    metadatas = []
+    try:
+        for document, metadata in iter_documents(dataset_path):
+            documents.append(document)
+            metadatas.append(metadata)
+    except FileNotFoundError:
+        logger.error(f"Dataset not found: {dataset_path}")
+        raise RuntimeError(f"Dataset not found: {dataset_path}")
+    except ValueError as e:
+        logger.error(f"Invalid JSON in dataset: {e}")
+        raise RuntimeError(f"Invalid JSON in dataset: {e}")
+
+    return documents, metadatas
+
+
 class Pipeline:
     def __init__(self, dataset_path: str = None, db_path: str = None, config_path: str = None):
         """
         Initialize the Pathfinder AI Pipeline.
         
         Args:
-            dataset_path: Path to dataset.json
+            dataset_path: Path to the dataset (JSON array or JSON Lines; default ingest.dataset in config)
             db_path: Path for vector store storage
             config_path: Path to config.yaml
         """
@@ -108,33 +277,53 @@ class Pipeline:
         base_dir = Path(__file__).parent
         app_dir = base_dir.parent
         
-        # Set default paths relative to app directory
-        if dataset_path is None:
-            dataset_path = str(app_dir / "data" / "dataset.json")
+        # Set default paths relative to app directory (the dataset comes from config)
         if db_path is None:
             db_path = str(app_dir / "data" / "vector_store")
         if config_path is None:
             config_path = str(app_dir / "data" / "config.yaml")
         
-        self.db_path = db_path
         self.config = self.load_config(config_path)
+        if dataset_path is None:
+            dataset_path = str(app_dir / "data" / self.config.get('ingest', {}).get('dataset', 'dataset.json'))
+        self.db_path = db_path
+        self.dataset_path = dataset_path
+        self.config_path = config_path
         logger.info(f"Loaded config: {self.config['system']['welcome_message']}")
         
+        # Precomputed places payload (serialized once per config version)
+        self.places_index = PlacesIndex(self.config.get('places', {}))
+        
         load_dotenv()
         
         # Internet tracking
         self.internet_status = None
         self.last_internet_check = 0
         
+        # Circuit breakers, timeouts and call coalescing for upstream services
+        self.setup_resilience()
+        
         # Setup Gemini
         self.setup_gemini()
         
-        # Setup profanity filter
-        profanity.load_censor_words()
-        profanity.add_censor_words(self.config.get('profanity', []))
+        # Setup profanity filter (compiled once, linear-time screening)
+        self.profanity_filter = ProfanityFilter(self.config.get('profanity', []))
+        
+        # Typo-tolerant place/topic resolution (built once from places and keywords)
+        self._build_fuzzy_index()
+        
+        # Exact-text caches for translations and query embeddings (prefilled from hot queries)
+        query_cache = self.config.get('query_cache', {})
+        self.translation_cache = LRUCache(query_cache.get('translations', 1024))
         
         # Initialize vector store
-        self.vector_store = SimpleVectorStore()
+        self.vector_store = SimpleVectorStore(
+            answer_similarity=self.config['rag'].get('answer_similarity', 0.85),
+            embedding_client=self._embedding_client()
+        )
+        embedding_cache_size = query_cache.get('embeddings', 1024)
+        if embedding_cache_size > 0:
+            self.vector_store.query_cache = LRUCache(embedding_cache_size)
         
         # Check if we need to rebuild the database
         os.makedirs(db_path, exist_ok=True)
@@ -156,11 +345,19 @@ class Pipeline:
                 self._build_vector_store(dataset_path, vector_store_file, hash_file, current_hash)
         else:
             self._build_vector_store(dataset_path, vector_store_file, hash_file, current_hash)
+        
+        self._build_lexical_index()
+        self._load_answer_store(current_hash)
+        self._setup_response_cache()
+        
+        # Client-side retrieval bundle (built on first request)
+        self._retrieval_bundle: Optional[RetrievalBundle] = None
+        self._retrieval_bundle_lock = threading.Lock()
     
     def _build_vector_store(self, dataset_path: str, vector_store_file: str, hash_file: str, current_hash: str):
         """Build the vector store from dataset"""
         logger.info("Building vector store from dataset...")
-        self.load_dataset(dataset_path)
+        self.load_dataset(dataset_path, current_hash)
         self.vector_store.save(vector_store_file)
         
         # Save hash
@@ -185,14 +382,69 @@ class Pipeline:
         hasher = hashlib.md5()
         try:
             with open(dataset_path, 'rb') as f:
-                buf = f.read()
-                hasher.update(buf)
+                for chunk in iter(lambda: f.read(1 << 20), b''):
+                    hasher.update(chunk)
             return hasher.hexdigest()
         except FileNotFoundError:
             return None
     
+    def setup_resilience(self):
+        """Create per-service circuit breakers, timeouts and single-flight groups."""
+        resilience = self.config.get('resilience', {})
+        self.breakers: dict[str, CircuitBreaker] = {}
+        self.upstream_timeouts: dict[str, float] = {}
+        self.flights: dict[str, SingleFlight] = {}
+        default_timeouts = {'translator': 3.0, 'gemini': 10.0}
+        
+        for service, default_timeout in default_timeouts.items():
+            options = resilience.get(service, {})
+            self.upstream_timeouts[service] = options.get('timeout', default_timeout)
+            self.breakers[service] = CircuitBreaker(
+                service,
+                failure_rate=options.get('failure_rate', 0.5),
+                min_calls=options.get('min_calls', 5),
+                window_seconds=options.get('window_seconds', 60),
+                open_seconds=options.get('open_seconds', 30),
+                half_open_probes=options.get('half_open_probes', 1),
+                on_state_change=record_circuit_state
+            )
+            record_circuit_state(service, CircuitBreaker.CLOSED)
+            self.flights[service] = SingleFlight()
+        
+        self._upstream_pool = ThreadPoolExecutor(
+            max_workers=resilience.get('max_upstream_threads', 16),
+            thread_name_prefix="upstream"
+        )
+
+    def _embedding_client(self) -> Optional[EmbeddingClient]:
+        """Client for the shared embedding service, if enabled in config."""
+        service = self.config.get('embedding_service', {})
+        if not service.get('enabled', False):
+            return None
+        try:
+            client = EmbeddingClient(service.get('socket', DEFAULT_SOCKET), timeout=service.get('timeout', 2.0))
+        except OSError as e:
+            logger.warning(f"Embedding service disabled: {e}")
+            return None
+        logger.info(f"Using shared embedding service at {client.socket_path}")
+        return client
+
+    def _call_upstream(self, service: str, fn):
+        """Call an upstream service through its circuit breaker with the configured timeout."""
+        return self.breakers[service].call(
+            lambda: call_with_timeout(self._upstream_pool, fn, self.upstream_timeouts[service])
+        )
+
     def setup_gemini(self):
         """Setup Google Gemini for natural language generation."""
+        gemini = self.config['gemini']
+        # Prompt input budget (facts are ranked and trimmed to fit)
+        self.prompt_budget = PromptBudget(
+            gemini['prompt_template'],
+            max_input_tokens=gemini.get('max_input_tokens', 0),
+            chars_per_token=gemini.get('chars_per_token', 4.0),
+            min_fact_tokens=gemini.get('min_fact_tokens', 32),
+        )
         try:
             import google.generativeai as genai
             api_key = os.getenv("GEMINI_API_KEY")
@@ -202,60 +454,176 @@ class Pipeline:
                 return
             
             genai.configure(api_key=api_key)
-            self.gemini = genai.GenerativeModel(self.config['gemini']['model_name'])
+            # Output limits bound generation time
+            generation_config = {}
+            if gemini.get('max_output_tokens'):
+                generation_config['max_output_tokens'] = gemini['max_output_tokens']
+            if gemini.get('stop_sequences'):
+                generation_config['stop_sequences'] = list(gemini['stop_sequences'])
+            self.gemini = genai.GenerativeModel(gemini['model_name'], generation_config=generation_config or None)
             self.has_gemini = True
             logger.info("Gemini setup successful")
         except Exception as e:
             logger.warning(f"Gemini setup failed: {e}")
             self.has_gemini = False
 
-    def load_dataset(self, dataset_path: str):
-        """Load Q&A dataset into vector store."""
-        try:
-            with open(dataset_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-        except FileNotFoundError:
-            logger.error(f"Dataset not found: {dataset_path}")
-            raise RuntimeError(f"Dataset not found: {dataset_path}")
-        except json.JSONDecodeError as e:
-            logger.error(f"Invalid JSON in dataset: {e}")
-            raise RuntimeError(f"Invalid JSON in dataset: {e}")
+    def load_dataset(self, dataset_path: str, dataset_hash: str | None = None):
+        """Stream the Q&A dataset into the vector store (resumes an interrupted build)."""
+        ingest = self.config.get('ingest', {})
+        self.vector_store.build(
+            dataset_path,
+            os.path.join(self.db_path, "ingest"),
+            dataset_hash=dataset_hash,
+            batch_size=ingest.get('batch_size', 256),
+            workers=ingest.get('workers', 0),
+            min_parallel_records=ingest.get('min_parallel_records', 5000)
+        )
+        logger.info(f"Loaded {len(self.vector_store.table)} Q&A pairs into vector store")
 
-        documents = []
-        metadatas = []
+    def _build_lexical_index(self):
+        """Build the exact/BM25 question index from the (built or loaded) vector store."""
+        lexical = self.config.get('lexical', {})
+        self.lexical_index = LexicalIndex(
+            self.vector_store.table.column("question"),
+            self.vector_store.table.column("answer"),
+            near_exact_jaccard=lexical.get('near_exact_jaccard', 0.8),
+            bm25_margin=lexical.get('bm25_margin', 1.5),
+        )
+        logger.info(f"Built lexical index over {len(self.lexical_index)} questions")
 
-        for idx, item in enumerate(data):
-            if 'input' not in item or 'output' not in item:
-                logger.warning(f"Skipping invalid entry at index {idx}")
-                continue
-                
-            documents.append(item['input'])
-            metadatas.append({
-                "question": item['input'],
-                "answer": item['output'],
-                "title": item.get('title', 'General Info'),
-                "topic": item.get('topic', 'General'),
-                "summary_offline": item.get('summary_offline', item['output'])
-            })
-
-        self.vector_store.add_documents(documents, metadatas)
-        logger.info(f"Loaded {len(documents)} Q&A pairs into vector store")
+    def _build_fuzzy_index(self):
+        """Symmetric-delete index over place names and topic keywords (None when disabled)."""
+        fuzzy = self.config.get('fuzzy', {})
+        self.fuzzy_index = None
+        if not fuzzy.get('enabled', True):
+            return
+        self.fuzzy_index = FuzzyIndex(
+            list(self.config.get('places', {})) + self.config.get('protected_places', []),
+            [word for words in self.config.get('keywords', {}).values() for word in words],
+            max_distance=fuzzy.get('max_distance', 2),
+            min_length=fuzzy.get('min_length', 5),
+            keyword_min_length=fuzzy.get('keyword_min_length', 8),
+            chars_per_edit=fuzzy.get('chars_per_edit', 5),
+        )
+
+    def resolve_typos(self, user_input: str) -> str:
+        """Rewrite misspelled place names and topic keywords to their configured spelling."""
+        if self.fuzzy_index is None:
+            return user_input
+        with stage("resolve_typos"):
+            resolved, corrections = self.fuzzy_index.resolve(user_input)
+        if corrections:
+            logger.debug(f"Resolved misspellings: {corrections}")
+        return resolved
+
+    def _load_answer_store(self, dataset_hash: str | None):
+        """Load pre-generated replies matching the current dataset and Gemini settings."""
+        answers = self.config.get('answers', {})
+        self.answer_store = AnswerStore(
+            os.path.join(self.db_path, answers.get('file', 'answers.json')),
+            store_version(dataset_hash, self.config['gemini'])
+        )
+        if answers.get('enabled', True):
+            self.answer_store.load()
+        self.non_english_markers = frozenset(
+            word.lower() for word in answers.get('non_english_markers', [])
+        )
+
+    def is_non_english(self, text: str) -> bool:
+        """Cheap language hint: does the text contain a configured non-English marker word?"""
+        return bool(self.non_english_markers & set(re.findall(r"\w+", text.lower())))
+
+    def _setup_response_cache(self):
+        """Semantic (embedding-similarity) cache of final replies."""
+        cache = self.config.get('response_cache', {})
+        self.response_cache = None
+        if not cache.get('enabled', True) or self.vector_store.embeddings is None:
+            return
+        self.response_cache = SemanticCache(
+            dim=self.vector_store.embeddings.shape[1],
+            max_entries=cache.get('max_entries', 1024),
+            similarity=cache.get('similarity', 0.92),
+            eviction=cache.get('eviction', 'lru'),
+            version=self._cache_version()
+        )
+
+    def retrieval_bundle(self) -> RetrievalBundle:
+        """Quantized embeddings, answers, places and keywords for client-side search (built once)."""
+        with self._retrieval_bundle_lock:
+            if self._retrieval_bundle is None:
+                bundle = self.config.get('client_bundle', {})
+                with stage("retrieval_bundle"):
+                    self._retrieval_bundle = RetrievalBundle(
+                        self.vector_store.table,
+                        self.vector_store.embeddings,
+                        self.vector_store.answer_groups,
+                        model_name=self.vector_store.model_name,
+                        max_distance=self.config['rag']['confidence_threshold'],
+                        places=self.places_index.places,
+                        keywords=self.config.get('keywords', {}),
+                        reply=self.answer_store.get if bundle.get('include_replies', True) else None,
+                    )
+            return self._retrieval_bundle
+
+    def materialized_reply(self, question: str, fact: str, use_gemini: bool = True) -> Optional[str]:
+        """
+        Pre-generated reply for this fact, if it should be served.
+        
+        Replies were generated in English, so when Gemini is reachable, questions
+        with non-English marker words (or serve_online: false) still go live.
+        """
+        if not len(self.answer_store):
+            return None
+        reply = self.answer_store.get(fact)
+        record_cache("materialized", hit=reply is not None)
+        if reply is None:
+            return None
+        
+        answers = self.config.get('answers', {})
+        prefer_live = not answers.get('serve_online', True) or self.is_non_english(question)
+        if prefer_live and use_gemini and self.gemini_available():
+            return None
+        return reply
+
+    def lexical_match(self, user_input: str) -> Optional[LexicalMatch]:
+        """Return a decisive lexical match for single-topic questions, else None."""
+        if not self.config.get('lexical', {}).get('enabled', True):
+            return None
+        match = self.lexical_index.match(user_input)
+        if match is not None:
+            topics = self.extract_keywords(user_input)
+            # Multi-topic prompts need the per-topic search, not a single answer
+            if len(topics) > 1 and topics != ['general']:
+                match = None
+        record_lexical(match.kind if match else "miss")
+        return match
+
+    def gemini_available(self) -> bool:
+        """Gemini is configured, its circuit is not open and we are online."""
+        # An open circuit skips straight to the offline backup (no probe, no wait)
+        return self.has_gemini and self.breakers['gemini'].state != CircuitBreaker.OPEN and self.checkint()
 
     def checkint(self) -> bool:
         """Check internet connectivity with caching."""
+        import requests
+        
         current_time = time.time()
         
         if self.internet_status is not None and \
            (current_time - self.last_internet_check) < self.config['internet']['cache_duration']:
+            record_cache("connectivity", hit=True)
             return self.internet_status
         
+        record_cache("connectivity", hit=False)
         try:
-            requests.get(
-                self.config['internet']['test_url'],
-                timeout=self.config['internet']['timeout']
-            )
+            with stage("checkint"):
+                requests.get(
+                    self.config['internet']['test_url'],
+                    timeout=self.config['internet']['timeout']
+                )
             self.internet_status = True
-        except (requests.ConnectionError, requests.Timeout):
+        except (requests.ConnectionError, requests.Timeout) as e:
+            record_upstream_error("connectivity", e)
             self.internet_status = False
         
         self.last_internet_check = current_time
@@ -276,9 +644,21 @@ class Pipeline:
         return found if found else ['general']
         
     def protect(self, user_input: str) -> str:
-        """Protect place names during translation."""
+        """Protect place names during translation (cached; identical concurrent prompts share one call)."""
+        key = normalize_prompt(user_input)
+        cached = self.translation_cache.get(key)
+        record_cache("translation", hit=cached is not None)
+        if cached is not None:
+            return cached
+        translated, shared = self.flights['translator'].do(user_input, lambda: self._protect(user_input))
+        if shared:
+            record_coalesced("translator")
+        return translated
+
+    def _protect(self, user_input: str) -> str:
         temp = user_input
         markers = {}
+        translated = False
 
         for place_name in self.config.get('protected_places', []):
             if place_name.lower() in temp.lower():
@@ -294,19 +674,30 @@ class Pipeline:
 
         # Translate the rest
         try:
-            temp = GoogleTranslator(source='auto', target='en').translate(temp)
+            with stage("translate"):
+                temp = self._call_upstream(
+                    "translator", lambda: _google_translator()(source='auto', target='en').translate(temp)
+                )
+            translated = True
             logger.debug(f"Translated: '{user_input}' → '{temp}'")
+        except CircuitOpenError:
+            logger.debug("Translator circuit open, using untranslated text")
         except Exception as e:
+            record_upstream_error("translator", e)
             logger.debug(f"Translation failed: {e}")
 
         # Restore place names
         for marker, place_input in markers.items():
             temp = temp.replace(marker, place_input)
 
+        # Untranslated fallbacks are not cached, so the next call retries the translator
+        if translated and temp:
+            self.translation_cache.put(normalize_prompt(user_input), temp)
         return temp
 
-    def search_multi_topic(self, topics: list[str], translated_query: str, results_per_topic: int = 1) -> list[str]:
-        """Search vector store for multiple topics."""
+    def search_multi_topic(self, topics: list[str], translated_query: str, results_per_topic: int = 1,
+                           query_embeddings: Optional[dict[str, np.ndarray]] = None) -> list[str]:
+        """Search vector store for multiple topics (optionally with pre-encoded topics)."""
         all_results = []
         seen_texts = set()  # Track seen texts to prevent duplicates
         n_results = self.config['rag']['search_results']
@@ -314,7 +705,12 @@ class Pipeline:
         for topic in topics:
             logger.debug(f"Searching for topic: '{topic}'")
 
-            results = self.vector_store.query(topic, n_results=n_results)
+            results = self.vector_store.query(
+                topic,
+                n_results=n_results,
+                distinct_answers=True,
+                query_embedding=query_embeddings.get(topic) if query_embeddings else None
+            )
 
             if not results['documents'][0]:
                 logger.debug(f"No results found for topic: {topic}")
@@ -343,65 +739,28 @@ class Pipeline:
 
         return [r['text'] for r in all_results]
     
-    def _are_answers_similar(self, answer1: str, answer2: str, threshold: float = 0.85) -> bool:
-        """
-        Check if two answers are semantically similar using word overlap.
-        Returns True if they are similar enough to be considered duplicates.
-        """
-        # Normalize both answers
-        words1 = set(answer1.lower().strip().split())
-        words2 = set(answer2.lower().strip().split())
-        
-        # Remove common stop words for better comparison
-        stop_words = {'is', 'a', 'an', 'the', 'in', 'at', 'on', 'for', 'to', 'of', 'and', 'or', 'but', 'it', 'its'}
-        words1 = words1 - stop_words
-        words2 = words2 - stop_words
-        
-        if not words1 or not words2:
-            return False
-        
-        # Calculate Jaccard similarity (intersection over union)
-        intersection = len(words1 & words2)
-        union = len(words1 | words2)
-        similarity = intersection / union if union > 0 else 0
-        
-        return similarity >= threshold
-    
-    def search(self, question: str) -> str:
-        """Search for single question."""
+    def search(self, question: str, query_embedding: Optional[np.ndarray] = None) -> str:
+        """Search for single question (optionally with a pre-encoded query)."""
         logger.debug(f"Searching for: '{question}'")
         
-        results = self.vector_store.query(question, n_results=self.config['rag']['search_results'])
+        # Results are already one per answer group (duplicates merged at build time)
+        results = self.vector_store.query(
+            question,
+            n_results=self.config['rag']['search_results'],
+            distinct_answers=True,
+            query_embedding=query_embedding
+        )
         
         if not results['documents'][0]:
             return "I don't have information about that. Ask about beaches, food, or activities!"
         
         good_answers = []
-        seen_answers = set()  # Track seen answers to prevent exact duplicates
         
         for i, metadata in enumerate(results['metadatas'][0]):
             confidence = results['distances'][0][i]
             if confidence <= self.config['rag']['confidence_threshold']:
-                answer = metadata['answer']
-                # Normalize answer for exact comparison (strip whitespace, lower)
-                answer_normalized = answer.strip().lower()
-                
-                # Check for exact duplicate
-                if answer_normalized in seen_answers:
-                    continue
-                
-                # Check for semantic similarity with existing answers
-                is_similar = False
-                for existing_answer in good_answers:
-                    if self._are_answers_similar(answer, existing_answer):
-                        is_similar = True
-                        logger.debug(f"Skipping similar answer (similarity detected)")
-                        break
-                
-                if not is_similar:
-                    good_answers.append(answer)
-                    seen_answers.add(answer_normalized)
-                    logger.debug(f"Match {i+1} confidence: {confidence:.3f}")
+                good_answers.append(metadata['answer'])
+                logger.debug(f"Match {i+1} confidence: {confidence:.3f}")
         
         if not good_answers:
             return "I'm not sure about that. Can you rephrase or ask about Catanduanes tourism?"
@@ -414,37 +773,82 @@ class Pipeline:
         
         return " ".join(good_answers)
 
-    def make_natural(self, question: str, fact: str) -> str:
-        """Make response natural using Gemini or fallback."""
+    def generate_reply(self, question: str, fact: str) -> str:
+        """Phrase the fact with Gemini (raises if the call fails)."""
+        budgeted = self.prompt_budget.fit(question, fact)
+        if budgeted.fact != fact:
+            GEMINI_PROMPTS_TRIMMED.inc()
+            logger.debug(f"Trimmed facts to the prompt budget ({budgeted.dropped} sentence(s) dropped)")
+        prompt = self.config['gemini']['prompt_template'].format(
+            question=question,
+            fact=budgeted.fact
+        )
+        logger.debug(f"Facts being sent to Gemini: {budgeted.fact}")
         
-        if self.has_gemini and self.checkint():
+        # Identical concurrent prompts share one Gemini call
+        response_text, shared = self.flights['gemini'].do(
+            prompt, lambda: self._generate(prompt, budgeted.tokens, budgeted.dropped)
+        )
+        if shared:
+            record_coalesced("gemini")
+        
+        # Remove duplicate sentences from Gemini response
+        return self._deduplicate_sentences(response_text)
+
+    def _generate(self, prompt: str, estimated_tokens: int = 0, dropped: int = 0) -> str:
+        def call():
+            response = self.gemini.generate_content(prompt)
+            return response.text, getattr(response, "usage_metadata", None)
+        
+        start = time.perf_counter()
+        with stage("gemini"):
+            text, usage = self._call_upstream("gemini", call)
+        
+        # Reported usage when the API returns it, else the estimate
+        prompt_tokens = getattr(usage, "prompt_token_count", 0) or estimated_tokens \
+            or self.prompt_budget.estimate(prompt)
+        response_tokens = getattr(usage, "candidates_token_count", 0) or self.prompt_budget.estimate(text)
+        record_generation(prompt_tokens, response_tokens)
+        logger.bind(
+            prompt_chars=len(prompt),
+            prompt_tokens=prompt_tokens,
+            response_chars=len(text),
+            response_tokens=response_tokens,
+            facts_dropped=dropped,
+            duration_ms=round((time.perf_counter() - start) * 1000, 2),
+        ).info("gemini")
+        return text
+
+    def make_natural(self, question: str, fact: str, use_gemini: bool = True) -> tuple[str, str]:
+        """
+        Make response natural using a materialized reply, Gemini or fallback.
+        
+        Returns:
+            tuple: (reply, source) where source is "materialized", "gemini" or "offline"
+        """
+        
+        materialized = self.materialized_reply(question, fact, use_gemini)
+        if materialized is not None:
+            return materialized, "materialized"
+        
+        if use_gemini and self.gemini_available():
             try:
-                prompt = self.config['gemini']['prompt_template'].format(
-                    question=question,
-                    fact=fact
-                )
-                logger.debug(f"Facts being sent to Gemini: {fact}")
-                
-                response = self.gemini.generate_content(prompt)
-                response_text = response.text
-                
-                # Remove duplicate sentences from Gemini response
-                response_text = self._deduplicate_sentences(response_text)
-                
-                return response_text
-                
+                return self.generate_reply(question, fact), "gemini"
+            except CircuitOpenError:
+                logger.debug("Gemini circuit open, using offline backup")
             except Exception as e:
+                record_upstream_error("gemini", e)
                 logger.debug(f"Gemini error: {e}")
 
         if "don't have information" in fact.lower() or "not sure" in fact.lower():
             off_msg = self.config['offline']['off_message']
-            return off_msg.format(fact=fact)
+            return off_msg.format(fact=fact), "offline"
         
         backup = self.config['offline']['backup']
         response_text = backup.format(fact=fact)
         # Also deduplicate offline responses
         response_text = self._deduplicate_sentences(response_text)
-        return response_text
+        return response_text, "offline"
     
     def _deduplicate_sentences(self, text: str) -> str:
         """Remove duplicate sentences from text."""
@@ -540,36 +944,226 @@ class Pipeline:
     
     def check_profanity(self, text: str) -> bool:
         """Check for profanity in text."""
-        return profanity.contains_profanity(text)
+        return self.profanity_filter.contains_profanity(text)
         
-    def ask(self, user_input: str) -> tuple[str, list[dict]]:
+    PROFANITY_REPLY = (
+        "I am unable to process that language. Please ask your question politely so I can assist you with Catanduanes tourism."
+    )
+
+    def ask(self, user_input: str, degraded: bool = False) -> tuple[str, list[dict]]:
         """
         Main ask function with multi-topic support and natural responses.
         
+        Args:
+            user_input: The user's prompt
+            degraded: Skip Gemini and answer from materialized/offline replies (load shedding)
+        
         Returns:
             tuple: (natural_response: str, places: list[dict])
         """
-        if self.check_profanity(user_input):
-            return (
-                "I am unable to process that language. Please ask your question politely so I can assist you with Catanduanes tourism.",
-                []
-            )
-        
+        with stage("ask"):
+            return self._ask(user_input, degraded)
+
+    def _translate_and_route(self, user_input: str) -> tuple[str, list[str]]:
+        """Translate the prompt and detect its topics."""
         # Preprocess and Translate Input
-        convert = self.protect(user_input)
+        with stage("protect"):
+            convert = self.protect(user_input)
         
         # Extract keywords
-        topics = self.extract_keywords(convert)
+        with stage("extract_keywords"):
+            topics = self.extract_keywords(convert)
         logger.debug(f"Detected topics: {topics}")
-        
-        # Get facts from RAG
+        return convert, topics
+
+    @staticmethod
+    def _search_queries(convert: str, topics: list[str]) -> list[str]:
+        """Texts the dense search will embed for a routed prompt."""
+        if len(topics) > 1 and topics != ['general']:
+            return topics
+        return [convert]
+
+    def _retrieve(self, convert: str, topics: list[str],
+                  query_embeddings: Optional[dict[str, np.ndarray]] = None) -> str:
+        """Retrieve facts for a routed prompt with dense search."""
         if len(topics) > 1 and topics != ['general']:
             results_per_topic = self.config['rag'].get('results_per_topic', 3)
-            answers = self.search_multi_topic(topics, convert, results_per_topic)
-            fact = " ".join(answers) if answers else "I don't have info about those topics"
+            with stage("search_multi_topic"):
+                answers = self.search_multi_topic(topics, convert, results_per_topic, query_embeddings)
+            return " ".join(answers) if answers else "I don't have info about those topics"
+        
+        with stage("search"):
+            return self.search(convert, query_embeddings.get(convert) if query_embeddings else None)
+
+    def _screen(self, user_input: str) -> tuple[bool, Optional[LexicalMatch]]:
+        """
+        Profanity check and lexical fast path.
+        
+        Returns (refused, match): refused prompts get PROFANITY_REPLY, a match means
+        the lexical index answered, (False, None) means dense search is needed.
+        """
+        with stage("check_profanity"):
+            is_profane = self.check_profanity(user_input)
+        if is_profane:
+            return True, None
+        
+        # Verbatim / near-verbatim dataset questions skip translation and embedding
+        with stage("lexical_match"):
+            match = self.lexical_match(user_input)
+        
+        if match is not None:
+            logger.debug(f"Lexical {match.kind} match: row {match.row} (score={match.score:.2f})")
+        return False, match
+
+    def _lexical_fact(self, match: LexicalMatch) -> tuple[str, np.ndarray]:
+        """Answer of a lexical match, plus its stored question embedding (cache key)."""
+        return self.vector_store.table.get(match.row, "answer"), self.vector_store.embeddings[match.row]
+
+    def _ask(self, user_input: str, degraded: bool = False) -> tuple[str, list[dict]]:
+        refused, match = self._screen(user_input)
+        if refused:
+            return (self.PROFANITY_REPLY, [])
+        # Lexical matching saw the prompt as typed; routing and place detection see it corrected
+        user_input = self.resolve_typos(user_input)
+        if match is not None:
+            fact, query_embedding = self._lexical_fact(match)
         else:
-            fact = self.search(convert)
+            convert, topics = self._translate_and_route(user_input)
+            queries = self._search_queries(convert, topics)
+            # Single-topic prompts: the search embedding doubles as the cache key
+            query_embedding = self.vector_store.encode([convert])[0] if queries == [convert] else None
+            fact = self._retrieve(
+                convert, topics, {convert: query_embedding} if query_embedding is not None else None
+            )
+        return self._cached_respond(user_input, fact, query_embedding, degraded)
 
+    def ask_batch(self, prompts: list[str],
+                  max_concurrency: int = 4) -> Iterator[tuple[int, str, list[dict], Optional[Exception]]]:
+        """
+        Answer many prompts, yielding (index, reply, places, error) as each completes.
+        
+        Identical prompts are answered once. Profanity and lexical matching run in
+        bulk, the remaining prompts are translated concurrently and embedded in a
+        single batched encode, then replies (Gemini) are generated with at most
+        max_concurrency calls in flight. A prompt that fails yields ("", [], error)
+        for its indices and the rest of the batch carries on.
+        """
+        positions: dict[str, list[int]] = {}
+        for i, prompt in enumerate(prompts):
+            positions.setdefault(prompt, []).append(i)
+        unique = list(positions)
+        logger.info(f"Batch of {len(prompts)} prompts ({len(unique)} unique)")
+        
+        def failed(prompt: str, error: Exception) -> Iterator[tuple[int, str, list[dict], Exception]]:
+            logger.warning(f"Batch prompt failed: {error}")
+            for i in positions[prompt]:
+                yield i, "", [], error
+        
+        # prompt -> (fact, cache key embedding or None)
+        facts: dict[str, tuple[str, Optional[np.ndarray]]] = {}
+        resolved: dict[str, str] = {}
+        dense: list[str] = []
+        for prompt in unique:
+            try:
+                refused, match = self._screen(prompt)
+                if not refused:
+                    resolved[prompt] = self.resolve_typos(prompt)
+                    if match is not None:
+                        facts[prompt] = self._lexical_fact(match)
+            except Exception as e:
+                yield from failed(prompt, e)
+                continue
+            if refused:
+                for i in positions[prompt]:
+                    yield i, self.PROFANITY_REPLY, [], None
+            elif match is None:
+                dense.append(prompt)
+        
+        with ThreadPoolExecutor(max_workers=max(1, max_concurrency)) as pool:
+            if dense:
+                routed_futures = {
+                    prompt: submit(pool, self._translate_and_route, resolved[prompt]) for prompt in dense
+                }
+                routed: dict[str, tuple[str, list[str]]] = {}
+                for prompt, future in routed_futures.items():
+                    try:
+                        routed[prompt] = future.result()
+                    except Exception as e:
+                        yield from failed(prompt, e)
+                queries = list(dict.fromkeys(
+                    q for convert, topics in routed.values() for q in self._search_queries(convert, topics)
+                ))
+                try:
+                    query_embeddings = dict(zip(queries, self.vector_store.encode(queries))) if queries else {}
+                except Exception as e:
+                    for prompt in routed:
+                        yield from failed(prompt, e)
+                    routed = {}
+                for prompt, (convert, topics) in routed.items():
+                    single = self._search_queries(convert, topics) == [convert]
+                    try:
+                        facts[prompt] = (
+                            self._retrieve(convert, topics, query_embeddings),
+                            query_embeddings[convert] if single else None
+                        )
+                    except Exception as e:
+                        yield from failed(prompt, e)
+            
+            futures = {
+                submit(pool, self._cached_respond, resolved[prompt], fact, query_embedding): prompt
+                for prompt, (fact, query_embedding) in facts.items()
+            }
+            for future in as_completed(futures):
+                prompt = futures[future]
+                try:
+                    reply, places = future.result()
+                except Exception as e:
+                    yield from failed(prompt, e)
+                    continue
+                for i in positions[prompt]:
+                    yield i, reply, places, None
+
+    def _cache_version(self) -> str:
+        """Dataset/config file signature; the semantic cache is cleared when it changes."""
+        signature = []
+        for path in (self.dataset_path, self.config_path):
+            try:
+                stat = os.stat(path)
+                signature.append(f"{stat.st_mtime_ns}:{stat.st_size}")
+            except OSError:
+                signature.append("missing")
+        return "|".join(signature)
+
+    # Reply sources the semantic cache keeps (offline fallbacks are never cached)
+    CACHEABLE_SOURCES = ("materialized", "gemini")
+
+    def _cached_respond(self, user_input: str, fact: str, query_embedding: Optional[np.ndarray],
+                        degraded: bool = False) -> tuple[str, list[dict]]:
+        """_respond through the semantic cache (guarded by fact and prompt places)."""
+        query_places = self._query_places(user_input)
+        if self.response_cache is None or query_embedding is None:
+            reply, places, _ = self._respond(user_input, fact, query_places, degraded)
+            return reply, places
+        
+        mentioned, reference_place = query_places
+        # Gemini answers in the prompt's language, so keep languages apart too
+        guard = (fact, tuple(sorted(mentioned)), reference_place, self.is_non_english(user_input))
+        self.response_cache.validate(self._cache_version())
+        with stage("semantic_cache"):
+            cached = self.response_cache.get(query_embedding, guard)
+        record_cache("semantic", hit=cached is not None)
+        if cached is not None:
+            return cached
+        
+        reply, places, source = self._respond(user_input, fact, query_places, degraded)
+        # Offline fallbacks (Gemini down, circuit open, no network, load shedding)
+        # must not shadow the full reply once Gemini is reachable again
+        if not degraded and source in self.CACHEABLE_SOURCES:
+            self.response_cache.put(query_embedding, guard, (reply, places))
+        return reply, places
+
+    def _query_places(self, user_input: str) -> tuple[list[str], Optional[str]]:
+        """Places named in the prompt, and the reference place of a "near X" query."""
         # First, check if user's query directly mentions a place name
         # This should take priority over places found in the facts
         user_lower = user_input.lower()
@@ -589,21 +1183,6 @@ class Pipeline:
                 directly_mentioned_places.append(place_name)
                 logger.debug(f"Place directly mentioned in query: {place_name}")
         
-        # Extract places from the retrieved fact
-        place_names_from_fact = self.key_places(fact)
-        
-        # Prioritize places mentioned in user query
-        if directly_mentioned_places:
-            # Use directly mentioned places, but also include fact places if they match
-            place_names = directly_mentioned_places
-            # Add fact places that weren't already included
-            for fact_place in place_names_from_fact:
-                if fact_place not in place_names:
-                    place_names.append(fact_place)
-        else:
-            # No direct mention, use places from facts
-            place_names = place_names_from_fact
-        
         # Check if user is asking about places "near" a specific location
         reference_place = None
         near_keywords = ['near', 'close to', 'around', 'by', 'next to']
@@ -625,27 +1204,44 @@ class Pipeline:
                 if reference_place:
                     break
         
+        return directly_mentioned_places, reference_place
+
+    def _respond(self, user_input: str, fact: str,
+                 query_places: Optional[tuple[list[str], Optional[str]]] = None,
+                 degraded: bool = False) -> tuple[str, list[dict], str]:
+        """Pick related places and phrase the retrieved fact as a reply: (reply, places, source)."""
+        directly_mentioned_places, reference_place = query_places or self._query_places(user_input)
+        directly_mentioned_places = list(directly_mentioned_places)
+        
+        # Extract places from the retrieved fact
+        place_names_from_fact = self.key_places(fact)
+        
+        # Prioritize places mentioned in user query
+        if directly_mentioned_places:
+            # Use directly mentioned places, but also include fact places if they match
+            place_names = directly_mentioned_places
+            # Add fact places that weren't already included
+            for fact_place in place_names_from_fact:
+                if fact_place not in place_names:
+                    place_names.append(fact_place)
+        else:
+            # No direct mention, use places from facts
+            place_names = place_names_from_fact
+        
         # Check if error message
         if "don't have information" in fact.lower() or "not sure" in fact.lower():
-            return (fact, [])
+            return (fact, [], "fact")
         
         # Make it natural
-        natural_response = self.make_natural(user_input, fact)
+        with stage("make_natural"):
+            natural_response, source = self.make_natural(user_input, fact, use_gemini=not degraded)
         
         # Get full place data (with proximity filtering if applicable)
-        places = self.get_place_data(place_names, reference_place=reference_place)
+        with stage("get_place_data"):
+            places = self.get_place_data(place_names, reference_place=reference_place)
         
-        return (natural_response, places)
+        return (natural_response, places, source)
 
     def get_all_places(self) -> list[dict]:
         """Get all available places for the map."""
-        all_places = self.config.get('places', {})
-        return [
-            {
-                "name": name,
-                "lat": data['lat'],
-                "lng": data['lng'],
-                "type": data['type']
-            }
-            for name, data in all_places.items()
-        ]
+        return list(self.places_index.places)
@@ -0,0 +1,128 @@
+"""
+Precomputed places payload for the map endpoint
+Serializes config['places'] once per config version (JSON + gzip/brotli) and
+keeps type/municipality/bbox indexes so filtered requests skip the model layer
+"""
+import bisect
+import hashlib
+import json
+import math
+from typing import Optional
+
+from loguru import logger
+
+from .lru import LRUCache
+from .payload import CompressedPayload
+
+# Bounding boxes are widened to this many decimals (about 1 km) so nearby
+# viewports share one memoized payload
+BBOX_DECIMALS = 2
+
+
+class PlacesIndex:
+    """Immutable index over the configured places, built once per config version"""
+
+    def __init__(self, places_config: dict):
+        self.places: list[dict] = [
+            {
+                "name": name,
+                "lat": data['lat'],
+                "lng": data['lng'],
+                "type": data['type']
+            }
+            for name, data in places_config.items()
+        ]
+        self.version = hashlib.md5(
+            json.dumps(places_config, sort_keys=True, default=str).encode("utf-8")
+        ).hexdigest()[:12]
+
+        self.by_type: dict[str, list[int]] = {}
+        self.by_municipality: dict[str, list[int]] = {}
+        for idx, (name, data) in enumerate(places_config.items()):
+            self.by_type.setdefault(str(data['type']).lower(), []).append(idx)
+            municipality = str(data.get('municipality', '')).upper()
+            if municipality:
+                self.by_municipality.setdefault(municipality, []).append(idx)
+
+        # Places sorted by longitude so bbox queries only scan the matching band
+        self._lng_order = sorted(range(len(self.places)), key=lambda i: self.places[i]['lng'])
+        self._lng_sorted = [self.places[i]['lng'] for i in self._lng_order]
+
+        self.full = CompressedPayload({"places": self.places}, self.version)
+        self._filtered = LRUCache(1024)
+        logger.info(f"Built places index v{self.version} ({len(self.places)} places)")
+
+    @staticmethod
+    def parse_bbox(bbox: str) -> tuple[float, float, float, float]:
+        """Parse 'minLng,minLat,maxLng,maxLat' into finite floats."""
+        parts = [p.strip() for p in bbox.split(",")]
+        if len(parts) != 4:
+            raise ValueError("bbox must be 'minLng,minLat,maxLng,maxLat'")
+        min_lng, min_lat, max_lng, max_lat = coords = tuple(float(p) for p in parts)
+        if not all(math.isfinite(c) for c in coords):
+            raise ValueError("bbox coordinates must be finite numbers")
+        if min_lng > max_lng or min_lat > max_lat:
+            raise ValueError("bbox minimum must not exceed maximum")
+        return min_lng, min_lat, max_lng, max_lat
+
+    @staticmethod
+    def quantize_bbox(bbox: tuple[float, float, float, float]) -> tuple[float, float, float, float]:
+        """Round a bbox outward to BBOX_DECIMALS, so it still covers the requested area."""
+        scale = 10 ** BBOX_DECIMALS
+        min_lng, min_lat, max_lng, max_lat = bbox
+        return (
+            math.floor(min_lng * scale) / scale,
+            math.floor(min_lat * scale) / scale,
+            math.ceil(max_lng * scale) / scale,
+            math.ceil(max_lat * scale) / scale,
+        )
+
+    def _in_bbox(self, bbox: tuple[float, float, float, float]) -> set[int]:
+        min_lng, min_lat, max_lng, max_lat = bbox
+        lo = bisect.bisect_left(self._lng_sorted, min_lng)
+        hi = bisect.bisect_right(self._lng_sorted, max_lng)
+        return {
+            i for i in self._lng_order[lo:hi]
+            if min_lat <= self.places[i]['lat'] <= max_lat
+        }
+
+    def select(
+        self,
+        bbox: Optional[str] = None,
+        place_type: Optional[str] = None,
+        municipality: Optional[str] = None,
+    ) -> CompressedPayload:
+        """
+        Return the payload for the given filters.
+
+        Unfiltered requests get the prebuilt full payload; filtered results are
+        memoized per normalized filter key in an LRU. Bboxes are widened to a
+        coarse grid first, so panning clients reuse payloads instead of
+        compressing a new one per viewport.
+        """
+        bbox_key = self.quantize_bbox(self.parse_bbox(bbox)) if bbox else None
+        type_key = place_type.lower() if place_type else None
+        municipality_key = municipality.upper() if municipality else None
+        if bbox_key is None and type_key is None and municipality_key is None:
+            return self.full
+
+        key = (bbox_key, type_key, municipality_key)
+        payload = self._filtered.get(key)
+        if payload is not None:
+            return payload
+
+        selected: Optional[set[int]] = None
+        if type_key is not None:
+            selected = set(self.by_type.get(type_key, ()))
+        if municipality_key is not None:
+            matches = set(self.by_municipality.get(municipality_key, ()))
+            selected = matches if selected is None else selected & matches
+        if bbox_key is not None:
+            matches = self._in_bbox(bbox_key)
+            selected = matches if selected is None else selected & matches
+
+        places = [self.places[i] for i in sorted(selected or ())]
+        # Built on the request path: cheaper levels than the one-off full payload
+        payload = CompressedPayload({"places": places}, self.version, gzip_level=6, brotli_quality=5)
+        self._filtered.put(key, payload)
+        return payload
@@ -0,0 +1,155 @@
+"""
+Compiled profanity screening for the chat pipeline
+Builds a DFA over better_profanity's word list and leetspeak character map once,
+so screening a prompt costs one table lookup per character instead of comparing
+every token against every censor word variant.
+"""
+import re
+from typing import Iterable
+
+from loguru import logger
+
+# Replacement better_profanity writes over a censored word; a token that already
+# equals it does not change the text, so it is not reported as profanity.
+_CENSOR_REPLACEMENT = "****"
+
+_DEAD = 0
+_START = 1
+
+
+class ProfanityFilter:
+    """
+    Drop-in replacement for ``better_profanity.profanity.contains_profanity``.
+
+    Verdicts follow better_profanity's rules: words are maximal runs of allowed
+    characters, each censor word character may be written as any of its
+    substitutes (``a`` -> ``@``, ``4``, ``*``...), and a word may be joined with
+    up to ``max_combinations`` following words, with or without the separators
+    between them ("f uck", "blow job").
+    """
+
+    def __init__(self, custom_words: Iterable[str] = ()):
+        # Imported here: loading better_profanity builds its own censor set (slow)
+        from better_profanity import profanity as _reference
+        from better_profanity.constants import ALLOWED_CHARACTERS
+        from better_profanity.utils import get_complete_path_of_file, read_wordlist
+
+        char_map: dict[str, tuple[str, ...]] = dict(_reference.CHARS_MAPPING)
+
+        words = {w.lower() for w in read_wordlist(get_complete_path_of_file("profanity_wordlist.txt"))}
+        self.max_combinations = max(
+            [1] + [sum(1 for c in w if c not in ALLOWED_CHARACTERS) for w in words]
+        )
+        words.update(w.lower() for w in custom_words)
+
+        # Which censor-word characters a typed character can stand for
+        substitutes: dict[str, set[str]] = {}
+        for word_char, typed_chars in char_map.items():
+            for typed in typed_chars:
+                substitutes.setdefault(typed, {typed}).add(word_char)
+        self._substitutes: dict[str, tuple[str, ...]] = {
+            typed: tuple(sorted(chars)) for typed, chars in substitutes.items()
+        }
+
+        self._build_automaton(words)
+        self._token_re = re.compile(
+            "[" + "".join(re.escape(c) for c in sorted(ALLOWED_CHARACTERS)) + "]+"
+        )
+        logger.info(
+            f"Compiled profanity filter: {len(words)} words, "
+            f"{len(self._transitions)} automaton states"
+        )
+
+    def _build_automaton(self, words: set[str]):
+        """Trie of censor words, determinized over the substitution map."""
+        children: list[dict[str, int]] = [{}]
+        terminal: list[bool] = [False]
+        for word in words:
+            node = 0
+            for char in word:
+                nxt = children[node].get(char)
+                if nxt is None:
+                    nxt = len(children)
+                    children[node][char] = nxt
+                    children.append({})
+                    terminal.append(False)
+                node = nxt
+            terminal[node] = True
+
+        alphabet = set(self._substitutes)
+        for node_children in children:
+            alphabet.update(node_children)
+
+        # State 0 is the dead state, state 1 the trie root
+        state_ids: dict[frozenset, int] = {frozenset(): _DEAD, frozenset([0]): _START}
+        state_sets: list[frozenset] = [frozenset(), frozenset([0])]
+        self._transitions: list[dict[str, int]] = [{}, {}]
+        self._accepting: list[bool] = [False, terminal[0]]
+
+        pending = [_START]
+        while pending:
+            state = pending.pop()
+            table = self._transitions[state]
+            for typed in alphabet:
+                targets = frozenset(
+                    child
+                    for node in state_sets[state]
+                    for word_char in self._substitutes.get(typed, (typed,))
+                    if (child := children[node].get(word_char)) is not None
+                )
+                if not targets:
+                    continue
+                target = state_ids.get(targets)
+                if target is None:
+                    target = len(state_sets)
+                    state_ids[targets] = target
+                    state_sets.append(targets)
+                    self._transitions.append({})
+                    self._accepting.append(any(terminal[n] for n in targets))
+                    pending.append(target)
+                table[typed] = target
+
+    def _advance(self, state: int, text: str) -> int:
+        transitions = self._transitions
+        for char in text:
+            state = transitions[state].get(char, _DEAD)
+            if state == _DEAD:
+                break
+        return state
+
+    def contains_profanity(self, text: str) -> bool:
+        """Return True if the text contains a censor word or one of its variants."""
+        tokens = [(m.start(), m.end()) for m in self._token_re.finditer(text)]
+        last_index = len(text) - 1
+        if not tokens or tokens[0][0] >= last_index:
+            return False
+
+        accepting = self._accepting
+        for i, (start, end) in enumerate(tokens):
+            word = text[start:end]
+            state = self._advance(_START, word.lower())
+            if accepting[state] and word != _CENSOR_REPLACEMENT:
+                return True
+            if state == _DEAD or end > last_index:
+                continue
+
+            # Join with the following words, with and without separators
+            joined = separated = state
+            prev_end = end
+            for next_start, next_end in tokens[i + 1:i + 1 + self.max_combinations]:
+                if next_start >= last_index:
+                    break
+                next_word = text[next_start:next_end].lower()
+                if joined != _DEAD:
+                    joined = self._advance(joined, next_word)
+                if separated != _DEAD:
+                    separated = self._advance(
+                        self._advance(separated, text[prev_end:next_start].lower()), next_word
+                    )
+                if accepting[joined] or accepting[separated]:
+                    return True
+                if joined == _DEAD and separated == _DEAD:
+                    break
+                prev_end = next_end
+
+        return False
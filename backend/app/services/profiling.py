@@ -0,0 +1,254 @@
+"""
+Production profiling
+- profile_call: profile one call (e.g. a single /api/chat request) with a
+  stack sampler or cProfile and store the profile under the profile directory
+- StackSampler: low-rate background wall-clock sampling of every thread that is
+  running app code, flushed periodically as folded stacks (flamegraph.pl and
+  speedscope input)
+- MemoryTracker: tracemalloc snapshots and growth since the previous snapshot
+"""
+import cProfile
+import os
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import Counter
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Optional, TypeVar
+
+from loguru import logger
+
+T = TypeVar("T")
+
+SAMPLE = "sample"
+TRACE = "trace"
+MODES = (SAMPLE, TRACE)
+
+APP_DIR = str(Path(__file__).resolve().parent.parent)
+
+# cProfile can only be active once per process
+_trace_lock = threading.Lock()
+
+
+@lru_cache(maxsize=8192)
+def _label(code) -> str:
+    return f"{Path(code.co_filename).stem}.{getattr(code, 'co_qualname', code.co_name)}"
+
+
+def fold_stack(frame, max_depth: int = 128) -> tuple[str, bool]:
+    """Root-first 'a;b;c' stack of a frame, and whether it passes through app code."""
+    labels = []
+    in_app = False
+    while frame is not None and len(labels) < max_depth:
+        code = frame.f_code
+        in_app = in_app or code.co_filename.startswith(APP_DIR)
+        labels.append(_label(code))
+        frame = frame.f_back
+    return ";".join(reversed(labels)), in_app
+
+
+def write_folded(path: Path, counts: Counter):
+    with open(path, "w", encoding="utf-8") as f:
+        for stack, count in counts.most_common():
+            f.write(f"{stack} {count}\n")
+
+
+def prune(directory: Path, pattern: str, keep: int):
+    """Delete all but the newest `keep` files matching pattern."""
+    files = sorted(directory.glob(pattern), key=lambda p: p.stat().st_mtime, reverse=True)
+    for old in files[keep:]:
+        try:
+            old.unlink()
+        except OSError:
+            pass
+
+
+class _ThreadSampler:
+    """Samples one thread's stack until stopped"""
+
+    def __init__(self, ident: int, interval: float):
+        self.ident = ident
+        self.interval = interval
+        self.counts: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-sampler", daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.ident)
+            if frame is not None:
+                self.counts[fold_stack(frame)[0]] += 1
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def profile_call(fn: Callable[[], T], mode: str, output_dir: str, keep: int = 50,
+                 interval: float = 0.001) -> tuple[T, str]:
+    """
+    Run fn in the current thread under a profiler and store the profile.
+
+    sample: wall-clock stack samples every `interval` seconds (.folded)
+    trace: deterministic cProfile (.prof, pstats/snakeviz); falls back to
+    sampling while another trace is running.
+
+    Returns (result, profile file name). The profile is stored even if fn raises.
+    """
+    directory = Path(output_dir)
+    directory.mkdir(parents=True, exist_ok=True)
+    stem = f"request-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+    if mode == TRACE and _trace_lock.acquire(blocking=False):
+        path = directory / f"{stem}.prof"
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+            try:
+                result = fn()
+            finally:
+                profiler.disable()
+                profiler.dump_stats(str(path))
+        finally:
+            _trace_lock.release()
+    else:
+        path = directory / f"{stem}.folded"
+        sampler = _ThreadSampler(threading.get_ident(), interval)
+        try:
+            with sampler:
+                result = fn()
+        finally:
+            write_folded(path, sampler.counts)
+
+    prune(directory, "request-*", keep)
+    logger.info(f"Stored {mode} profile {path.name}")
+    return result, path.name
+
+
+class StackSampler:
+    """Always-on wall-clock sampler of threads running app code (Pipeline.ask, API handlers)"""
+
+    def __init__(self, output_dir: str, interval: float = 0.05, flush_seconds: float = 300.0,
+                 keep: int = 50):
+        self.directory = Path(output_dir)
+        self.interval = interval
+        self.flush_seconds = flush_seconds
+        self.keep = keep
+        self._counts: Counter = Counter()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Start sampling in this process (call after fork, threads don't survive it)."""
+        if self._thread is not None:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+        logger.info(f"Stack sampler running every {self.interval * 1000:.0f}ms, flushing to {self.directory}")
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        self.flush()
+
+    def _run(self):
+        own = threading.get_ident()
+        next_flush = time.monotonic() + self.flush_seconds
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            with self._lock:
+                for ident, frame in frames.items():
+                    if ident == own:
+                        continue
+                    stack, in_app = fold_stack(frame)
+                    if in_app:
+                        self._counts[stack] += 1
+            del frames
+            if time.monotonic() >= next_flush:
+                self.flush()
+                next_flush = time.monotonic() + self.flush_seconds
+
+    def flush(self) -> Optional[Path]:
+        """Write the samples collected since the last flush; returns the file written."""
+        with self._lock:
+            counts, self._counts = self._counts, Counter()
+        if not counts:
+            return None
+        path = self.directory / f"flame-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}.folded"
+        try:
+            write_folded(path, counts)
+            prune(self.directory, "flame-*.folded", self.keep)
+        except OSError as e:
+            logger.warning(f"Could not write flame data: {e}")
+            return None
+        return path
+
+
+class MemoryTracker:
+    """tracemalloc control; every snapshot is compared with the previous one"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._previous: Optional[tracemalloc.Snapshot] = None
+
+    @property
+    def tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def start(self, frames: int = 1):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+            logger.info(f"tracemalloc started ({frames} frames)")
+
+    def stop(self):
+        with self._lock:
+            self._previous = None
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+            logger.info("tracemalloc stopped")
+
+    def snapshot(self, top: int = 25, group_by: str = "lineno") -> dict:
+        """Largest allocation sites and growth since the previous snapshot."""
+        if not tracemalloc.is_tracing():
+            raise RuntimeError("tracemalloc is not running")
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<unknown>"),
+        ))
+        current, peak = tracemalloc.get_traced_memory()
+        with self._lock:
+            previous, self._previous = self._previous, snapshot
+
+        def site(stat) -> str:
+            frame = stat.traceback[0]
+            return f"{frame.filename}:{frame.lineno}"
+
+        return {
+            "pid": os.getpid(),
+            "traced_bytes": current,
+            "peak_bytes": peak,
+            "top": [
+                {"site": site(stat), "size": stat.size, "count": stat.count}
+                for stat in snapshot.statistics(group_by)[:top]
+            ],
+            "growth": [
+                {"site": site(stat), "size_diff": stat.size_diff, "count_diff": stat.count_diff}
+                for stat in snapshot.compare_to(previous, group_by)[:top]
+            ] if previous is not None else None,
+        }
+
+
+memory_tracker = MemoryTracker()
@@ -0,0 +1,102 @@
+"""
+Gemini prompt budgeting
+Generation time grows with prompt and reply length, and multi-topic facts join
+several answers. Prompts are kept within an estimated token budget: the fact is
+split into sentences, duplicates dropped, and sentences are ranked by word
+overlap with the question (earlier sentences first on ties); the top-ranked ones
+that fit are kept, in their original order. Token counts are estimated from
+characters, which is close enough for budgeting and needs no tokenizer.
+"""
+import math
+import re
+from typing import NamedTuple
+
+from .answer_groups import STOP_WORDS
+
+_SENTENCE = re.compile(r"[^.!?]+(?:[.!?]+|$)")
+_WORD = re.compile(r"\w+")
+
+
+def estimate_tokens(text: str, chars_per_token: float = 4.0) -> int:
+    """Rough token count of text (about 4 characters per token for English)."""
+    return math.ceil(len(text) / chars_per_token) if text else 0
+
+
+def split_sentences(text: str) -> list[str]:
+    """Sentences of text, stripped, without empty or repeated ones."""
+    sentences, seen = [], set()
+    for match in _SENTENCE.finditer(text):
+        sentence = match.group().strip()
+        key = sentence.lower()
+        if sentence and key not in seen:
+            seen.add(key)
+            sentences.append(sentence)
+    return sentences
+
+
+def _content_words(text: str) -> set[str]:
+    return set(_WORD.findall(text.lower())) - STOP_WORDS
+
+
+class BudgetedFact(NamedTuple):
+    fact: str
+    tokens: int    # estimated tokens of the whole prompt
+    dropped: int   # sentences left out (0 = fact sent whole; cut sentences count as kept)
+
+
+class PromptBudget:
+    """Fits (question, fact) into the prompt template within max_input_tokens"""
+
+    def __init__(self, template: str, max_input_tokens: int = 0, chars_per_token: float = 4.0,
+                 min_fact_tokens: int = 32):
+        """
+        Args:
+            template: prompt template with {question} and {fact}
+            max_input_tokens: estimated prompt budget (0 = unlimited)
+            chars_per_token: characters per token used for estimates
+            min_fact_tokens: facts keep at least this much even when the question is long
+        """
+        self.template = template
+        self.max_input_tokens = max_input_tokens
+        self.chars_per_token = chars_per_token
+        self.min_fact_tokens = min_fact_tokens
+        self.template_tokens = self.estimate(template.format(question="", fact=""))
+
+    def estimate(self, text: str) -> int:
+        return estimate_tokens(text, self.chars_per_token)
+
+    def fit(self, question: str, fact: str) -> BudgetedFact:
+        """The fact trimmed to the budget left by the template and the question."""
+        used = self.template_tokens + self.estimate(question)
+        fact_tokens = self.estimate(fact)
+        if self.max_input_tokens <= 0 or used + fact_tokens <= self.max_input_tokens:
+            return BudgetedFact(fact, used + fact_tokens, 0)
+
+        budget = max(self.max_input_tokens - used, self.min_fact_tokens)
+        sentences = split_sentences(fact)
+        question_words = _content_words(question)
+        ranked = sorted(
+            range(len(sentences)),
+            key=lambda i: (-len(question_words & _content_words(sentences[i])), i)
+        )
+
+        chosen, spent = [], 0
+        for i in ranked:
+            # +1 for the joining space
+            cost = self.estimate(sentences[i]) + 1
+            if spent + cost > budget:
+                # Stop at the first miss so a lower-ranked fragment never replaces a better sentence
+                break
+            chosen.append(i)
+            spent += cost
+        if not chosen:
+            if not sentences:
+                return BudgetedFact(fact, used + fact_tokens, 0)
+            # Even the best sentence is too long: cut it at a word boundary
+            best = sentences[ranked[0]]
+            limit = int(budget * self.chars_per_token)
+            trimmed = best[:limit].rsplit(" ", 1)[0] if len(best) > limit else best
+            return BudgetedFact(trimmed, used + self.estimate(trimmed), len(sentences) - 1)
+
+        trimmed = " ".join(sentences[i] for i in sorted(chosen))
+        return BudgetedFact(trimmed, used + self.estimate(trimmed), len(sentences) - len(chosen))
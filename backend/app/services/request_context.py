@@ -0,0 +1,54 @@
+"""
+Per-request context: request id, verbose-log sampling decision and stage timings
+Kept in a ContextVar, so it follows the request into asyncio tasks and into the
+worker threads that run with a copy of the caller's context (chat admission
+pool, upstream pool, batch pool).
+"""
+import contextvars
+from concurrent.futures import Executor, Future
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+
+@dataclass
+class RequestContext:
+    request_id: str
+    sampled: bool = False  # keep verbose (debug/header) logs for this request
+    timings: dict[str, float] = field(default_factory=dict)  # stage -> seconds
+
+    def add_timing(self, name: str, seconds: float):
+        self.timings[name] = self.timings.get(name, 0.0) + seconds
+
+
+_current: contextvars.ContextVar[Optional[RequestContext]] = contextvars.ContextVar(
+    "request_context", default=None
+)
+
+
+def current() -> Optional[RequestContext]:
+    return _current.get()
+
+
+def begin(request_id: str, sampled: bool = False) -> contextvars.Token:
+    return _current.set(RequestContext(request_id, sampled))
+
+
+def end(token: contextvars.Token):
+    _current.reset(token)
+
+
+def verbose() -> bool:
+    """Whether verbose logs are kept for the current request (cheap guard for costly messages)."""
+    context = _current.get()
+    return context is not None and context.sampled
+
+
+def add_timing(name: str, seconds: float):
+    context = _current.get()
+    if context is not None:
+        context.add_timing(name, seconds)
+
+
+def submit(executor: Executor, fn: Callable, *args) -> Future:
+    """executor.submit(fn, *args), run with the caller's request context."""
+    return executor.submit(contextvars.copy_context().run, fn, *args)
@@ -0,0 +1,188 @@
+"""
+Resilience helpers for upstream calls (Gemini, Google Translate)
+- SingleFlight: identical concurrent calls share one upstream request
+- CircuitBreaker: stop calling a failing service for a while, then probe it
+- call_with_timeout: bound the wait on clients that have no timeout option
+"""
+import threading
+import time
+from collections import deque
+from concurrent.futures import Executor
+from typing import Any, Callable, Hashable, Optional
+
+from loguru import logger
+
+from .request_context import submit
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling a service whose circuit is open"""
+
+
+class _Flight:
+    __slots__ = ("done", "result", "error", "followers")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.followers = 0
+
+
+class SingleFlight:
+    """Coalesce concurrent calls with the same key into one execution"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights: dict[Hashable, _Flight] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> tuple[Any, bool]:
+        """
+        Run fn, or wait for the identical call already in flight.
+
+        Returns (result, shared); exceptions of the leader propagate to everyone.
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = _Flight()
+                self._flights[key] = flight
+            else:
+                flight.followers += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result, True
+
+        try:
+            flight.result = fn()
+            return flight.result, False
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+
+class CircuitBreaker:
+    """
+    Failure-rate circuit breaker over a sliding time window.
+
+    closed: calls pass; once at least min_calls were made in the window and the
+    failure rate reaches failure_rate, the circuit opens.
+    open: calls are rejected for open_seconds.
+    half_open: up to half_open_probes calls pass; a success closes the circuit,
+    a failure opens it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_rate: float = 0.5, min_calls: int = 5,
+                 window_seconds: float = 60.0, open_seconds: float = 30.0,
+                 half_open_probes: int = 1, on_state_change: Optional[Callable[[str, str], None]] = None):
+        self.name = name
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.window_seconds = window_seconds
+        self.open_seconds = open_seconds
+        self.half_open_probes = half_open_probes
+        self.on_state_change = on_state_change
+        self._lock = threading.Lock()
+        self._outcomes: deque[tuple[float, bool]] = deque()
+        self._state = self.CLOSED
+        self._opened_at = 0.0
+        self._probes = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._maybe_half_open(time.monotonic())
+            return self._state
+
+    def _set_state(self, state: str):
+        if state == self._state:
+            return
+        previous, self._state = self._state, state
+        logger.warning(f"Circuit '{self.name}' {previous} -> {state}")
+        if self.on_state_change:
+            self.on_state_change(self.name, state)
+
+    def _maybe_half_open(self, now: float):
+        if self._state == self.OPEN and now - self._opened_at >= self.open_seconds:
+            self._probes = 0
+            self._set_state(self.HALF_OPEN)
+
+    def allow(self) -> bool:
+        """Whether a call may go out now (counts as a probe while half-open)."""
+        with self._lock:
+            self._maybe_half_open(time.monotonic())
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.HALF_OPEN and self._probes < self.half_open_probes:
+                self._probes += 1
+                return True
+            return False
+
+    def record_success(self):
+        self._record(True)
+
+    def record_failure(self):
+        self._record(False)
+
+    def _record(self, ok: bool):
+        now = time.monotonic()
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._outcomes.clear()
+                if ok:
+                    self._set_state(self.CLOSED)
+                else:
+                    self._opened_at = now
+                    self._set_state(self.OPEN)
+                return
+
+            self._outcomes.append((now, ok))
+            while self._outcomes and now - self._outcomes[0][0] > self.window_seconds:
+                self._outcomes.popleft()
+            if self._state == self.CLOSED and len(self._outcomes) >= self.min_calls:
+                failures = sum(1 for _, success in self._outcomes if not success)
+                if failures / len(self._outcomes) >= self.failure_rate:
+                    self._opened_at = now
+                    self._outcomes.clear()
+                    self._set_state(self.OPEN)
+
+    def call(self, fn: Callable[[], Any]) -> Any:
+        """Run fn through the breaker; raises CircuitOpenError while open."""
+        if not self.allow():
+            raise CircuitOpenError(f"Circuit '{self.name}' is open")
+        try:
+            result = fn()
+        except Exception:
+            self.record_failure()
+            raise
+        self.record_success()
+        return result
+
+
+def call_with_timeout(executor: Executor, fn: Callable[[], Any], timeout: Optional[float]) -> Any:
+    """
+    Run fn on the executor and wait at most timeout seconds (None waits forever).
+
+    On timeout the caller gets TimeoutError right away; the worker thread
+    finishes the abandoned call in the background.
+    """
+    if not timeout:
+        return fn()
+    future = submit(executor, fn)
+    try:
+        return future.result(timeout=timeout)
+    except TimeoutError:
+        future.cancel()
+        raise TimeoutError(f"Upstream call timed out after {timeout}s")
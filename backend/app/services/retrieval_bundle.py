@@ -0,0 +1,142 @@
+"""
+Compact retrieval bundle for client-side (offline) answering
+Exports what nearest-neighbour search needs: int8-quantized question embeddings,
+deduplicated answers (one per answer group, with the materialized reply when
+there is one), the place table and the topic keyword map. The frontend stores
+the bundle, embeds questions with the same model, answers close matches locally
+and only calls /api/chat for generation. Built once per pipeline and versioned
+by content, so the ETag only changes when the dataset, config or replies do.
+
+Binary layout (little-endian):
+    b"PFRB" | uint32 format | uint32 header length | header JSON (utf-8, space-padded
+    to 8 bytes) | sections at the offsets listed in header["sections"]
+
+Sections:
+    scales      float32[count]        per-row dequantization scale
+    answer_ids  uint16|uint32[count]  row -> index into header["answers"]
+    embeddings  int8[count, dim]      unit-normalized rows divided by their scale
+
+Cosine similarity of row i to a unit query vector q is about
+scales[i] * dot(embeddings[i], q); a row answers the question when
+1 - similarity <= header["max_distance"] (same rule as Pipeline.search).
+"""
+import hashlib
+import json
+import struct
+from typing import Callable, Optional
+
+import numpy as np
+from loguru import logger
+
+from .document_table import DocumentTable
+from .payload import CompressedPayload
+
+MAGIC = b"PFRB"
+FORMAT_VERSION = 1
+MEDIA_TYPE = "application/octet-stream"
+_CHUNK_ROWS = 4096
+
+
+def quantize(embeddings: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Per-row symmetric int8 quantization of the unit-normalized rows: (int8 rows, float32 scales)."""
+    count = len(embeddings)
+    dim = embeddings.shape[1] if embeddings.ndim == 2 else 0
+    quantized = np.zeros((count, dim), dtype=np.int8)
+    scales = np.ones(count, dtype=np.float32)
+    # Chunked so a memory-mapped store is never copied whole as float32
+    for start in range(0, count, _CHUNK_ROWS):
+        rows = np.asarray(embeddings[start:start + _CHUNK_ROWS], dtype=np.float32)
+        norms = np.linalg.norm(rows, axis=1, keepdims=True)
+        unit = rows / np.where(norms > 0, norms, 1.0)
+        peak = np.abs(unit).max(axis=1) if dim else np.zeros(len(rows), dtype=np.float32)
+        chunk_scales = np.where(peak > 0, peak / 127.0, 1.0).astype(np.float32)
+        quantized[start:start + len(rows)] = np.rint(unit / chunk_scales[:, None])
+        scales[start:start + len(rows)] = chunk_scales
+    return quantized, scales
+
+
+class RetrievalBundle:
+    """Serialized, precompressed retrieval data for one pipeline (dataset + config version)"""
+
+    def __init__(self, table: DocumentTable, embeddings: Optional[np.ndarray],
+                 answer_groups: Optional[np.ndarray], model_name: str, max_distance: float,
+                 places: list[dict], keywords: dict[str, list[str]],
+                 reply: Optional[Callable[[str], Optional[str]]] = None):
+        """
+        Args:
+            table, embeddings, answer_groups: the vector store's rows (see SimpleVectorStore)
+            model_name: embedding model the client must use for queries
+            max_distance: rag.confidence_threshold (cosine distance)
+            places: place table (name, lat, lng, type), e.g. PlacesIndex.places
+            keywords: topic -> keywords map from config
+            reply: materialized reply for an answer, if any (e.g. AnswerStore.get)
+        """
+        count = len(table)
+        if embeddings is None or count == 0:
+            embeddings = np.zeros((0, 0), dtype=np.float32)
+        quantized, scales = quantize(embeddings)
+
+        # One answer per answer group (near-duplicates were merged at build time)
+        groups = answer_groups if answer_groups is not None and len(answer_groups) == count \
+            else table.columns["answer"]
+        _, first_rows, answer_ids = np.unique(np.asarray(groups), return_index=True, return_inverse=True)
+        answers = [table.get(int(row), "answer") or "" for row in first_rows]
+        replies = [reply(answer) if reply else None for answer in answers]
+        answer_ids = answer_ids.astype(np.uint16 if len(answers) <= 0xFFFF else np.uint32)
+
+        sections = [("scales", scales), ("answer_ids", answer_ids), ("embeddings", quantized)]
+        header = {
+            "format": FORMAT_VERSION,
+            "model": model_name,
+            "metric": "cosine",
+            "max_distance": max_distance,
+            "count": count,
+            "dim": int(quantized.shape[1]),
+            "answers": answers,
+            "replies": replies,
+            "places": places,
+            "keywords": keywords,
+        }
+        hasher = hashlib.md5(json.dumps(header, ensure_ascii=False, sort_keys=True).encode("utf-8"))
+        for _, array in sections:
+            hasher.update(array.tobytes())
+        self.version = hasher.hexdigest()[:12]
+        header["version"] = self.version
+
+        self.payload = CompressedPayload(self._pack(header, sections), self.version, MEDIA_TYPE,
+                                         gzip_level=6, brotli_quality=5)
+        self.count = count
+        self.answers = len(answers)
+        logger.info(
+            f"Built retrieval bundle v{self.version} ({count} rows, {len(answers)} answers, "
+            f"{len(self.payload.body) / 1e6:.1f} MB, gzip {len(self.payload.gzip) / 1e6:.1f} MB)"
+        )
+
+    @staticmethod
+    def _pack(header: dict, sections: list[tuple[str, np.ndarray]]) -> bytes:
+        """Header JSON followed by 8-byte-aligned sections (offsets are from the start of the bundle)."""
+        # Section offsets depend on the header length, which depends on the offsets: fix the
+        # offsets' width by reserving a large enough header, then lay the sections out after it.
+        layout = {name: {"offset": 0, "dtype": array.dtype.name, "shape": list(array.shape)}
+                  for name, array in sections}
+        header["sections"] = layout
+        reserve = len(json.dumps(header, ensure_ascii=False).encode("utf-8")) + 64 * len(sections)
+        start = 12 + reserve
+        start += -start % 8
+        offset = start
+        for name, array in sections:
+            layout[name]["offset"] = offset
+            offset += array.nbytes
+            offset += -offset % 8
+
+        encoded = json.dumps(header, ensure_ascii=False).encode("utf-8")
+        encoded += b" " * (start - 12 - len(encoded))
+        parts = [MAGIC, struct.pack("<II", FORMAT_VERSION, len(encoded)), encoded]
+        position = start
+        for name, array in sections:
+            parts.append(np.ascontiguousarray(array).astype(array.dtype.newbyteorder("<"), copy=False).tobytes())
+            position += array.nbytes
+            padding = -position % 8
+            parts.append(b"\0" * padding)
+            position += padding
+        return b"".join(parts)
@@ -0,0 +1,98 @@
+"""
+Semantic response cache
+Stores the final (reply, places) of recent queries with their embeddings. A new
+query within a cosine-similarity threshold of a cached one reuses its result,
+so paraphrases share one Gemini call. Entries also carry a guard key (retrieved
+fact + places named in the prompt) that must match exactly, so similar prompts
+about different places are never conflated.
+"""
+import threading
+from typing import Hashable, Optional
+
+import numpy as np
+from loguru import logger
+
+EVICTION_POLICIES = ("lru", "lfu")
+
+
+class SemanticCache:
+    """Bounded embedding-keyed cache with LRU or LFU eviction"""
+
+    def __init__(self, dim: int, max_entries: int = 1024, similarity: float = 0.92,
+                 eviction: str = "lru", version: Optional[str] = None):
+        if eviction not in EVICTION_POLICIES:
+            raise ValueError(f"eviction must be one of {EVICTION_POLICIES}, got {eviction!r}")
+        self.max_entries = max(1, max_entries)
+        self.similarity = similarity
+        self.eviction = eviction
+        self.version = version
+        self._lock = threading.Lock()
+        # Unit vectors in a preallocated matrix; a lookup is one matvec over the filled rows
+        self._vectors = np.zeros((self.max_entries, dim), dtype=np.float32)
+        self._guards: list[Hashable] = []
+        self._values: list[tuple[str, list[dict]]] = []
+        self._hits = np.zeros(self.max_entries, dtype=np.int64)
+        self._last_used = np.zeros(self.max_entries, dtype=np.int64)
+        self._clock = 0
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def clear(self):
+        with self._lock:
+            self._guards.clear()
+            self._values.clear()
+            self._hits[:] = 0
+            self._last_used[:] = 0
+
+    def validate(self, version: Optional[str]):
+        """Drop every entry when the dataset/config version changed."""
+        if version != self.version:
+            if len(self):
+                logger.info(f"Semantic cache invalidated ({self.version} -> {version})")
+            self.clear()
+            self.version = version
+
+    @staticmethod
+    def _unit(embedding: np.ndarray) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        return vector / max(float(np.linalg.norm(vector)), 1e-12)
+
+    def get(self, embedding: np.ndarray, guard: Hashable) -> Optional[tuple[str, list[dict]]]:
+        """Most similar cached result above the threshold with the same guard."""
+        query = self._unit(embedding)
+        with self._lock:
+            size = len(self._values)
+            if not size:
+                return None
+            similarities = self._vectors[:size] @ query
+            candidates = np.flatnonzero(similarities >= self.similarity)
+            for i in candidates[np.argsort(-similarities[candidates])]:
+                if self._guards[i] == guard:
+                    self._clock += 1
+                    self._hits[i] += 1
+                    self._last_used[i] = self._clock
+                    reply, places = self._values[i]
+                    return reply, list(places)
+        return None
+
+    def put(self, embedding: np.ndarray, guard: Hashable, value: tuple[str, list[dict]]):
+        query = self._unit(embedding)
+        with self._lock:
+            self._clock += 1
+            size = len(self._values)
+            if size < self.max_entries:
+                slot = size
+                self._guards.append(guard)
+                self._values.append(value)
+            else:
+                if self.eviction == "lfu":
+                    # Fewest hits, oldest use breaks ties
+                    slot = int(np.lexsort((self._last_used, self._hits))[0])
+                else:
+                    slot = int(np.argmin(self._last_used))
+                self._guards[slot] = guard
+                self._values[slot] = value
+            self._vectors[slot] = query
+            self._hits[slot] = 0
+            self._last_used[slot] = self._clock
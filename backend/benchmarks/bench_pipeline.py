@@ -0,0 +1,311 @@
+"""
+Reproducible offline benchmark for Pipeline.ask
+
+Replays every dataset input plus paraphrases and multi-topic prompts through
+the pipeline with GoogleTranslator, Gemini and the connectivity probe replaced
+by local stand-ins (see benchmarks/stubs.py). Reports latency percentiles,
+throughput at several concurrency levels, peak RSS and startup time, and saves
+everything as JSON so runs can be compared.
+
+By default every prompt pays for the whole pipeline: the response, translation
+and query-embedding caches are off (--response-cache turns them on) and
+materialized replies from answers.json are not served (--materialized turns
+them on), so fact prompts still go through the Gemini stand-in. The settings in
+effect are recorded under meta.caches.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_pipeline
+    python -m benchmarks.bench_pipeline --concurrency 1,4,8 --output before.json
+    python -m benchmarks.bench_pipeline --compare before.json --max-regression 0.10
+    python -m benchmarks.bench_pipeline --response-cache --materialized
+"""
+import argparse
+import hashlib
+import importlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).parent.parent
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from loguru import logger
+
+from benchmarks.prompts import load_prompts
+from benchmarks.stubs import StubLatency, attach_gemini, stubbed_services
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+# Metrics compared by --compare: (path in the result JSON, higher_is_better)
+GATED_METRICS = [
+    (("latency", "overall", "p50_ms"), False),
+    (("latency", "overall", "p95_ms"), False),
+    (("latency", "overall", "p99_ms"), False),
+    (("startup", "pipeline_init_s"), False),
+    (("memory", "peak_rss_mb"), False),
+]
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Linear-interpolated percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    if len(sorted_values) == 1:
+        return sorted_values[0]
+    rank = (len(sorted_values) - 1) * pct / 100
+    lo = int(rank)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (rank - lo)
+
+
+def summarize(latencies: list[float]) -> dict:
+    values = sorted(latencies)
+    return {
+        "count": len(values),
+        "mean_ms": round(sum(values) / len(values) * 1000, 3) if values else 0.0,
+        "p50_ms": round(percentile(values, 50) * 1000, 3),
+        "p95_ms": round(percentile(values, 95) * 1000, 3),
+        "p99_ms": round(percentile(values, 99) * 1000, 3),
+        "max_ms": round(values[-1] * 1000, 3) if values else 0.0,
+    }
+
+
+def peak_rss_mb() -> float | None:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return round(rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024, 1)
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BACKEND_DIR, capture_output=True, text=True, timeout=5
+        ).stdout.strip() or None
+    except Exception:
+        return None
+
+
+def file_md5(path: Path) -> str | None:
+    try:
+        return hashlib.md5(path.read_bytes()).hexdigest()
+    except FileNotFoundError:
+        return None
+
+
+def timed_ask(pipeline, prompt: str) -> float:
+    start = time.perf_counter()
+    pipeline.ask(prompt)
+    return time.perf_counter() - start
+
+
+def run_sequential(pipeline, prompts: list[tuple[str, str]], repeat: int) -> dict:
+    by_category: dict[str, list[float]] = {}
+    overall: list[float] = []
+    for _ in range(repeat):
+        for category, prompt in prompts:
+            elapsed = timed_ask(pipeline, prompt)
+            overall.append(elapsed)
+            by_category.setdefault(category, []).append(elapsed)
+    return {
+        "overall": summarize(overall),
+        "by_category": {k: summarize(v) for k, v in sorted(by_category.items())},
+    }
+
+
+def run_concurrent(pipeline, prompts: list[tuple[str, str]], concurrency: int, repeat: int) -> dict:
+    workload = [prompt for _ in range(repeat) for _, prompt in prompts]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = list(pool.map(lambda p: timed_ask(pipeline, p), workload))
+    wall = time.perf_counter() - start
+    return {
+        "concurrency": concurrency,
+        "requests": len(workload),
+        "wall_s": round(wall, 3),
+        "throughput_rps": round(len(workload) / wall, 2) if wall else 0.0,
+        **summarize(latencies),
+    }
+
+
+def stage_breakdown() -> dict:
+    from app.services.metrics import STAGE_SECONDS
+    return {
+        key[0]: {"count": count, "mean_ms": round(total / count * 1000, 3)}
+        for key, (count, total) in sorted(STAGE_SECONDS.snapshot().items())
+        if count
+    }
+
+
+def _lookup(result: dict, path: tuple[str, ...]):
+    for part in path:
+        if not isinstance(result, dict) or part not in result:
+            return None
+        result = result[part]
+    return result
+
+
+def compare(current: dict, baseline: dict, max_regression: float) -> bool:
+    """Print a comparison table; return False if any gated metric regressed."""
+    ok = True
+    rows = [(path, higher) for path, higher in GATED_METRICS]
+    base_tp = {t["concurrency"]: t for t in baseline.get("throughput", [])}
+    for t in current.get("throughput", []):
+        if t["concurrency"] in base_tp:
+            rows.append((("throughput", t["concurrency"]), True))
+
+    print(f"\n{'metric':<40}{'baseline':>14}{'current':>14}{'change':>10}")
+    for path, higher_is_better in rows:
+        if path[0] == "throughput" and isinstance(path[1], int):
+            name = f"throughput c={path[1]} (rps)"
+            old = base_tp[path[1]]["throughput_rps"]
+            new = next(t["throughput_rps"] for t in current["throughput"] if t["concurrency"] == path[1])
+        else:
+            name = ".".join(path)
+            old, new = _lookup(baseline, path), _lookup(current, path)
+        if not old or new is None:
+            continue
+        change = (new - old) / old
+        regressed = change < -max_regression if higher_is_better else change > max_regression
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{name:<40}{old:>14.3f}{new:>14.3f}{change:>+10.1%}{flag}")
+        ok = ok and not regressed
+    return ok
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Offline Pipeline.ask benchmark")
+    parser.add_argument("--translator-latency", type=float, default=StubLatency.translator)
+    parser.add_argument("--gemini-latency", type=float, default=StubLatency.gemini)
+    parser.add_argument("--probe-latency", type=float, default=StubLatency.probe)
+    parser.add_argument("--jitter", type=float, default=StubLatency.jitter)
+    parser.add_argument("--seed", type=int, default=StubLatency.seed)
+    parser.add_argument("--concurrency", default="1,4,8",
+                        help="Comma-separated worker counts for the throughput runs")
+    parser.add_argument("--repeat", type=int, default=1, help="Passes over the prompt set")
+    parser.add_argument("--warmup", type=int, default=5, help="Untimed prompts before measuring")
+    parser.add_argument("--limit", type=int, default=None, help="Only use the first N prompts")
+    parser.add_argument("--response-cache", action="store_true",
+                        help="Keep the response, translation and query-embedding caches on "
+                             "(repeat passes then measure cache hits)")
+    parser.add_argument("--materialized", action="store_true",
+                        help="Serve pre-generated replies from the answer store (answers.json)")
+    parser.add_argument("--output", type=Path, default=None,
+                        help="Result JSON path (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--compare", type=Path, default=None, help="Baseline result JSON")
+    parser.add_argument("--max-regression", type=float, default=0.10,
+                        help="Allowed relative regression before --compare fails")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+
+    latency = StubLatency(
+        translator=args.translator_latency,
+        gemini=args.gemini_latency,
+        probe=args.probe_latency,
+        jitter=args.jitter,
+        seed=args.seed,
+    )
+    prompts = load_prompts()
+    if args.limit:
+        prompts = prompts[:args.limit]
+    concurrency_levels = [int(c) for c in args.concurrency.split(",") if c.strip()]
+
+    start = time.perf_counter()
+    pipeline_module = importlib.import_module("app.services.pipeline")
+    import_s = time.perf_counter() - start
+
+    with stubbed_services(latency) as sleeper:
+        start = time.perf_counter()
+        pipeline = pipeline_module.Pipeline()
+        init_s = time.perf_counter() - start
+        attach_gemini(pipeline, sleeper)
+        if not args.response_cache:
+            # Every prompt pays for translation, embedding and the reply, as in earlier baselines
+            pipeline.response_cache = None
+            pipeline.translation_cache = pipeline_module.LRUCache(0)
+            pipeline.vector_store.query_cache = None
+        if not args.materialized:
+            # An empty store: fact prompts are phrased by the Gemini stand-in, not precomputed text
+            store = pipeline.answer_store
+            pipeline.answer_store = pipeline_module.AnswerStore(store.path, store.version)
+
+        for _, prompt in prompts[:args.warmup]:
+            pipeline.ask(prompt)
+
+        print(f"Running {len(prompts)} prompts x{args.repeat} sequentially...", flush=True)
+        sequential = run_sequential(pipeline, prompts, args.repeat)
+        throughput = []
+        for level in concurrency_levels:
+            print(f"Running throughput at concurrency {level}...", flush=True)
+            throughput.append(run_concurrent(pipeline, prompts, level, args.repeat))
+        stub_calls = dict(sleeper.calls)
+
+    result = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "dataset_md5": file_md5(BACKEND_DIR / "app" / "data" / "dataset.json"),
+            "config_md5": file_md5(BACKEND_DIR / "app" / "data" / "config.yaml"),
+            "prompts": len(prompts),
+            "repeat": args.repeat,
+            "response_cache": args.response_cache,
+            "caches": {
+                "response": pipeline.response_cache is not None,
+                "translation": pipeline.translation_cache.max_entries > 0,
+                "query_embedding": pipeline.vector_store.query_cache is not None,
+                "materialized": len(pipeline.answer_store) > 0,
+            },
+            "stub_latency_s": vars(latency),
+        },
+        "startup": {
+            "import_s": round(import_s, 3),
+            "pipeline_init_s": round(init_s, 3),
+        },
+        "latency": sequential,
+        "throughput": throughput,
+        "stages": stage_breakdown(),
+        "memory": {"peak_rss_mb": peak_rss_mb()},
+        "stub_calls": stub_calls,
+    }
+
+    output = args.output or RESULTS_DIR / f"{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(result, indent=2), encoding="utf-8")
+
+    overall = sequential["overall"]
+    print(f"\nStartup: import {import_s:.2f}s, Pipeline() {init_s:.2f}s")
+    print(f"Latency: p50 {overall['p50_ms']:.1f}ms  p95 {overall['p95_ms']:.1f}ms  p99 {overall['p99_ms']:.1f}ms")
+    for t in throughput:
+        print(f"Throughput c={t['concurrency']}: {t['throughput_rps']:.1f} req/s (p95 {t['p95_ms']:.1f}ms)")
+    print(f"Peak RSS: {result['memory']['peak_rss_mb']} MB")
+    print(f"Saved results to {output}")
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        if not compare(result, baseline, args.max_regression):
+            print(f"\nPerformance regression beyond {args.max_regression:.0%} against {args.compare}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,274 @@
+"""
+Retrieval evaluation: recall@k / MRR against latency and memory per index configuration
+
+Ground truth comes from dataset.json itself (each input should retrieve its own
+answer), a leave-one-out variant (the input's own row is hidden, another row with
+the same answer must be found) and the held-out paraphrase set in
+benchmarks/paraphrase_eval.json. Every configuration in the sweep (embedding
+model x index backend x confidence threshold) is scored on the same queries.
+
+Usage (from the backend directory):
+    python -m benchmarks.eval_retrieval
+    python -m benchmarks.eval_retrieval --backends exact,int8 --thresholds 0.6,0.7,0.8
+"""
+import argparse
+import json
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+BACKEND_DIR = Path(__file__).parent.parent
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+import yaml
+from loguru import logger
+
+from benchmarks.bench_pipeline import percentile
+
+DATASET_PATH = BACKEND_DIR / "app" / "data" / "dataset.json"
+CONFIG_PATH = BACKEND_DIR / "app" / "data" / "config.yaml"
+PARAPHRASE_PATH = Path(__file__).parent / "paraphrase_eval.json"
+RESULTS_DIR = Path(__file__).parent / "results"
+
+SEARCH_DEPTH = 10
+
+
+class ExactIndex:
+    """What SimpleVectorStore.query does today: float32, norms recomputed per query."""
+
+    def __init__(self, embeddings: np.ndarray):
+        self.embeddings = embeddings.astype(np.float32)
+
+    @property
+    def nbytes(self) -> int:
+        return self.embeddings.nbytes
+
+    def search(self, query: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+        similarities = np.dot(self.embeddings, query) / (
+            np.linalg.norm(self.embeddings, axis=1) * np.linalg.norm(query)
+        )
+        distances = 1 - similarities
+        top = np.argsort(distances)[:k]
+        return top, distances[top]
+
+
+class NormalizedIndex:
+    """Unit vectors precomputed at build time; a query is one matvec + partial sort."""
+
+    dtype = np.float32
+
+    def __init__(self, embeddings: np.ndarray):
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        self.embeddings = (embeddings / np.maximum(norms, 1e-12)).astype(self.dtype)
+
+    @property
+    def nbytes(self) -> int:
+        return self.embeddings.nbytes
+
+    def _similarities(self, query: np.ndarray) -> np.ndarray:
+        return self.embeddings @ query.astype(self.dtype)
+
+    def search(self, query: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+        query = query / max(float(np.linalg.norm(query)), 1e-12)
+        distances = 1 - self._similarities(query).astype(np.float32)
+        k = min(k, len(distances))
+        top = np.argpartition(distances, k - 1)[:k]
+        top = top[np.argsort(distances[top])]
+        return top, distances[top]
+
+
+class Float16Index(NormalizedIndex):
+    """Half-precision unit vectors (half the memory)."""
+
+    dtype = np.float16
+
+
+class Int8Index(NormalizedIndex):
+    """Symmetric per-row int8 quantization of unit vectors (a quarter of the memory)."""
+
+    def __init__(self, embeddings: np.ndarray):
+        super().__init__(embeddings)
+        self.scales = np.abs(self.embeddings).max(axis=1) / 127.0
+        self.scales[self.scales == 0] = 1.0
+        self.embeddings = np.round(self.embeddings / self.scales[:, None]).astype(np.int8)
+        self.scales = self.scales.astype(np.float32)
+
+    @property
+    def nbytes(self) -> int:
+        return self.embeddings.nbytes + self.scales.nbytes
+
+    def _similarities(self, query: np.ndarray) -> np.ndarray:
+        return (self.embeddings @ query.astype(np.float32)) * self.scales
+
+
+BACKENDS = {
+    "exact": ExactIndex,
+    "normalized": NormalizedIndex,
+    "float16": Float16Index,
+    "int8": Int8Index,
+}
+
+
+def build_query_sets(metadatas: list[dict]) -> dict[str, list[dict]]:
+    """Queries as {prompt, relevant (answer set), exclude (row hidden from results)}."""
+    by_title: dict[str, set[str]] = {}
+    answer_rows: dict[str, list[int]] = {}
+    for i, meta in enumerate(metadatas):
+        by_title.setdefault(meta["title"], set()).add(meta["answer"])
+        answer_rows.setdefault(meta["answer"], []).append(i)
+
+    dataset = [
+        {"prompt": meta["question"], "relevant": {meta["answer"]}, "exclude": None}
+        for meta in metadatas
+    ]
+    leave_one_out = [
+        {"prompt": meta["question"], "relevant": {meta["answer"]}, "exclude": i}
+        for i, meta in enumerate(metadatas)
+        if len(answer_rows[meta["answer"]]) > 1
+    ]
+    with open(PARAPHRASE_PATH, "r", encoding="utf-8") as f:
+        paraphrases = [
+            {"prompt": item["prompt"], "relevant": by_title[item["title"]], "exclude": None}
+            for item in json.load(f)
+            if item["title"] in by_title
+        ]
+    return {"dataset": dataset, "dataset_loo": leave_one_out, "paraphrase": paraphrases}
+
+
+def evaluate(index, query_vectors: np.ndarray, queries: list[dict], metadatas: list[dict],
+             thresholds: list[float]) -> dict:
+    ranks: list[int | None] = []
+    top_distances: list[float] = []
+    top_relevant: list[bool] = []
+    search_times: list[float] = []
+
+    for vector, query in zip(query_vectors, queries):
+        start = time.perf_counter()
+        top, distances = index.search(vector, SEARCH_DEPTH + 1)
+        search_times.append(time.perf_counter() - start)
+
+        hits = [(int(i), float(d)) for i, d in zip(top, distances) if int(i) != query["exclude"]]
+        hits = hits[:SEARCH_DEPTH]
+        rank = next(
+            (r for r, (i, _) in enumerate(hits, 1) if metadatas[i]["answer"] in query["relevant"]),
+            None
+        )
+        ranks.append(rank)
+        top_distances.append(hits[0][1] if hits else float("inf"))
+        top_relevant.append(rank == 1)
+
+    n = len(queries) or 1
+    search_sorted = sorted(search_times)
+    return {
+        "queries": len(queries),
+        "recall@1": round(sum(1 for r in ranks if r == 1) / n, 4),
+        "recall@3": round(sum(1 for r in ranks if r is not None and r <= 3) / n, 4),
+        "mrr": round(sum(1 / r for r in ranks if r) / n, 4),
+        "thresholds": {
+            str(t): {
+                # Share of queries the pipeline would answer, and answer correctly
+                "answered": round(sum(1 for d in top_distances if d <= t) / n, 4),
+                "accuracy": round(
+                    sum(1 for d, ok in zip(top_distances, top_relevant) if d <= t and ok) / n, 4
+                ),
+            }
+            for t in thresholds
+        },
+        "search_p50_us": round(percentile(search_sorted, 50) * 1e6, 1),
+        "search_p95_us": round(percentile(search_sorted, 95) * 1e6, 1),
+    }
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    from app.services.pipeline import SimpleVectorStore
+    default_model = SimpleVectorStore.__init__.__defaults__[0]
+
+    parser = argparse.ArgumentParser(description="Retrieval accuracy vs. latency sweep")
+    parser.add_argument("--models", default=default_model,
+                        help="Comma-separated sentence-transformers models")
+    parser.add_argument("--backends", default=",".join(BACKENDS),
+                        help=f"Comma-separated index backends ({', '.join(BACKENDS)})")
+    parser.add_argument("--thresholds", default=None,
+                        help="Comma-separated distance thresholds (default: rag.confidence_threshold "
+                             "and rag.multi_topic_threshold plus 0.5-0.7)")
+    parser.add_argument("--output", type=Path, default=None,
+                        help="Result JSON path (default: benchmarks/results/retrieval-<timestamp>.json)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+
+    from sentence_transformers import SentenceTransformer
+    from app.services.pipeline import read_dataset
+
+    with open(CONFIG_PATH, "r", encoding="utf-8") as f:
+        rag = yaml.safe_load(f)["rag"]
+    if args.thresholds:
+        thresholds = [float(t) for t in args.thresholds.split(",")]
+    else:
+        thresholds = sorted({0.5, 0.6, 0.7, rag["confidence_threshold"], rag["multi_topic_threshold"]})
+
+    documents, metadatas = read_dataset(str(DATASET_PATH))
+    query_sets = build_query_sets(metadatas)
+    backends = [b.strip() for b in args.backends.split(",") if b.strip()]
+    unknown = [b for b in backends if b not in BACKENDS]
+    if unknown:
+        print(f"Unknown backends: {unknown}")
+        return 2
+
+    rows = []
+    for model_name in [m.strip() for m in args.models.split(",") if m.strip()]:
+        print(f"Encoding with {model_name}...", flush=True)
+        model = SentenceTransformer(model_name)
+        doc_vectors = model.encode(documents, convert_to_numpy=True)
+
+        encode_times: list[float] = []
+        set_vectors: dict[str, np.ndarray] = {}
+        for set_name, queries in query_sets.items():
+            vectors = []
+            for query in queries:
+                start = time.perf_counter()
+                vectors.append(model.encode([query["prompt"]], convert_to_numpy=True)[0])
+                encode_times.append(time.perf_counter() - start)
+            set_vectors[set_name] = np.array(vectors)
+        encode_sorted = sorted(encode_times)
+        encode_p50_ms = round(percentile(encode_sorted, 50) * 1000, 3)
+
+        for backend in backends:
+            index = BACKENDS[backend](doc_vectors)
+            for set_name, queries in query_sets.items():
+                metrics = evaluate(index, set_vectors[set_name], queries, metadatas, thresholds)
+                rows.append({
+                    "model": model_name,
+                    "backend": backend,
+                    "query_set": set_name,
+                    "index_kb": round(index.nbytes / 1024, 1),
+                    "encode_p50_ms": encode_p50_ms,
+                    **metrics,
+                })
+
+    threshold_key = str(rag["confidence_threshold"])
+    print(f"\n{'model':<28}{'backend':<12}{'set':<12}{'R@1':>7}{'R@3':>7}{'MRR':>7}"
+          f"{'acc@' + threshold_key:>10}{'search µs':>11}{'encode ms':>11}{'index KB':>10}")
+    for row in rows:
+        acc = row["thresholds"].get(threshold_key, {}).get("accuracy", float("nan"))
+        print(f"{row['model'][-27:]:<28}{row['backend']:<12}{row['query_set']:<12}"
+              f"{row['recall@1']:>7.3f}{row['recall@3']:>7.3f}{row['mrr']:>7.3f}{acc:>10.3f}"
+              f"{row['search_p50_us']:>11.1f}{row['encode_p50_ms']:>11.2f}{row['index_kb']:>10.1f}")
+
+    output = args.output or RESULTS_DIR / f"retrieval-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps({"thresholds": thresholds, "results": rows}, indent=2), encoding="utf-8")
+    print(f"\nSaved results to {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
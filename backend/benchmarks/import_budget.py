@@ -0,0 +1,102 @@
+"""
+Import-time budget for the backend
+
+Imports each module in a fresh interpreter with ``python -X importtime`` and
+reports its cumulative load time and the slowest dependencies. Exits non-zero
+when a module exceeds the budget, or when it pulls in a heavy backend that
+must only be imported on first use (torch, sentence_transformers, translators,
+Gemini client, ...).
+
+Usage (from the backend directory):
+    python -m benchmarks.import_budget
+    python -m benchmarks.import_budget --budget-ms 800 --top 20
+"""
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).parent.parent
+
+DEFAULT_MODULES = ["app.main", "app.services.pipeline"]
+
+# Must not be imported at module load (deferred until the backend is used)
+HEAVY_MODULES = [
+    "torch",
+    "transformers",
+    "sentence_transformers",
+    "deep_translator",
+    "better_profanity",
+    "requests",
+    "google.generativeai",
+]
+
+
+def measure(module: str) -> tuple[float, list[tuple[str, float]]]:
+    """(cumulative ms for module, [(imported module, cumulative ms)]) from one fresh import."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr.strip().splitlines()[-1]}")
+
+    entries: list[tuple[str, float]] = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|", 2)
+        entries.append((name.strip(), int(cumulative) / 1000))
+
+    total = next((ms for name, ms in reversed(entries) if name == module), 0.0)
+    return total, entries
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Module import-time budget check")
+    parser.add_argument("--modules", default=",".join(DEFAULT_MODULES),
+                        help="Comma-separated modules to import")
+    parser.add_argument("--budget-ms", type=float, default=1500.0,
+                        help="Maximum cumulative import time per module")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="Fresh imports per module; the fastest counts (filters noise)")
+    parser.add_argument("--top", type=int, default=10, help="Slowest dependencies to list")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    ok = True
+
+    for module in [m.strip() for m in args.modules.split(",") if m.strip()]:
+        try:
+            runs = [measure(module) for _ in range(max(1, args.repeat))]
+        except RuntimeError as e:
+            print(f"{module}: {e}")
+            ok = False
+            continue
+        total, entries = min(runs, key=lambda run: run[0])
+
+        imported = {name for name, _ in entries}
+        heavy = [name for name in HEAVY_MODULES if name in imported]
+        over_budget = total > args.budget_ms
+        status = "FAIL" if heavy or over_budget else "ok"
+        print(f"\n{module}: {total:.1f} ms (budget {args.budget_ms:.0f} ms) [{status}]")
+        if heavy:
+            print(f"  heavy modules imported at load: {', '.join(heavy)}")
+
+        # Slowest direct and indirect dependencies, deduplicated by name
+        slowest: dict[str, float] = {}
+        for name, ms in entries:
+            if name != module:
+                slowest[name] = max(ms, slowest.get(name, 0.0))
+        for name, ms in sorted(slowest.items(), key=lambda item: -item[1])[:args.top]:
+            print(f"  {ms:>9.1f} ms  {name}")
+
+        ok = ok and not heavy and not over_budget
+
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,147 @@
+"""
+Profanity filter parity check
+
+Compares ProfanityFilter (the compiled DFA used by the pipeline) with
+better_profanity's own contains_profanity on the same word list (the library
+list plus the ``profanity`` words in config.yaml). The corpus is the hand-written
+edge cases in benchmarks/profanity_corpus.txt, every benchmark prompt and
+dataset answer, and prompts generated with a fixed seed from the censor words
+(leetspeak substitutions, split words, separators, truncation). Exits non-zero
+on any disagreement.
+
+Usage (from the backend directory):
+    python -m benchmarks.profanity_parity
+    python -m benchmarks.profanity_parity --generated 100000 --seed 7
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+import yaml
+
+BACKEND_DIR = Path(__file__).parent.parent
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from benchmarks.prompts import DATASET_PATH, load_prompts
+
+CORPUS_PATH = Path(__file__).parent / "profanity_corpus.txt"
+CONFIG_PATH = BACKEND_DIR / "app" / "data" / "config.yaml"
+
+SEPARATORS = [" ", "  ", "-", "_", ".", ", ", "!", " - ", "\n", "?"]
+ODD_TOKENS = ["****", "*", "x", "a", "@", "Ⅸ", "İstanbul", "ß"]
+
+
+def load_corpus(path: Path) -> list[str]:
+    """Prompts of a corpus file (blank and "#" lines skipped, "\\n" is a newline)."""
+    prompts = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        if line.strip() and not line.startswith("#"):
+            prompts.append(line.replace("\\n", "\n"))
+    return prompts
+
+
+def generate(words: list[str], clean: list[str], chars_mapping: dict[str, tuple[str, ...]],
+             count: int, seed: int) -> list[str]:
+    """Prompts mixing censor word variants with clean words, reproducible for a seed."""
+    rng = random.Random(seed)
+
+    def variant(word: str) -> str:
+        chars = []
+        for char in word:
+            roll = rng.random()
+            if char in chars_mapping and roll < 0.4:
+                chars.append(rng.choice(chars_mapping[char]))
+            elif roll < 0.5:
+                chars.append(char.upper())
+            else:
+                chars.append(char)
+        return "".join(chars)
+
+    generated = []
+    for _ in range(count):
+        parts = []
+        for _ in range(rng.randint(0, 8)):
+            roll = rng.random()
+            if roll < 0.25:
+                parts.append(variant(rng.choice(words)))
+            elif roll < 0.35:
+                word = rng.choice(words)
+                cut = rng.randint(1, max(1, len(word) - 1))
+                parts.append(word[:cut] + rng.choice(SEPARATORS) + word[cut:])
+            elif roll < 0.4:
+                parts.append(rng.choice(ODD_TOKENS))
+            else:
+                parts.append(rng.choice(rng.choice(clean).split() or ["x"]))
+        text = "".join(part + rng.choice(SEPARATORS) for part in parts)
+        if rng.random() < 0.5:
+            text = text.rstrip()
+        if text and rng.random() < 0.2:
+            text = text[:rng.randint(0, len(text))]
+        generated.append(text)
+    return generated
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="ProfanityFilter vs better_profanity parity check")
+    parser.add_argument("--corpus", type=Path, default=CORPUS_PATH, help="Hand-written prompts")
+    parser.add_argument("--generated", type=int, default=5000, help="Generated prompts to add")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--show", type=int, default=10, help="Mismatches to print")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+
+    from better_profanity import profanity
+    from better_profanity.utils import get_complete_path_of_file, read_wordlist
+    from loguru import logger
+
+    from app.services.profanity_filter import ProfanityFilter
+
+    logger.remove()
+    with open(CONFIG_PATH, "r", encoding="utf-8") as f:
+        custom_words = yaml.safe_load(f).get("profanity", [])
+
+    profanity.load_censor_words()
+    profanity.add_censor_words(custom_words)
+    start = time.perf_counter()
+    compiled = ProfanityFilter(custom_words)
+    build_s = time.perf_counter() - start
+
+    words = sorted(set(read_wordlist(get_complete_path_of_file("profanity_wordlist.txt"))) | set(custom_words))
+    with open(DATASET_PATH, "r", encoding="utf-8") as f:
+        answers = [item["output"] for item in json.load(f) if item.get("output")]
+    clean = [prompt for _, prompt in load_prompts()] + answers
+
+    corpus = load_corpus(args.corpus) + clean
+    corpus += generate(words, clean, dict(profanity.CHARS_MAPPING), args.generated, args.seed)
+
+    mismatches, positives = [], 0
+    reference_s = compiled_s = 0.0
+    for text in corpus:
+        start = time.perf_counter()
+        expected = profanity.contains_profanity(text)
+        reference_s += time.perf_counter() - start
+        start = time.perf_counter()
+        actual = compiled.contains_profanity(text)
+        compiled_s += time.perf_counter() - start
+        positives += expected
+        if actual != expected:
+            mismatches.append((text, expected, actual))
+
+    print(f"{len(corpus)} prompts ({positives} profane), {len(mismatches)} mismatches")
+    print(f"ProfanityFilter build {build_s * 1000:.0f} ms; screening {compiled_s * 1e6 / len(corpus):.1f} us/prompt "
+          f"vs better_profanity {reference_s * 1e6 / len(corpus):.1f} us/prompt")
+    for text, expected, actual in mismatches[:args.show]:
+        print(f"  MISMATCH {text!r}: better_profanity={expected} ProfanityFilter={actual}")
+
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,56 @@
+"""
+Benchmark prompt set: every dataset input plus paraphrases and multi-topic prompts
+"""
+import json
+from pathlib import Path
+
+DATASET_PATH = Path(__file__).parent.parent / "app" / "data" / "dataset.json"
+
+# Reworded versions of common dataset questions (not verbatim in dataset.json)
+PARAPHRASES = [
+    "best surf spot?",
+    "where to surf in Catanduanes",
+    "Which beach has the biggest waves?",
+    "Is Puraran good for beginners?",
+    "where can i swim near virac",
+    "any waterfalls worth visiting?",
+    "Saan pwedeng lumangoy sa Catanduanes?",
+    "what should I eat while I'm here",
+    "recommend a cheap place to stay in Virac",
+    "how do i get to Binurong Point",
+    "what's there to see in Bato",
+    "Is there wifi at the resorts?",
+    "things to do on a rainy day",
+    "where is the lighthouse",
+    "how far is the airport from town",
+    "Ano ang masarap kainin dito?",
+    "Good hiking trails on the island?",
+    "where can I take nice photos",
+    "is Twin Rock Beach good for snorkeling",
+    "tell me about Maribina Falls",
+]
+
+# Prompts that hit several keyword topics and take the search_multi_topic path
+MULTI_TOPIC = [
+    "I want to surf and then eat seafood",
+    "Where can I swim and hike on the same day?",
+    "hotels near the beach with good food",
+    "surfing, hiking and a place to stay in Baras",
+    "beaches and restaurants in Virac",
+    "waterfalls and viewpoints for sightseeing",
+    "where to sleep and how to get there from the airport",
+    "Gusto kong mag-surf at kumain ng masarap",
+]
+
+
+def load_prompts(include_dataset: bool = True) -> list[tuple[str, str]]:
+    """Return (category, prompt) pairs in a fixed order."""
+    prompts: list[tuple[str, str]] = []
+    if include_dataset:
+        with open(DATASET_PATH, "r", encoding="utf-8") as f:
+            for item in json.load(f):
+                if item.get("input"):
+                    prompts.append(("dataset", item["input"]))
+    prompts.extend(("paraphrase", p) for p in PARAPHRASES)
+    prompts.extend(("multi_topic", p) for p in MULTI_TOPIC)
+    return prompts
@@ -0,0 +1,97 @@
+"""
+Local stand-ins for the network services the pipeline calls
+GoogleTranslator, Gemini and the connectivity probe are replaced with objects
+that sleep for a configurable, seeded latency so runs are reproducible offline.
+"""
+import random
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from types import SimpleNamespace
+from typing import Iterator
+
+
+@dataclass
+class StubLatency:
+    """Simulated upstream latency in seconds (mean +/- uniform jitter)"""
+    translator: float = 0.15
+    gemini: float = 0.8
+    probe: float = 0.05
+    jitter: float = 0.2  # fraction of the mean
+    seed: int = 1234
+
+
+class _Sleeper:
+    def __init__(self, latency: StubLatency):
+        self.latency = latency
+        self._rng = random.Random(latency.seed)
+        self._lock = threading.Lock()
+        self.calls = {"translator": 0, "gemini": 0, "probe": 0}
+
+    def sleep(self, service: str):
+        mean = getattr(self.latency, service)
+        with self._lock:
+            self.calls[service] += 1
+            jitter = self._rng.uniform(-self.latency.jitter, self.latency.jitter)
+        if mean > 0:
+            time.sleep(max(0.0, mean * (1 + jitter)))
+
+
+class StubTranslator:
+    """Mimics deep_translator.GoogleTranslator: returns the text unchanged."""
+    sleeper: _Sleeper = None
+
+    def __init__(self, source: str = "auto", target: str = "en", **kwargs):
+        self.source = source
+        self.target = target
+
+    def translate(self, text: str, **kwargs) -> str:
+        self.sleeper.sleep("translator")
+        return text
+
+
+class StubGemini:
+    """Mimics GenerativeModel.generate_content: echoes the facts from the prompt."""
+
+    def __init__(self, sleeper: _Sleeper):
+        self.sleeper = sleeper
+
+    def generate_content(self, prompt: str, **kwargs):
+        self.sleeper.sleep("gemini")
+        fact = prompt.split("Facts:", 1)[-1].split("\n", 1)[0].strip()
+        return SimpleNamespace(text=fact or "Enjoy Catanduanes!")
+
+
+@contextmanager
+def stubbed_services(latency: StubLatency) -> Iterator[_Sleeper]:
+    """
+    Patch the pipeline module's network dependencies for the duration of the block.
+    
+    Use together with :func:`attach_gemini` once the Pipeline is constructed.
+    """
+    import requests
+    from app.services import pipeline as pipeline_module
+
+    sleeper = _Sleeper(latency)
+    StubTranslator.sleeper = sleeper
+
+    def fake_get(url, timeout=None, **kwargs):
+        sleeper.sleep("probe")
+        return SimpleNamespace(status_code=200)
+
+    original_translator = pipeline_module.GoogleTranslator
+    original_get = requests.get
+    pipeline_module.GoogleTranslator = StubTranslator
+    requests.get = fake_get
+    try:
+        yield sleeper
+    finally:
+        pipeline_module.GoogleTranslator = original_translator
+        requests.get = original_get
+
+
+def attach_gemini(pipeline, sleeper: _Sleeper):
+    """Give a constructed Pipeline the Gemini stand-in (it never sees a real API key)."""
+    pipeline.gemini = StubGemini(sleeper)
+    pipeline.has_gemini = True
@@ -0,0 +1,54 @@
+"""
+Gunicorn configuration for production (python run.py --prod)
+
+The app and the Pathfinder Pipeline (embedding model + vector store) are loaded
+once in the master and then the workers are forked, so model weights and
+embeddings are shared copy-on-write instead of loaded per worker.
+
+Environment overrides:
+    WEB_CONCURRENCY   number of workers (default: CPU cores)
+    BIND              listen address (default: 0.0.0.0:8000)
+    GRACEFUL_TIMEOUT  seconds a worker gets to finish requests on restart (default: 30)
+    MAX_REQUESTS      recycle a worker after this many requests, 0 disables (default: 0)
+
+Graceful restart of all workers: kill -HUP <master pid>
+"""
+import gc
+import multiprocessing
+import os
+import sys
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# Load app.main (and the Pipeline, see when_ready) in the master before forking
+preload_app = True
+reload = False
+
+timeout = 120
+graceful_timeout = int(os.getenv("GRACEFUL_TIMEOUT", 30))
+keepalive = 5
+max_requests = int(os.getenv("MAX_REQUESTS", 0))
+max_requests_jitter = max_requests // 10
+
+# app/logging_config.py logs one structured line per request instead
+accesslog = None
+errorlog = "-"
+
+
+def when_ready(server):
+    """Runs in the master after the app is loaded and before workers are forked."""
+    from app.api.ai import get_pipeline
+
+    get_pipeline()
+    # Keep the loaded objects out of GC scans so workers don't copy their pages
+    gc.freeze()
+    server.log.info(f"Pipeline preloaded, forking {workers} workers")
+
+
+def post_fork(server, worker):
+    """Split the cores between workers instead of every worker using all of them."""
+    torch = sys.modules.get("torch")
+    if torch is not None:
+        torch.set_num_threads(max(1, multiprocessing.cpu_count() // workers))
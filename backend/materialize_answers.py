@@ -0,0 +1,106 @@
+"""
+Script to pre-generate Gemini replies for the whole dataset.
+Runs every distinct dataset answer (and every combination of 2 keyword topics)
+through the Gemini prompt once and saves the replies next to the vector store.
+make_natural then serves them without calling Gemini, online or offline.
+
+Usage (from the backend directory, GEMINI_API_KEY required):
+    python materialize_answers.py
+    python materialize_answers.py --combos 3 --delay 2
+    python materialize_answers.py --force
+
+Re-run it after changing dataset.json or the gemini section of config.yaml;
+already generated replies of the current version are kept (the run is resumable).
+"""
+
+import argparse
+import itertools
+import os
+import sys
+import time
+
+# Add app directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'app'))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Pre-generate Gemini replies for the dataset")
+    parser.add_argument("--combos", type=int, default=2,
+                        help="Largest number of keyword topics combined into one multi-topic fact (0 disables)")
+    parser.add_argument("--delay", type=float, default=1.0,
+                        help="Seconds to wait between Gemini calls (rate limiting)")
+    parser.add_argument("--save-every", type=int, default=10,
+                        help="Save progress after this many new replies")
+    parser.add_argument("--force", action="store_true",
+                        help="Regenerate replies that already exist")
+    return parser.parse_args()
+
+
+def collect_facts(pipeline, max_topics: int) -> list[tuple[str, str]]:
+    """(question, fact) pairs: one per distinct answer, then multi-topic combinations."""
+    items = {}
+    table = pipeline.vector_store.table
+    for answer, question in zip(table.column("answer"), table.column("question")):
+        items.setdefault(answer, question)
+
+    topics = list(pipeline.config.get('keywords', {}).keys())
+    results_per_topic = pipeline.config['rag'].get('results_per_topic', 3)
+    for size in range(2, max_topics + 1):
+        # Same topic order as extract_keywords, so the facts match request time
+        for combo in itertools.combinations(topics, size):
+            question = f"{' and '.join(combo)} in Catanduanes"
+            answers = pipeline.search_multi_topic(list(combo), question, results_per_topic)
+            if answers:
+                items.setdefault(" ".join(answers), question)
+
+    return [(question, fact) for fact, question in items.items()]
+
+
+def main() -> int:
+    args = parse_args()
+
+    print("=" * 50)
+    print("Pathfinder Answer Materialization")
+    print("=" * 50)
+    print()
+
+    from services.pipeline import Pipeline
+    pipeline = Pipeline()
+    if not pipeline.has_gemini:
+        print("❌ Gemini is not available (check GEMINI_API_KEY)")
+        return 1
+
+    store = pipeline.answer_store
+    items = collect_facts(pipeline, args.combos)
+    todo = [(q, f) for q, f in items if args.force or f not in store]
+    print(f"Facts: {len(items)} ({len(items) - len(todo)} already materialized, {len(todo)} to generate)")
+    print(f"Store: {store.path} (version {store.version})")
+    print()
+
+    generated = failed = 0
+    for i, (question, fact) in enumerate(todo, 1):
+        try:
+            reply = pipeline.generate_reply(question, fact)
+        except Exception as e:
+            failed += 1
+            print(f"  [{i}/{len(todo)}] ❌ {question[:60]}: {e}")
+        else:
+            store.put(fact, reply, question)
+            generated += 1
+            print(f"  [{i}/{len(todo)}] ✅ {question[:60]}")
+            if generated % args.save_every == 0:
+                store.save()
+        if args.delay and i < len(todo):
+            time.sleep(args.delay)
+
+    store.save()
+    print()
+    print("=" * 50)
+    print(f"✅ Generated {generated} replies ({failed} failed), {len(store)} in store")
+    print("   Restart the server to serve them")
+    print("=" * 50)
+    return 0 if not failed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
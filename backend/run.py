@@ -2,7 +2,12 @@
 """
 Backend server startup script.
 Handles virtual environment setup and runs the FastAPI server.
+
+    python run.py                  # development: single process with --reload
+    python run.py --prod           # production: preloaded pipeline, one worker per core
+    python run.py --prod --workers 4 --port 8080
 """
+import argparse
 import os
 import sys
 import subprocess
@@ -70,14 +75,58 @@ def install_requirements():
 def check_requirements():
     """Check if requirements are installed."""
     venv_python = get_venv_python()
-    result = subprocess.run(
-        [str(venv_python), '-m', 'pip', 'show', 'uvicorn'],
-        capture_output=True,
-        text=True
+    packages = ['uvicorn'] if sys.platform == 'win32' else ['uvicorn', 'gunicorn']
+    for package in packages:
+        result = subprocess.run(
+            [str(venv_python), '-m', 'pip', 'show', package],
+            capture_output=True,
+            text=True
+        )
+        if result.returncode != 0:
+            return False
+    return True
+
+def parse_args():
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(description="Run the Pathfinder backend")
+    parser.add_argument('--prod', action='store_true',
+                        help="Production mode: no reload, multiple workers sharing a preloaded pipeline")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Worker processes in production mode (default: CPU cores)")
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=8000)
+    return parser.parse_args()
+
+def run_production_server(host: str, port: int, workers: int | None):
+    """Run gunicorn with preloaded app and uvicorn workers (see gunicorn.conf.py)."""
+    venv_python = get_venv_python()
+    workers = workers or os.cpu_count() or 1
+    
+    if sys.platform == 'win32':
+        # Gunicorn needs fork(); uvicorn workers each load their own pipeline
+        print(f"Starting FastAPI server with {workers} uvicorn workers (no preloading on Windows)...", flush=True)
+        result = subprocess.run(
+            [
+                str(venv_python), '-m', 'uvicorn',
+                'app.main:app',
+                '--workers', str(workers),
+                '--host', host,
+                '--port', str(port)
+            ],
+            cwd=Path.cwd()
+        )
+        sys.exit(result.returncode)
+    
+    print(f"Starting FastAPI server in production mode ({workers} workers)...", flush=True)
+    env = dict(os.environ, WEB_CONCURRENCY=str(workers), BIND=f"{host}:{port}")
+    # exec so signals (HUP = graceful restart, TERM = graceful stop) reach the gunicorn master
+    os.execve(
+        str(venv_python),
+        [str(venv_python), '-m', 'gunicorn', 'app.main:app', '-c', 'gunicorn.conf.py'],
+        env
     )
-    return result.returncode == 0
 
-def run_server():
+def run_server(host: str = '0.0.0.0', port: int = 8000):
     """Run the FastAPI server using uvicorn."""
     venv_uvicorn = get_venv_uvicorn()
     venv_python = get_venv_python()
@@ -89,8 +138,8 @@ def run_server():
             str(venv_python), '-m', 'uvicorn',
             'app.main:app',
             '--reload',
-            '--host', '0.0.0.0',
-            '--port', '8000'
+            '--host', host,
+            '--port', str(port)
         ],
         cwd=Path.cwd()
     )
@@ -98,6 +147,8 @@ def run_server():
 
 def main():
     """Main entry point."""
+    args = parse_args()
+    
     # Change to script directory
     script_dir = Path(__file__).parent
     os.chdir(script_dir)
@@ -123,7 +174,10 @@ def main():
             print("Requirements already installed. Skipping installation.", flush=True)
     
     # Run the server
-    run_server()
+    if args.prod:
+        run_production_server(args.host, args.port, args.workers)
+    else:
+        run_server(args.host, args.port)
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,45 @@
+"""
+FuzzyIndex: typo resolution and bounded cost on long tokens
+"""
+import time
+from pathlib import Path
+
+import pytest
+import yaml
+
+from app.services.fuzzy_index import FuzzyIndex
+
+CONFIG_PATH = Path(__file__).parent.parent / "app" / "data" / "config.yaml"
+
+
+@pytest.fixture(scope="module")
+def index() -> FuzzyIndex:
+    """Index over the configured vocabulary, built the way the pipeline builds it."""
+    with open(CONFIG_PATH, "r", encoding="utf-8") as f:
+        config = yaml.safe_load(f)
+    return FuzzyIndex(
+        list(config.get('places', {})) + config.get('protected_places', []),
+        [word for words in config.get('keywords', {}).values() for word in words],
+    )
+
+
+def test_resolves_misspelled_place(index):
+    text, corrections = index.resolve("where is purarn beach")
+    assert text == "where is Puraran Beach"
+    assert corrections == [("purarn beach", "Puraran Beach")]
+
+
+def test_exact_text_is_unchanged(index):
+    assert index.resolve("where can I surf in Virac?") == ("where can I surf in Virac?", [])
+
+
+@pytest.mark.parametrize("prompt", [
+    "a" * 2000,
+    " ".join(["puraranbeachx"] * 140),
+    " ".join(["abcdefghijklmnopqrstu"] * 90),
+])
+def test_max_length_prompt_resolves_in_milliseconds(index, prompt):
+    assert len(prompt) <= 2000
+    start = time.perf_counter()
+    index.resolve(prompt)
+    assert time.perf_counter() - start < 0.1
@@ -0,0 +1,46 @@
+"""
+Request logging middleware: one "request" line per request, carrying its request id
+"""
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+from loguru import logger
+
+from app.middleware.request_logging import request_logging_middleware
+
+
+def _app() -> FastAPI:
+    app = FastAPI()
+    app.middleware('http')(request_logging_middleware)
+
+    @app.get("/plain")
+    def plain():
+        return {"ok": True}
+
+    @app.get("/stream")
+    def stream():
+        return StreamingResponse(iter(["a\n", "b\n"]), media_type="text/plain")
+
+    return app
+
+
+def _request_lines(client: TestClient, path: str, request_id: str) -> list[dict]:
+    records = []
+    sink = logger.add(lambda message: records.append(message.record), level="INFO",
+                      filter=lambda record: record["message"] == "request")
+    try:
+        response = client.get(path, headers={"X-Request-ID": request_id})
+    finally:
+        logger.remove(sink)
+    assert response.headers["X-Request-ID"] == request_id
+    return [record["extra"] for record in records]
+
+
+def test_request_line_has_request_id():
+    client = TestClient(_app())
+    for path in ("/plain", "/stream"):
+        lines = _request_lines(client, path, f"test{path.replace('/', '-')}")
+        assert len(lines) == 1
+        assert lines[0]["request_id"] == f"test{path.replace('/', '-')}"
+        assert lines[0]["path"] == path
+        assert lines[0]["status"] == 200
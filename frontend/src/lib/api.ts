@@ -1,5 +1,5 @@
 import axios from 'axios'
-import type { Coordinates, RouteOptionsResponse, ChatRequest, ChatResponse, AllPlacesResponse } from '../types/api'
+import type { Coordinates, RouteOptionsResponse, ChatRequest, ChatResponse, AllPlacesResponse, MapBundleResponse } from '../types/api'
 
 /**
  * Get the API base URL, auto-detecting from current hostname for network access
@@ -119,4 +119,22 @@ export async function fetchAllPlaces(): Promise<AllPlacesResponse> {
   }
 }
 
+/**
+ * Get the merged tourist-spot and boundary bundle.
+ * Boundaries are simplified server-side for the given zoom level.
+ */
+export async function fetchMapBundle(zoom?: number): Promise<MapBundleResponse> {
+  try {
+    const response = await API.get<MapBundleResponse>('/map-bundle', {
+      params: zoom !== undefined ? { zoom } : undefined
+    })
+    return response.data
+  } catch (error) {
+    if (axios.isAxiosError(error)) {
+      throw new Error(`Failed to fetch map bundle: ${error.message}`)
+    }
+    throw error
+  }
+}
+
 export default API
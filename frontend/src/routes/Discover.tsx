@@ -21,7 +21,7 @@ import { MAP_CONFIG, MODEL_CONFIG, ANIMATION_CONFIG, UI_CONFIG } from '../consta
 import { calculateDistanceDegrees, isPointInGeoJSONFeature } from '../utils/coordinates'
 import toast from 'react-hot-toast'
 import { matchPlaceToModel } from '../utils/matchPlaceToModel'
-import { loadAllTouristSpots } from '../utils/loadGeoJsonSpots'
+import { loadAllTouristSpots, loadProvinceBoundaries } from '../utils/loadGeoJsonSpots'
 import type { PlaceInfo as PlaceInfoType } from '../types/api'
 import type { Place } from '../types/place'
 
@@ -553,8 +553,7 @@ export default function Discover({
           })
         }
 
-        fetch('/CATANDUANES.geojson')
-          .then(response => response.json())
+        loadProvinceBoundaries()
           .then((provinceGeoJson) => {
             if (!mapInstance) return
 
@@ -67,3 +67,23 @@ export interface ChatMessage {
   places?: PlaceInfo[]
   timestamp: Date
 }
+
+/** Tourist spot as served in the merged map bundle */
+export interface MapBundleSpot {
+  name: string
+  coordinates: Coordinates
+  municipality: string
+  description: string
+  category: string
+  type: string
+  size: number
+  showAtZoom: number
+}
+
+/** Merged spots + simplified municipality boundaries */
+export interface MapBundleResponse {
+  version: string
+  zoom: number
+  spots: MapBundleSpot[]
+  boundaries: GeoJSON.FeatureCollection
+}
@@ -1,7 +1,30 @@
 import type { Place } from '../types/place'
+import type { MapBundleResponse } from '../types/api'
+import { fetchMapBundle } from '../lib/api'
 
 /**
- * Map GeoJSON type to category ID
+ * Zoom level the boundary geometry is requested at (municipality-level view)
+ */
+const BUNDLE_ZOOM = 12
+
+let bundlePromise: Promise<MapBundleResponse> | null = null
+
+/**
+ * Load the merged map bundle once per page load.
+ * A failed request is not cached so the next caller can retry.
+ */
+export function loadMapBundle(): Promise<MapBundleResponse> {
+  if (!bundlePromise) {
+    bundlePromise = fetchMapBundle(BUNDLE_ZOOM).catch(error => {
+      bundlePromise = null
+      throw error
+    })
+  }
+  return bundlePromise
+}
+
+/**
+ * Map GeoJSON type to category ID (fallback only; the backend bundle is pre-categorized)
  */
 const TYPE_TO_CATEGORY: Record<string, string> = {
   'BEACHES': 'beaches',
@@ -33,9 +56,36 @@ function getCategoryFromType(type: string): string | null {
 }
 
 /**
- * Load tourist spots from all municipality GeoJSON files
+ * Load tourist spots, preferring the merged backend bundle
  */
 export async function loadAllTouristSpots(): Promise<Place[]> {
+  try {
+    const bundle = await loadMapBundle()
+    return bundle.spots.map(spot => ({ ...spot }))
+  } catch (error) {
+    console.warn('Map bundle unavailable, loading municipality GeoJSON files:', error)
+    return loadTouristSpotsFromFiles()
+  }
+}
+
+/**
+ * Load province boundaries, preferring the simplified geometry from the bundle
+ */
+export async function loadProvinceBoundaries(): Promise<GeoJSON.FeatureCollection> {
+  try {
+    const bundle = await loadMapBundle()
+    return bundle.boundaries
+  } catch (error) {
+    console.warn('Map bundle unavailable, loading CATANDUANES.geojson:', error)
+    const response = await fetch('/CATANDUANES.geojson')
+    return response.json()
+  }
+}
+
+/**
+ * Load tourist spots from all municipality GeoJSON files
+ */
+async function loadTouristSpotsFromFiles(): Promise<Place[]> {
   const municipalities = [
     'VIRAC',
     'BATO',